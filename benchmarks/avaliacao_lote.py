@@ -0,0 +1,60 @@
+"""
+Compara a avaliação e o teste de fim de partida posição a posição (Tabuleiro.avaliar
+e vencedor) com as versões vetorizadas de damas.lote, conferindo que os valores
+são idênticos. As posições vêm de partidas aleatórias.
+
+Uso: python benchmarks/avaliacao_lote.py [posições]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from damas import TabuleiroBitboard
+from damas import lote
+
+def posicoes_aleatorias(quantidade, semente=0):
+    """Posições de partidas com lances aleatórios"""
+    gerador = random.Random(semente)
+    posicoes = []
+    while len(posicoes) < quantidade:
+        tabuleiro, jogador = TabuleiroBitboard(), "branco"
+        while len(posicoes) < quantidade:
+            movimentos = tabuleiro.get_movimentos_validos(jogador)
+            if not movimentos:
+                break
+            tabuleiro.mover(gerador.choice(movimentos))
+            jogador = "vermelho" if jogador == "branco" else "branco"
+            posicoes.append(tabuleiro.copiar())
+    return posicoes
+
+def medir(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    posicoes = posicoes_aleatorias(quantidade)
+    bitboards, tempo_conversao = medir(lambda: lote.de_tabuleiros(posicoes))
+    print(f"{quantidade} posições (conversão para o lote: {tempo_conversao:.2f}s)")
+    print(f"{'medida':<10} {'python':>12} {'numpy':>12} {'ganho':>7}  confere")
+    medidas = {
+        "avaliar": (lambda: [tabuleiro.avaliar() for tabuleiro in posicoes],
+                    lambda: lote.avaliar_lote(bitboards)),
+        "vencedor": (lambda: [tabuleiro.vencedor() for tabuleiro in posicoes],
+                     lambda: [lote.VENCEDORES[v] for v in lote.vencedor_lote(bitboards)]),
+    }
+    for nome, (python, vetorizada) in medidas.items():
+        esperado, tempo_python = medir(python)
+        obtido, tempo_numpy = medir(vetorizada)
+        confere = np.array_equal(np.array(esperado, dtype=object), np.array(obtido, dtype=object))
+        print(f"{nome:<10} {quantidade / tempo_python:>10.0f}/s {quantidade / tempo_numpy:>10.0f}/s "
+              f"{tempo_python / tempo_numpy:>6.1f}x  {'ok' if confere else 'ERRO'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Mede o tempo da busca paralela na raiz (um processo por movimento da raiz)
+com 1, 2, 4 e 8 processos, comparando com a busca sequencial.
+
+Uso: python benchmarks/busca_paralela.py [profundidade]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from damas import IA
+from ordenacao_movimentos import posicoes_teste
+
+def medir_paralelo(posicoes, profundidade, trabalhadores):
+    """Executa a busca paralela em todas as posições; retorna (movimentos, nós, segundos)"""
+    ia = IA()
+    movimentos = []
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Aquece o conjunto de processos fora da medição
+            ia.melhor_movimento_paralelo(posicoes[0], 1, trabalhadores=trabalhadores)
+            inicio = time.perf_counter()
+            nos = 0
+            for tabuleiro in posicoes:
+                ia.tt.limpar()
+                movimentos.append(ia.melhor_movimento_paralelo(tabuleiro, profundidade,
+                                                              trabalhadores=trabalhadores))
+                nos += ia.nos
+            tempo = time.perf_counter() - inicio
+    finally:
+        ia.encerrar()
+    return movimentos, nos, tempo
+
+def main():
+    profundidade = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    posicoes = posicoes_teste()
+    
+    ia = IA()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for tabuleiro in posicoes:
+            ia.melhor_movimento_ia(tabuleiro, profundidade)
+    tempo_sequencial = time.perf_counter() - inicio
+    
+    print(f"Núcleos disponíveis: {os.cpu_count()} | profundidade {profundidade}")
+    print(f"{'processos':>9} {'nós':>10} {'tempo':>9} {'aceleração':>10}")
+    print(f"{'seq':>9} {'-':>10} {tempo_sequencial:>8.2f}s {1.0:>9.2f}x")
+    for trabalhadores in (1, 2, 4, 8):
+        _, nos, tempo = medir_paralelo(posicoes, profundidade, trabalhadores)
+        print(f"{trabalhadores:>9} {nos:>10} {tempo:>8.2f}s {tempo_sequencial / tempo:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
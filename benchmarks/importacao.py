@@ -0,0 +1,57 @@
+"""
+Mede o tempo de importação e de partida a frio (importar, criar o tabuleiro e
+escolher a primeira jogada) do motor sem interface, comparando com a importação
+do módulo gráfico. Cada medida roda num interpretador novo.
+
+Uso: python benchmarks/importacao.py [repeticoes]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Cada trecho imprime o tempo medido (s) e se o pygame foi carregado
+MEDIDAS = {
+    "import damas": """
+import sys, time
+inicio = time.perf_counter()
+import damas
+print(time.perf_counter() - inicio, "pygame" in sys.modules)
+""",
+    "partida a frio (prof. 4)": """
+import contextlib, io, sys, time
+inicio = time.perf_counter()
+from damas import IA, TabuleiroBitboard
+with contextlib.redirect_stdout(io.StringIO()):
+    IA().melhor_movimento_ia(TabuleiroBitboard(), 4)
+print(time.perf_counter() - inicio, "pygame" in sys.modules)
+""",
+    "import jogoDeDamaDemo": """
+import sys, time
+inicio = time.perf_counter()
+import jogoDeDamaDemo
+print(time.perf_counter() - inicio, "pygame" in sys.modules)
+""",
+}
+
+def medir(codigo):
+    """Executa o trecho num processo novo; retorna (segundos, pygame carregado)"""
+    ambiente = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+                    PYGAME_HIDE_SUPPORT_PROMPT="1", PYTHONDONTWRITEBYTECODE="1")
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, env=ambiente,
+                           capture_output=True, text=True, check=True).stdout.split()
+    return float(saida[-2]), saida[-1] == "True"
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'medida':<26} {'mediana':>9} {'mínimo':>9} {'pygame':>7}")
+    for nome, codigo in MEDIDAS.items():
+        resultados = [medir(codigo) for _ in range(repeticoes)]
+        tempos = [tempo for tempo, _ in resultados]
+        print(f"{nome:<26} {statistics.median(tempos) * 1000:>7.1f}ms {min(tempos) * 1000:>7.1f}ms "
+              f"{'sim' if resultados[0][1] else 'não':>7}")
+
+if __name__ == "__main__":
+    main()
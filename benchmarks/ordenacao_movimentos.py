@@ -0,0 +1,63 @@
+"""
+Compara o número de nós visitados pela IA com e sem ordenação de movimentos
+(movimento da tabela de transposição, capturas, killer moves e história) e a
+fração dos cortes beta feitos pelo primeiro movimento.
+
+Uso: python benchmarks/ordenacao_movimentos.py [profundidade_min] [profundidade_max]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from damas import IA, TabuleiroBitboard
+
+def posicoes_teste(quantidade=4, semente=2024):
+    """Posições fixas obtidas com lances aleatórios (reprodutíveis) a partir do início"""
+    gerador = random.Random(semente)
+    posicoes = [TabuleiroBitboard()]
+    while len(posicoes) < quantidade:
+        tabuleiro = TabuleiroBitboard()
+        jogador = "branco"
+        for _ in range(gerador.randint(6, 16)):
+            movimentos = tabuleiro.get_movimentos_validos(jogador)
+            if not movimentos:
+                break
+            tabuleiro.mover(gerador.choice(movimentos))
+            jogador = "vermelho" if jogador == "branco" else "branco"
+        # A IA joga com as vermelhas: só aproveita posições em que é a vez delas
+        if jogador == "vermelho" and tabuleiro.get_movimentos_validos("vermelho"):
+            posicoes.append(tabuleiro)
+    return posicoes
+
+def medir(tabuleiro, profundidade, ordenar):
+    """Executa uma busca com tabela nova e retorna (nós, segundos, cortes, cortes no primeiro)"""
+    ia = IA(ordenar=ordenar, verboso=False)
+    inicio = time.perf_counter()
+    _, estatisticas = ia.buscar(tabuleiro, profundidade)
+    return (estatisticas.nos, time.perf_counter() - inicio, estatisticas.cortes,
+            estatisticas.cortes_primeiro)
+
+def main():
+    profundidade_min = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    profundidade_max = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    posicoes = posicoes_teste()
+    
+    print(f"{'prof':>4} {'nós sem ordem':>14} {'nós com ordem':>14} {'redução':>8} {'tempo sem':>10} "
+          f"{'tempo com':>10} {'1º corta sem':>13} {'1º corta com':>13}")
+    for profundidade in range(profundidade_min, profundidade_max + 1):
+        totais = {False: [0, 0.0, 0, 0], True: [0, 0.0, 0, 0]}
+        for tabuleiro in posicoes:
+            for ordenar in (False, True):
+                for i, valor in enumerate(medir(tabuleiro, profundidade, ordenar)):
+                    totais[ordenar][i] += valor
+        (nos_sem, tempo_sem, cortes_sem, primeiro_sem), (nos_com, tempo_com, cortes_com, primeiro_com) = \
+            totais[False], totais[True]
+        print(f"{profundidade:>4} {nos_sem:>14} {nos_com:>14} {nos_sem / max(nos_com, 1):>7.1f}x "
+              f"{tempo_sem:>9.2f}s {tempo_com:>9.2f}s {primeiro_sem / max(cortes_sem, 1):>13.0%} "
+              f"{primeiro_com / max(cortes_com, 1):>13.0%}")
+
+if __name__ == "__main__":
+    main()
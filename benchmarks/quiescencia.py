@@ -0,0 +1,63 @@
+"""
+Compara a busca com e sem quiescência (capturas além da profundidade): nós
+visitados, tempo, quantas vezes o movimento escolhido é o mesmo de uma busca
+de referência bem mais profunda e o erro médio do valor em relação a ela (o
+quanto a busca rasa erra o saldo das trocas). As posições são as de
+ordenacao_movimentos, com as vermelhas a jogar. Antes, confere que os contadores
+de quiescência são zerados entre buscas da mesma IA.
+
+Uso: python benchmarks/quiescencia.py [profundidade_max] [profundidade_referencia] [posições]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from damas import IA
+from ordenacao_movimentos import posicoes_teste
+
+def conferir_contadores(posicoes, profundidade=4):
+    """Buscas seguidas na mesma IA: os nós de quiescência são parte dos nós de cada busca"""
+    ia = IA(verboso=False)
+    for tabuleiro in posicoes[:4]:
+        _, estatisticas = ia.buscar(tabuleiro, profundidade)
+        assert estatisticas.nos_quiescencia <= estatisticas.nos, \
+            f"nós de quiescência {estatisticas.nos_quiescencia} > nós {estatisticas.nos}"
+
+def medir(tabuleiro, profundidade, quiescencia):
+    """Busca com tabela nova; retorna (movimento, valor, nós, nós de quiescência, segundos)"""
+    ia = IA(verboso=False, quiescencia=quiescencia)
+    inicio = time.perf_counter()
+    movimento, estatisticas = ia.buscar(tabuleiro, profundidade)
+    return (movimento, estatisticas.valor, estatisticas.nos, estatisticas.nos_quiescencia,
+            time.perf_counter() - inicio)
+
+def main():
+    profundidade_max = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    referencia = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    posicoes = posicoes_teste(int(sys.argv[3]) if len(sys.argv) > 3 else 30)
+    conferir_contadores(posicoes)
+    esperados = [medir(tabuleiro, referencia, True)[:2] for tabuleiro in posicoes]
+    
+    print(f"referência: profundidade {referencia} com quiescência, {len(posicoes)} posições")
+    print(f"{'prof':>4} {'quiesc.':>8} {'acertos':>8} {'erro valor':>11} {'nós':>10} {'nós quiesc.':>12} "
+          f"{'tempo':>8}")
+    for profundidade in range(1, profundidade_max + 1):
+        for quiescencia in (False, True):
+            acertos = erro = nos = nos_quiescencia = 0
+            tempo = 0.0
+            for tabuleiro, (esperado, valor_esperado) in zip(posicoes, esperados):
+                movimento, valor, nos_busca, nos_q, segundos = medir(tabuleiro, profundidade, quiescencia)
+                acertos += movimento == esperado
+                erro += abs(valor - valor_esperado)
+                nos += nos_busca
+                nos_quiescencia += nos_q
+                tempo += segundos
+            print(f"{profundidade:>4} {'sim' if quiescencia else 'não':>8} {acertos / len(posicoes):>8.0%} "
+                  f"{erro / len(posicoes):>11.1f} "
+                  f"{nos:>10} {nos_quiescencia:>12} {tempo:>7.2f}s")
+
+if __name__ == "__main__":
+    main()
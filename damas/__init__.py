@@ -0,0 +1,13 @@
+"""
+Motor do jogo de damas sem dependência do pygame: regras (Tabuleiro e
+TabuleiroBitboard), avaliação e busca (IA). A interface gráfica em
+jogoDeDamaDemo.py é apenas um cliente deste pacote.
+"""
+from .constantes import (LINHAS, COLUNAS, VAZIO, PEDRA_BRANCA, PEDRA_PRETA, DAMA_BRANCA,
+                         DAMA_PRETA, DIRECOES, CASAS_ESCURAS, indice_casa, COORDENADAS,
+                         chave_posicao)
+from .avaliacao import ARQUIVO_PESOS, PESOS_INICIAIS, PesosAvaliacao, PESOS_PADRAO
+from .tabuleiro import Tabuleiro
+from .bitboard import TabuleiroBitboard
+from .busca import (EXATO, LIMITE_INFERIOR, LIMITE_SUPERIOR, TabelaTransposicao, VITORIA,
+                    EstatisticasBusca, relatorio_json, TempoEsgotado, BuscaCancelada, IA)
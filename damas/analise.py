@@ -0,0 +1,163 @@
+"""
+Análise de arquivos de partidas PDN: cada lance é comparado com o melhor da busca
+numa profundidade fixa, e os lances que perdem mais que o limiar são apontados
+como erros.
+
+O caminho é todo por geradores: as partidas são lidas uma a uma dos arquivos,
+só algumas por processo ficam em análise ao mesmo tempo e cada resultado é
+escrito (uma linha JSON por partida, na ordem em que terminam) e descartado.
+A memória não cresce com o tamanho do arquivo.
+
+Uso: python -m damas.analise partidas.pdn [...] [--profundidade 6] [--limiar 100] [--saida erros.jsonl]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from .busca import IA
+from . import pdn
+
+# Partidas enviadas aos processos além das que estão em análise (limita a memória)
+PARTIDAS_POR_PROCESSO = 2
+# Perda máxima de um lance na média da partida (perdas de vitória são da ordem de VITORIA)
+PERDA_MAXIMA_MEDIA = 1000
+
+def ler_arquivos(caminhos):
+    """Gera as partidas de vários arquivos PDN em sequência ("-" é a entrada padrão)"""
+    for caminho in caminhos:
+        if caminho == "-":
+            yield from pdn.ler_partidas(sys.stdin)
+            continue
+        with open(caminho, encoding="utf-8") as arquivo:
+            yield from pdn.ler_partidas(arquivo)
+
+def analisar_partida(partida, profundidade, limiar, ia):
+    """
+    Perda de cada lance em relação ao melhor da busca (centésimos de pedra, do ponto
+    de vista de quem jogou) e a lista dos que passam do limiar
+    """
+    ia.nova_partida()
+    erros = []
+    perdas = []
+    lance = -1
+    try:
+        for lance, (tabuleiro, jogador, movimento) in enumerate(pdn.reproduzir(partida)):
+            movimentos = tabuleiro.get_movimentos_validos(jogador)
+            if len(movimentos) == 1:
+                continue  # Lance forçado
+            melhor, estatisticas = ia.buscar(tabuleiro, profundidade, None, jogador)
+            if movimento == melhor:
+                perdas.append(0)
+                continue
+            # Mesma profundidade para o lance jogado (a tabela de transposição da
+            # busca anterior torna esta bem mais barata)
+            valor = ia.avaliar_movimentos(tabuleiro, [movimento], profundidade, jogador)[0]
+            sinal = 1 if jogador == "branco" else -1
+            perda = max(0, sinal * (estatisticas.valor - valor))
+            perdas.append(min(perda, PERDA_MAXIMA_MEDIA))
+            if perda > limiar:
+                erros.append({"lance": lance + 1, "jogador": jogador, "jogado": pdn.notacao(movimento),
+                              "melhor": pdn.notacao(melhor), "valor_jogado": valor,
+                              "valor_melhor": estatisticas.valor, "perda": perda})
+        problema = None
+    except ValueError as erro:
+        problema = str(erro)
+    resultado = {
+        "tags": partida["tags"],
+        "resultado": partida["resultado"],
+        "lances": len(partida["lances"]),
+        "analisados": len(perdas),
+        "perda_media": round(sum(perdas) / len(perdas), 2) if perdas else 0.0,
+        "erros": erros,
+    }
+    if problema:
+        resultado["problema"] = f"lance {lance + 2}: {problema}"
+    return resultado
+
+# IA de cada processo (criada por _iniciar_processo)
+_ia = None
+
+def _iniciar_processo():
+    """Cria a IA de um processo; reaproveitada entre partidas"""
+    global _ia
+    _ia = IA(verboso=False)
+
+def _analisar(tarefa):
+    indice, partida, profundidade, limiar = tarefa
+    resultado = analisar_partida(partida, profundidade, limiar, _ia)
+    resultado["partida"] = indice
+    return resultado
+
+def _tarefas(partidas, profundidade, limiar):
+    for indice, partida in enumerate(partidas):
+        yield indice, partida, profundidade, limiar
+
+def _em_paralelo(funcao, tarefas, processos):
+    """
+    Gera funcao(tarefa) para cada tarefa, na ordem em que terminam, com no máximo
+    PARTIDAS_POR_PROCESSO tarefas por processo em voo (o gerador de tarefas só é
+    consumido conforme os resultados saem)
+    """
+    # Importado aqui pelo mesmo motivo que em IA._executor_paralelo (tempo de importação)
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo) as executor:
+        pendentes = set()
+        for tarefa in tarefas:
+            pendentes.add(executor.submit(funcao, tarefa))
+            if len(pendentes) >= processos * PARTIDAS_POR_PROCESSO:
+                concluidas, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in concluidas:
+                    yield futuro.result()
+        for futuro in pendentes:
+            yield futuro.result()
+
+def analisar(partidas, saida, profundidade=6, limiar=100, processos=None):
+    """
+    Analisa as partidas (qualquer iterável, lido sob demanda) e escreve uma linha
+    JSON por partida em 'saida'. Retorna (partidas, lances analisados, erros).
+    """
+    processos = processos or os.cpu_count() or 1
+    tarefas = _tarefas(partidas, profundidade, limiar)
+    if processos == 1:
+        _iniciar_processo()
+        resultados = map(_analisar, tarefas)
+    else:
+        resultados = _em_paralelo(_analisar, tarefas, processos)
+
+    totais = [0, 0, 0]
+    for resultado in resultados:
+        saida.write(json.dumps(resultado, ensure_ascii=False, separators=(",", ":")) + "\n")
+        saida.flush()
+        totais[0] += 1
+        totais[1] += resultado["analisados"]
+        totais[2] += len(resultado["erros"])
+    return tuple(totais)
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Aponta os erros graves de partidas PDN (saída em JSON Lines)")
+    parser.add_argument("arquivos", nargs="+", help="arquivos PDN ('-' para a entrada padrão)")
+    parser.add_argument("--profundidade", type=int, default=6)
+    parser.add_argument("--limiar", type=int, default=100,
+                        help="perda mínima (centésimos de pedra) para apontar o lance")
+    parser.add_argument("--processos", type=int, default=None, help="padrão: número de núcleos")
+    parser.add_argument("--saida", default="-", help="arquivo JSON Lines (padrão: saída padrão)")
+    args = parser.parse_args(argumentos)
+
+    inicio = time.perf_counter()
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8")
+    try:
+        partidas, lances, erros = analisar(ler_arquivos(args.arquivos), saida, args.profundidade,
+                                           args.limiar, args.processos)
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+
+    duracao = time.perf_counter() - inicio
+    print(f"{partidas} partida(s), {lances} lances analisados, {erros} erro(s) acima de {args.limiar} | "
+          f"{lances / duracao:.1f} lances/s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
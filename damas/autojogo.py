@@ -0,0 +1,242 @@
+"""
+Partidas da IA contra ela mesma, em lote, para ajustar a avaliação.
+
+Duas configurações (A e B: profundidade ou tempo por jogada e arquivo de pesos)
+jogam N partidas distribuídas por um conjunto de processos. Cada partida começa
+com alguns lances aleatórios (reprodutíveis a partir da semente) e o resultado
+é escrito como uma linha JSON assim que ela termina. Com --pdn, as partidas
+também são gravadas em PDN, com as estatísticas da busca de cada lance.
+
+Uso: python -m damas.autojogo --partidas 1000 --prof-a 4 --prof-b 4 --pesos-b novos.json [--pdn partidas.pdn]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .constantes import DAMA_BRANCA, DAMA_PRETA, indice_casa
+from .avaliacao import PesosAvaliacao
+from .bitboard import TabuleiroBitboard
+from .busca import IA
+from .livro import LivroAberturas
+from .pdn import GravadorPartidas, RESULTADOS
+
+# Empate: lances seguidos sem captura e sem movimento de pedra, ou seja, só damas
+# andando (25 de cada lado), mesmo que ainda haja pedras bloqueadas no tabuleiro
+LIMITE_LANCES_DAMAS = 50
+# Empate: número máximo de lances (plies) de uma partida
+LIMITE_LANCES = 400
+# Partidas enviadas aos processos além das que estão rodando (limita a memória)
+PARTIDAS_POR_PROCESSO = 2
+
+class Configuracao:
+    """
+    Ajustes de um dos lados: profundidade ou tempo por jogada, pesos da avaliação
+    e livro de aberturas
+    """
+    def __init__(self, nome, profundidade=4, tempo_limite_ms=None, arquivo_pesos=None, arquivo_livro=None):
+        self.nome = nome
+        self.profundidade = profundidade
+        self.tempo_limite_ms = tempo_limite_ms
+        self.arquivo_pesos = arquivo_pesos
+        self.arquivo_livro = arquivo_livro
+    
+    def criar_ia(self):
+        """IA silenciosa com os pesos e o livro desta configuração"""
+        pesos = PesosAvaliacao.carregar(self.arquivo_pesos) if self.arquivo_pesos else None
+        # O livro é mapeado em cada processo; as páginas são compartilhadas pelo sistema
+        livro = LivroAberturas(self.arquivo_livro) if self.arquivo_livro else None
+        return IA(pesos=pesos, verboso=False, livro=livro)
+    
+    def descricao(self):
+        """Resumo da configuração para o relatório"""
+        busca = f"{self.tempo_limite_ms} ms" if self.tempo_limite_ms else f"profundidade {self.profundidade}"
+        return (f"{self.nome}: {busca}, pesos {self.arquivo_pesos or 'padrão'}, "
+                f"livro {self.arquivo_livro or 'nenhum'}")
+
+def jogar_partida(indice, semente, abertura, configuracoes, ias, gravar=False):
+    """
+    Joga uma partida e retorna o registro dela. Nas partidas pares A joga com
+    as brancas; nas ímpares as cores são trocadas. Com 'gravar', o registro traz
+    também "gravacao": os movimentos com as estatísticas da busca (para o PDN).
+    """
+    gerador = random.Random(f"{semente}:{indice}")
+    lados = {"branco": 0, "vermelho": 1} if indice % 2 == 0 else {"branco": 1, "vermelho": 0}
+    for ia in ias:
+        ia.nova_partida()
+    
+    tabuleiro = TabuleiroBitboard()
+    jogador = "branco"
+    lances = []
+    gravacao = []
+    nos = {"branco": [], "vermelho": []}
+    tempos_ms = {"branco": [], "vermelho": []}
+    lances_damas = 0
+    vencedor = motivo = None
+    
+    while True:
+        movimentos = tabuleiro.get_movimentos_validos(jogador)
+        if not movimentos:
+            vencedor = "vermelho" if jogador == "branco" else "branco"
+            motivo = "sem_movimentos"
+            break
+        if len(lances) >= LIMITE_LANCES:
+            motivo = "limite_lances"
+            break
+        
+        estatisticas = None
+        if len(lances) < abertura:
+            movimento = gerador.choice(movimentos)
+        else:
+            lado = lados[jogador]
+            configuracao, ia = configuracoes[lado], ias[lado]
+            inicio = time.perf_counter()
+            movimento = ia.melhor_movimento_ia(tabuleiro, configuracao.profundidade,
+                                               configuracao.tempo_limite_ms, jogador)
+            tempos_ms[jogador].append(round((time.perf_counter() - inicio) * 1000, 2))
+            nos[jogador].append(ia.nos)
+            estatisticas = ia.estatisticas.para_dict() if gravar else None
+        
+        # Peça que se move (antes do movimento, que pode promovê-la)
+        moveu_dama = tabuleiro.peca(indice_casa(movimento[0], movimento[1])) in (DAMA_BRANCA, DAMA_PRETA)
+        tabuleiro.fazer_movimento(movimento)
+        lances.append(movimento[:4])
+        if gravar:
+            gravacao.append((movimento, estatisticas))
+        
+        # Só damas andando: conta os lances sem captura nem movimento de pedra
+        if moveu_dama and not movimento[4]:
+            lances_damas += 1
+            if lances_damas >= LIMITE_LANCES_DAMAS:
+                motivo = "regra_damas"
+                break
+        else:
+            lances_damas = 0
+        jogador = "vermelho" if jogador == "branco" else "branco"
+    
+    nomes = {cor: configuracoes[lado].nome for cor, lado in lados.items()}
+    registro = {
+        "partida": indice,
+        "brancas": nomes["branco"],
+        "vermelhas": nomes["vermelho"],
+        "vencedor": nomes[vencedor] if vencedor else None,
+        "motivo": motivo,
+        "lances": len(lances),
+        "abertura": lances[:abertura],
+        "nos": nos,
+        "tempos_ms": tempos_ms,
+    }
+    if gravar:
+        registro["gravacao"] = gravacao
+    return registro
+
+# Configurações e IAs de cada processo (criadas por _iniciar_processo)
+_configuracoes = None
+_ias = None
+
+def _iniciar_processo(configuracoes):
+    """Cria as IAs de um processo; elas são reaproveitadas entre partidas"""
+    global _configuracoes, _ias
+    _configuracoes = configuracoes
+    _ias = [configuracao.criar_ia() for configuracao in configuracoes]
+
+def _jogar(tarefa):
+    """Joga uma partida num processo do conjunto"""
+    indice, semente, abertura, gravar = tarefa
+    return jogar_partida(indice, semente, abertura, _configuracoes, _ias, gravar)
+
+def gravar_pdn(gravador, resultado):
+    """Acrescenta ao PDN uma partida jogada com gravar=True"""
+    gravador.iniciar({"Event": "autojogo", "Round": resultado["partida"] + 1,
+                      "White": resultado["brancas"], "Black": resultado["vermelhas"]})
+    for movimento, estatisticas in resultado.pop("gravacao"):
+        gravador.lance(movimento, estatisticas)
+    if resultado["vencedor"] is None:
+        vencedor = None
+    else:
+        vencedor = "branco" if resultado["vencedor"] == resultado["brancas"] else "vermelho"
+    gravador.terminar(RESULTADOS[vencedor])
+
+def executar(partidas, configuracoes, saida, semente=0, abertura=4, processos=None, gravador=None):
+    """
+    Joga as partidas e escreve cada registro em 'saida' (uma linha JSON) na ordem
+    em que terminam; com 'gravador' (GravadorPartidas), também em PDN. Retorna o
+    placar {nome da configuração ou None: partidas}.
+    """
+    processos = processos or os.cpu_count() or 1
+    placar = {configuracao.nome: 0 for configuracao in configuracoes}
+    placar[None] = 0
+    gravar = gravador is not None
+    
+    def registrar(resultado):
+        if gravar:
+            gravar_pdn(gravador, resultado)
+        saida.write(json.dumps(resultado, separators=(",", ":")) + "\n")
+        saida.flush()
+        placar[resultado["vencedor"]] += 1
+    
+    if processos == 1:
+        ias = [configuracao.criar_ia() for configuracao in configuracoes]
+        for indice in range(partidas):
+            registrar(jogar_partida(indice, semente, abertura, configuracoes, ias, gravar))
+        return placar
+    
+    # Só mantém em voo algumas partidas por processo: o resultado é escrito e
+    # descartado em seguida, e a memória não cresce com o número de partidas
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo,
+                             initargs=(configuracoes,)) as executor:
+        pendentes = set()
+        proxima = 0
+        while proxima < partidas or pendentes:
+            while proxima < partidas and len(pendentes) < processos * PARTIDAS_POR_PROCESSO:
+                pendentes.add(executor.submit(_jogar, (proxima, semente, abertura, gravar)))
+                proxima += 1
+            concluidas, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in concluidas:
+                registrar(futuro.result())
+    return placar
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Partidas da IA contra ela mesma (saída em JSON Lines)")
+    parser.add_argument("--partidas", type=int, default=100)
+    parser.add_argument("--processos", type=int, default=None, help="padrão: número de núcleos")
+    parser.add_argument("--semente", type=int, default=0, help="semente das aberturas aleatórias")
+    parser.add_argument("--abertura", type=int, default=4, help="lances aleatórios no início")
+    for nome in ("a", "b"):
+        parser.add_argument(f"--prof-{nome}", type=int, default=4, help=f"profundidade de {nome.upper()}")
+        parser.add_argument(f"--tempo-{nome}", type=int, default=None,
+                            help=f"tempo por jogada de {nome.upper()} em ms (substitui a profundidade)")
+        parser.add_argument(f"--pesos-{nome}", default=None, help=f"arquivo de pesos de {nome.upper()}")
+        parser.add_argument(f"--livro-{nome}", default=None, help=f"livro de aberturas de {nome.upper()}")
+    parser.add_argument("--saida", default="-", help="arquivo JSON Lines (padrão: saída padrão)")
+    parser.add_argument("--pdn", default=None, help="grava também as partidas neste arquivo PDN (acréscimo)")
+    parser.add_argument("--pdn-binario", default=None,
+                        help="com --pdn, grava as posições em registros do codec neste arquivo")
+    args = parser.parse_args(argumentos)
+    
+    configuracoes = [Configuracao("A", args.prof_a, args.tempo_a, args.pesos_a, args.livro_a),
+                     Configuracao("B", args.prof_b, args.tempo_b, args.pesos_b, args.livro_b)]
+    for configuracao in configuracoes:
+        print(configuracao.descricao(), file=sys.stderr)
+    
+    inicio = time.perf_counter()
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8")
+    gravador = GravadorPartidas(args.pdn, args.pdn_binario) if args.pdn else None
+    try:
+        placar = executar(args.partidas, configuracoes, saida, args.semente, args.abertura, args.processos,
+                          gravador)
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+        if gravador is not None:
+            gravador.fechar()
+    
+    duracao = time.perf_counter() - inicio
+    print(f"A {placar['A']} x {placar['B']} B, {placar[None]} empate(s) | "
+          f"{args.partidas / duracao:.2f} partidas/s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Pesos da função de avaliação e tabela peça-casa"""
+import json
+import os
+
+from .constantes import (COORDENADAS, CASAS_ESCURAS, LINHAS, PEDRA_BRANCA, PEDRA_PRETA,
+                         DAMA_BRANCA, DAMA_PRETA)
+
+# Pesos da avaliação (em centésimos de pedra), sobrescritos por pesos_avaliacao.json
+ARQUIVO_PESOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pesos_avaliacao.json")
+PESOS_INICIAIS = {
+    "pedra": 100,      # Material
+    "dama": 300,
+    "avanco": 4,       # Por linha que a pedra avançou
+    "guarda": 10,      # Pedra na própria última linha (impede promoções)
+    "centro": 8,       # Peça nas casas centrais
+    "mobilidade": 2,   # Por movimento simples disponível
+}
+
+class PesosAvaliacao:
+    """Pesos da função de avaliação e a tabela peça-casa derivada deles"""
+    def __init__(self, pesos=None):
+        valores = dict(PESOS_INICIAIS)
+        if pesos:
+            desconhecidos = set(pesos) - set(PESOS_INICIAIS)
+            if desconhecidos:
+                raise ValueError(f"Pesos desconhecidos: {', '.join(sorted(desconhecidos))}")
+            valores.update(pesos)
+        
+        # Valores inteiros: a soma incremental é exata, independente da ordem dos lances
+        for nome, valor in valores.items():
+            setattr(self, nome, int(round(valor)))
+        
+        # Material por código de peça, do ponto de vista das brancas
+        self.material = [0, self.pedra, -self.pedra, self.dama, -self.dama]
+        self.tabela = self._criar_tabela()
+    
+    @classmethod
+    def carregar(cls, caminho=ARQUIVO_PESOS):
+        """Lê os pesos de um arquivo JSON (usa os valores iniciais se ele não existir)"""
+        if not os.path.exists(caminho):
+            return cls()
+        with open(caminho, encoding="utf-8") as arquivo:
+            return cls(json.load(arquivo))
+    
+    def para_dict(self):
+        """Pesos no formato do arquivo de configuração"""
+        return {nome: getattr(self, nome) for nome in PESOS_INICIAIS}
+    
+    def _criar_tabela(self):
+        """Valor posicional de cada peça em cada casa escura: tabela[peça][índice]"""
+        tabela = [[0] * CASAS_ESCURAS for _ in range(5)]
+        for indice, (linha, coluna) in enumerate(COORDENADAS):
+            centro = self.centro if 3 <= linha <= 4 and 2 <= coluna <= 5 else 0
+            # Brancas avançam para a linha 0, vermelhas para a linha 7
+            tabela[PEDRA_BRANCA][indice] = (self.avanco * (LINHAS - 1 - linha) + centro +
+                                            (self.guarda if linha == LINHAS - 1 else 0))
+            tabela[PEDRA_PRETA][indice] = -(self.avanco * linha + centro +
+                                            (self.guarda if linha == 0 else 0))
+            tabela[DAMA_BRANCA][indice] = centro
+            tabela[DAMA_PRETA][indice] = -centro
+        return tabela
+
+PESOS_PADRAO = PesosAvaliacao.carregar()
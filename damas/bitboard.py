@@ -0,0 +1,332 @@
+"""Tabuleiro em bitboards de 32 bits (um bit por casa escura)"""
+from .constantes import (LINHAS, COLUNAS, VAZIO, PEDRA_BRANCA, PEDRA_PRETA, DAMA_BRANCA,
+                         DAMA_PRETA, DIRECOES, MASCARA_TOTAL, indice_casa,
+                         COORDENADAS, ZOBRIST)
+from .tabuleiro import Tabuleiro
+
+def _criar_vizinhos():
+    """Calcula, para cada direção, o índice da casa vizinha (-1 se fora do tabuleiro)"""
+    vizinhos = []
+    for dlinha, dcoluna in DIRECOES:
+        tabela = []
+        for linha, coluna in COORDENADAS:
+            nova_linha, nova_coluna = linha + dlinha, coluna + dcoluna
+            if 0 <= nova_linha < LINHAS and 0 <= nova_coluna < COLUNAS:
+                tabela.append(indice_casa(nova_linha, nova_coluna))
+            else:
+                tabela.append(-1)
+        vizinhos.append(tabela)
+    return vizinhos
+
+def _criar_deslocamentos():
+    """Agrupa as casas de cada direção pelo deslocamento de bits até o vizinho"""
+    deslocamentos = []
+    for tabela in VIZINHOS:
+        grupos = {}
+        for origem, destino in enumerate(tabela):
+            if destino >= 0:
+                grupos[destino - origem] = grupos.get(destino - origem, 0) | (1 << origem)
+        deslocamentos.append(sorted(grupos.items()))
+    return deslocamentos
+
+VIZINHOS = _criar_vizinhos()
+DESLOCAMENTOS = _criar_deslocamentos()
+OPOSTA = [3, 2, 1, 0]  # Índice da direção contrária em DIRECOES
+
+# Direções permitidas para cada tipo de peça (índices em DIRECOES)
+DIRECOES_PECA = {
+    PEDRA_BRANCA: (0, 1),
+    PEDRA_PRETA: (2, 3),
+    DAMA_BRANCA: (0, 1, 2, 3),
+    DAMA_PRETA: (0, 1, 2, 3),
+}
+
+def deslocar(bitboard, direcao):
+    """Move todas as casas do bitboard uma diagonal na direção indicada"""
+    resultado = 0
+    for delta, mascara in DESLOCAMENTOS[direcao]:
+        if delta > 0:
+            resultado |= (bitboard & mascara) << delta
+        else:
+            resultado |= (bitboard & mascara) >> -delta
+    return resultado
+
+def contar_bits(bitboard):
+    """Conta as casas ocupadas de um bitboard"""
+    return bin(bitboard).count("1")
+
+class TabuleiroBitboard(Tabuleiro):
+    """
+    Tabuleiro representado por três bitboards de 32 bits (brancas, vermelhas e damas).
+    Gera os mesmos movimentos (linha_ini, col_ini, linha_fim, col_fim, capturadas)
+    que Tabuleiro, na mesma ordem, usando deslocamentos e máscaras.
+    """
+    def __init__(self):
+        self.brancas = 0
+        self.vermelhas = 0
+        self.damas = 0
+        self.criar_tabuleiro()
+    
+    def criar_tabuleiro(self):
+        """Cria o tabuleiro inicial: vermelhas nas 3 primeiras linhas, brancas nas 3 últimas"""
+        self.vermelhas = (1 << 12) - 1
+        self.brancas = ((1 << 12) - 1) << 20
+        self.damas = 0
+        self.recalcular()
+    
+    @classmethod
+    def de_bitboards(cls, brancas, vermelhas, damas):
+        """Cria um tabuleiro diretamente a partir dos três bitboards"""
+        if brancas & vermelhas or damas & ~(brancas | vermelhas) or (brancas | vermelhas) & ~MASCARA_TOTAL:
+            raise ValueError("Bitboards inconsistentes")
+        tabuleiro = cls.__new__(cls)
+        tabuleiro.brancas = brancas
+        tabuleiro.vermelhas = vermelhas
+        tabuleiro.damas = damas
+        tabuleiro.recalcular()
+        return tabuleiro
+    
+    def recalcular(self):
+        """Recalcula do zero os valores mantidos de forma incremental (hash Zobrist e valor posicional)"""
+        self.hash = 0
+        self.posicional = 0
+        tabela = self.pesos.tabela
+        # Casas vazias não contribuem: percorre só as ocupadas
+        ocupadas = self.brancas | self.vermelhas
+        while ocupadas:
+            bit = ocupadas & -ocupadas
+            indice = bit.bit_length() - 1
+            peca = self.peca(indice)
+            self.hash ^= ZOBRIST[indice][peca]
+            self.posicional += tabela[peca][indice]
+            ocupadas ^= bit
+    
+    @property
+    def tabuleiro(self):
+        """Matriz 8x8 equivalente (usada pelo desenho e pela seleção de peças)"""
+        matriz = [[VAZIO] * COLUNAS for _ in range(LINHAS)]
+        for indice, (linha, coluna) in enumerate(COORDENADAS):
+            matriz[linha][coluna] = self.peca(indice)
+        return matriz
+    
+    @tabuleiro.setter
+    def tabuleiro(self, matriz):
+        self.brancas = self.vermelhas = self.damas = 0
+        for indice, (linha, coluna) in enumerate(COORDENADAS):
+            peca = matriz[linha][coluna]
+            bit = 1 << indice
+            if peca in (PEDRA_BRANCA, DAMA_BRANCA):
+                self.brancas |= bit
+            elif peca in (PEDRA_PRETA, DAMA_PRETA):
+                self.vermelhas |= bit
+            if peca in (DAMA_BRANCA, DAMA_PRETA):
+                self.damas |= bit
+        self.recalcular()
+    
+    def peca(self, indice):
+        """Retorna o código da peça na casa escura de índice indicado"""
+        bit = 1 << indice
+        if self.brancas & bit:
+            return DAMA_BRANCA if self.damas & bit else PEDRA_BRANCA
+        if self.vermelhas & bit:
+            return DAMA_PRETA if self.damas & bit else PEDRA_PRETA
+        return VAZIO
+    
+    def mover(self, movimento):
+        """Executa um movimento no tabuleiro"""
+        linha_inicio, col_inicio, linha_fim, col_fim, pecas_capturadas = movimento
+        
+        indice_inicio = indice_casa(linha_inicio, col_inicio)
+        indice_fim = indice_casa(linha_fim, col_fim)
+        origem = 1 << indice_inicio
+        destino = 1 << indice_fim
+        
+        peca = self.peca(indice_inicio)
+        if peca == VAZIO:
+            raise ValueError(f"Casa de origem vazia: ({linha_inicio}, {col_inicio})")
+        
+        tabela = self.pesos.tabela
+        capturadas = 0
+        for (linha, coluna) in pecas_capturadas:
+            indice = indice_casa(linha, coluna)
+            capturadas |= 1 << indice
+            peca_capturada = self.peca(indice)
+            self.hash ^= ZOBRIST[indice][peca_capturada]
+            self.posicional -= tabela[peca_capturada][indice]
+        self.hash ^= ZOBRIST[indice_inicio][peca] ^ ZOBRIST[indice_fim][peca]
+        self.posicional += tabela[peca][indice_fim] - tabela[peca][indice_inicio]
+        
+        # Move a peça e remove as capturadas
+        if self.brancas & origem:
+            self.brancas = (self.brancas & ~origem) | destino
+            self.vermelhas &= ~capturadas
+        else:
+            self.vermelhas = (self.vermelhas & ~origem) | destino
+            self.brancas &= ~capturadas
+        self.damas &= ~(origem | capturadas)
+        if peca == DAMA_BRANCA or peca == DAMA_PRETA:
+            self.damas |= destino
+        
+        # Verifica se a peça deve se tornar uma dama
+        if peca == PEDRA_BRANCA and linha_fim == 0:
+            self.damas |= destino
+            self.hash ^= ZOBRIST[indice_fim][peca] ^ ZOBRIST[indice_fim][DAMA_BRANCA]
+            self.posicional += tabela[DAMA_BRANCA][indice_fim] - tabela[peca][indice_fim]
+            return True, "Pedra branca virou dama!"
+        elif peca == PEDRA_PRETA and linha_fim == LINHAS - 1:
+            self.damas |= destino
+            self.hash ^= ZOBRIST[indice_fim][peca] ^ ZOBRIST[indice_fim][DAMA_PRETA]
+            self.posicional += tabela[DAMA_PRETA][indice_fim] - tabela[peca][indice_fim]
+            return True, "Pedra vermelha virou dama!"
+        
+        return False, ""
+    
+    def fazer_movimento(self, movimento):
+        """
+        Executa um movimento e retorna o registro para desfazê-lo:
+        (brancas, vermelhas, damas, hash anterior, valor posicional anterior, promoveu)
+        """
+        estado = (self.brancas, self.vermelhas, self.damas, self.hash, self.posicional)
+        promoveu, _ = self.mover(movimento)
+        return estado + (promoveu,)
+    
+    def desfazer_movimento(self, registro):
+        """Desfaz um movimento executado por fazer_movimento"""
+        self.brancas, self.vermelhas, self.damas, self.hash, self.posicional, _ = registro
+    
+    def _pecas_na_direcao(self, jogador, direcao):
+        """Peças do jogador que podem andar na direção indicada"""
+        if jogador == "branco":
+            return self.brancas if direcao < 2 else self.brancas & self.damas
+        return self.vermelhas & self.damas if direcao < 2 else self.vermelhas
+    
+    def get_movimentos_validos(self, jogador):
+        """Retorna todos os movimentos válidos para um jogador"""
+        if jogador == "branco":
+            inimigas = self.vermelhas
+        else:
+            inimigas = self.brancas
+        vazias = ~(self.brancas | self.vermelhas) & MASCARA_TOTAL
+        
+        # Peças que podem capturar: inimiga vizinha com casa vazia logo atrás
+        saltadores = 0
+        moveis = 0
+        for direcao in range(4):
+            pecas = self._pecas_na_direcao(jogador, direcao)
+            if not pecas:
+                continue
+            atras = deslocar(vazias, OPOSTA[direcao])
+            saltadores |= deslocar(atras & inimigas, OPOSTA[direcao]) & pecas
+            moveis |= atras & pecas
+        
+        movimentos = []
+        
+        # Regra da captura obrigatória
+        if saltadores:
+            while saltadores:
+                bit = saltadores & -saltadores
+                saltadores ^= bit
+                movimentos.extend(self._capturas_casa(bit.bit_length() - 1, inimigas, vazias))
+            return movimentos
+        
+        while moveis:
+            bit = moveis & -moveis
+            moveis ^= bit
+            movimentos.extend(self._movimentos_simples(bit.bit_length() - 1, vazias))
+        return movimentos
+    
+    def get_movimentos_peca(self, linha, coluna):
+        """Obtém todos os movimentos válidos para uma peça específica"""
+        indice = indice_casa(linha, coluna)
+        peca = self.peca(indice)
+        if peca == VAZIO:
+            return []
+        
+        inimigas = self.vermelhas if peca in (PEDRA_BRANCA, DAMA_BRANCA) else self.brancas
+        vazias = ~(self.brancas | self.vermelhas) & MASCARA_TOTAL
+        
+        movimentos = self._movimentos_simples(indice, vazias)
+        movimentos.extend(self._capturas_casa(indice, inimigas, vazias))
+        return movimentos
+    
+    def get_capturas_peca(self, linha, coluna, peca, capturadas_anteriores):
+        """Obtém capturas em cadeia para uma peça"""
+        inimigas = self.vermelhas if peca in (PEDRA_BRANCA, DAMA_BRANCA) else self.brancas
+        vazias = ~(self.brancas | self.vermelhas) & MASCARA_TOTAL
+        for (linha_cap, coluna_cap) in capturadas_anteriores:
+            bit = 1 << indice_casa(linha_cap, coluna_cap)
+            inimigas &= ~bit
+            vazias |= bit
+        return self._capturas_casa(indice_casa(linha, coluna), inimigas, vazias, peca,
+                                   list(capturadas_anteriores))
+    
+    def _movimentos_simples(self, indice, vazias):
+        """Movimentos sem captura da peça na casa indicada"""
+        linha, coluna = COORDENADAS[indice]
+        movimentos = []
+        for direcao in DIRECOES_PECA[self.peca(indice)]:
+            destino = VIZINHOS[direcao][indice]
+            if destino >= 0 and (vazias >> destino) & 1:
+                linha_dest, coluna_dest = COORDENADAS[destino]
+                movimentos.append((linha, coluna, linha_dest, coluna_dest, []))
+        return movimentos
+    
+    def _capturas_casa(self, indice, inimigas, vazias, peca=None, caminho=None):
+        """Sequências máximas de captura da peça na casa indicada"""
+        if peca is None:
+            peca = self.peca(indice)
+        direcoes = DIRECOES_PECA[peca]
+        linha, coluna = COORDENADAS[indice]
+        caminho = caminho if caminho is not None else []
+        movimentos = []
+        
+        def explorar(casa, inimigas, vazias):
+            # Retorna True se encontrou ao menos uma captura a partir de 'casa'
+            capturou = False
+            for direcao in direcoes:
+                meio = VIZINHOS[direcao][casa]
+                if meio < 0 or not (inimigas >> meio) & 1:
+                    continue
+                destino = VIZINHOS[direcao][meio]
+                if destino < 0 or not (vazias >> destino) & 1:
+                    continue
+                
+                capturou = True
+                caminho.append(COORDENADAS[meio])
+                bit = 1 << meio
+                # A peça capturada sai do tabuleiro e a casa de partida fica vazia
+                if not explorar(destino, inimigas & ~bit, vazias | bit | (1 << casa)):
+                    linha_dest, coluna_dest = COORDENADAS[destino]
+                    movimentos.append((linha, coluna, linha_dest, coluna_dest, list(caminho)))
+                caminho.pop()
+            return capturou
+        
+        explorar(indice, inimigas, vazias)
+        return movimentos
+    
+    def mobilidade(self):
+        """Número de movimentos simples disponíveis para cada lado: (brancas, vermelhas)"""
+        vazias = ~(self.brancas | self.vermelhas) & MASCARA_TOTAL
+        brancas = vermelhas = 0
+        for direcao in range(4):
+            brancas += contar_bits(deslocar(self._pecas_na_direcao("branco", direcao), direcao) & vazias)
+            vermelhas += contar_bits(deslocar(self._pecas_na_direcao("vermelho", direcao), direcao) & vazias)
+        return brancas, vermelhas
+    
+    def contar_pecas(self):
+        """Conta o número de peças de cada tipo"""
+        damas_brancas = contar_bits(self.brancas & self.damas)
+        damas_pretas = contar_bits(self.vermelhas & self.damas)
+        return (contar_bits(self.brancas) - damas_brancas, contar_bits(self.vermelhas) - damas_pretas,
+                damas_brancas, damas_pretas)
+    
+    def copiar(self):
+        """Cria uma cópia do tabuleiro (apenas três inteiros)"""
+        novo_tabuleiro = TabuleiroBitboard.__new__(TabuleiroBitboard)
+        novo_tabuleiro.brancas = self.brancas
+        novo_tabuleiro.vermelhas = self.vermelhas
+        novo_tabuleiro.damas = self.damas
+        novo_tabuleiro.hash = self.hash
+        novo_tabuleiro.posicional = self.posicional
+        novo_tabuleiro.pesos = self.pesos
+        return novo_tabuleiro
@@ -0,0 +1,791 @@
+"""Busca minimax com poda alfa-beta, tabela de transposição e busca paralela"""
+import json
+import os
+import threading
+import time
+
+from .constantes import chave_posicao
+
+# Tipos de valor guardados na tabela de transposição
+EXATO = 0
+LIMITE_INFERIOR = 1  # A busca teve corte beta: o valor real é >= ao guardado
+LIMITE_SUPERIOR = 2  # Nenhum movimento superou alpha: o valor real é <= ao guardado
+
+class TabelaTransposicao:
+    """
+    Tabela de transposição de tamanho fixo indexada pela chave Zobrist.
+    Cada entrada é (chave, profundidade, valor, tipo, melhor movimento, geração).
+    Políticas de substituição: "profundidade" (mantém a entrada mais profunda da
+    busca atual) ou "sempre" (a entrada nova sempre substitui a antiga).
+    """
+    BYTES_POR_ENTRADA = 256  # Estimativa do custo de uma entrada em Python
+    POLITICAS = ("profundidade", "sempre")
+    
+    def __init__(self, memoria_mb=16, politica="profundidade"):
+        if politica not in self.POLITICAS:
+            raise ValueError(f"Política de substituição desconhecida: {politica}")
+        self.politica = politica
+        self.tamanho = max(1, int(memoria_mb * 1024 * 1024) // self.BYTES_POR_ENTRADA)
+        self.entradas = [None] * self.tamanho
+        self.geracao = 0
+        self.acertos = 0
+        self.falhas = 0
+    
+    def nova_busca(self):
+        """Marca o início de uma nova busca: entradas antigas passam a ser substituíveis"""
+        self.geracao += 1
+    
+    def limpar(self):
+        """Apaga todas as entradas e zera os contadores"""
+        self.entradas = [None] * self.tamanho
+        self.acertos = self.falhas = 0
+    
+    def buscar(self, chave):
+        """Retorna a entrada da chave ou None"""
+        entrada = self.entradas[chave % self.tamanho]
+        if entrada is not None and entrada[0] == chave:
+            self.acertos += 1
+            return entrada
+        self.falhas += 1
+        return None
+    
+    def guardar(self, chave, profundidade, valor, tipo, movimento):
+        """Guarda o resultado de uma busca respeitando a política de substituição"""
+        indice = chave % self.tamanho
+        atual = self.entradas[indice]
+        if (self.politica == "profundidade" and atual is not None and
+                atual[5] == self.geracao and atual[1] > profundidade):
+            return
+        self.entradas[indice] = (chave, profundidade, valor, tipo, movimento, self.geracao)
+    
+    def taxa_acertos(self):
+        """Fração das consultas que encontraram a posição"""
+        total = self.acertos + self.falhas
+        return self.acertos / total if total else 0.0
+
+PROFUNDIDADE_MAXIMA = 64  # Limite do aprofundamento iterativo
+VITORIA = 10000           # Valor de uma vitória (descontado pela distância em plies)
+# Valores além deste são vitórias; a margem cobre a busca e as distâncias das tabelas de finais
+LIMIAR_VITORIA = VITORIA - 1000
+INTERVALO_RELOGIO = 256   # Nós visitados entre duas consultas ao relógio
+
+def valor_derrota(jogador, ply):
+    """Valor (do ponto de vista das brancas) de uma posição em que 'jogador' não pode jogar"""
+    # Vitórias mais próximas da raiz valem mais
+    return -(VITORIA - ply) if jogador == "branco" else VITORIA - ply
+
+def valor_para_tabela(valor, ply):
+    """Converte valores de vitória para a distância a partir do nó antes de guardar"""
+    if valor >= LIMIAR_VITORIA:
+        return valor + ply
+    if valor <= -LIMIAR_VITORIA:
+        return valor - ply
+    return valor
+
+def valor_da_tabela(valor, ply):
+    """Inverso de valor_para_tabela: distância a partir da raiz"""
+    if valor >= LIMIAR_VITORIA:
+        return valor - ply
+    if valor <= -LIMIAR_VITORIA:
+        return valor + ply
+    return valor
+
+class EstatisticasBusca:
+    """
+    Números de uma busca: nós, folhas avaliadas, cortes beta (e quantos vieram do
+    primeiro movimento), consultas à tabela de transposição, ply mais profundo
+    alcançado e, por iteração, (profundidade, nós, tempo em ms).
+    """
+    def __init__(self, jogador, profundidade_pedida=None, tempo_limite_ms=None):
+        self.jogador = jogador
+        self.profundidade_pedida = profundidade_pedida
+        self.tempo_limite_ms = tempo_limite_ms
+        self.movimento = None
+        self.valor = None
+        self.do_livro = False  # Movimento tirado do livro de aberturas (sem busca)
+        self.da_tabela_final = False  # Movimento tirado das tabelas de finais (sem busca)
+        self.profundidade = 0  # Última profundidade completa
+        self.nos = 0
+        self.folhas = 0
+        self.cortes = 0
+        self.cortes_primeiro = 0
+        self.acertos_tt = 0
+        self.consultas_tt = 0
+        self.ply_maximo = 0
+        self.acertos_finais = 0  # Nós resolvidos pelas tabelas de finais
+        self.nos_quiescencia = 0  # Nós da busca de capturas além da profundidade (incluídos em nos)
+        self.tempo_ms = 0.0
+        self.iteracoes = []
+    
+    def nos_por_segundo(self):
+        return self.nos / (self.tempo_ms / 1000) if self.tempo_ms else 0.0
+    
+    def taxa_corte_primeiro(self):
+        """Fração dos cortes feitos pelo primeiro movimento (mede a ordenação)"""
+        return self.cortes_primeiro / self.cortes if self.cortes else 0.0
+    
+    def taxa_acertos_tt(self):
+        return self.acertos_tt / self.consultas_tt if self.consultas_tt else 0.0
+    
+    def fator_ramificacao(self):
+        """Fator de ramificação efetivo: b tal que b ** profundidade = nós da última iteração"""
+        if not self.iteracoes:
+            return 0.0
+        profundidade, nos, _ = self.iteracoes[-1]
+        return nos ** (1 / profundidade) if profundidade and nos else 0.0
+    
+    def para_dict(self):
+        """Dicionário serializável (movimento como lista, taxas já calculadas)"""
+        return {
+            "jogador": self.jogador,
+            "movimento": list(self.movimento[:4]) + [list(self.movimento[4])] if self.movimento else None,
+            "valor": self.valor,
+            "do_livro": self.do_livro,
+            "da_tabela_final": self.da_tabela_final,
+            "profundidade": self.profundidade,
+            "profundidade_pedida": self.profundidade_pedida,
+            "tempo_limite_ms": self.tempo_limite_ms,
+            "nos": self.nos,
+            "folhas": self.folhas,
+            "cortes": self.cortes,
+            "taxa_corte_primeiro": round(self.taxa_corte_primeiro(), 4),
+            "fator_ramificacao": round(self.fator_ramificacao(), 3),
+            "taxa_acertos_tt": round(self.taxa_acertos_tt(), 4),
+            "ply_maximo": self.ply_maximo,
+            "acertos_finais": self.acertos_finais,
+            "nos_quiescencia": self.nos_quiescencia,
+            "tempo_ms": round(self.tempo_ms, 3),
+            "nos_por_segundo": round(self.nos_por_segundo()),
+            "iteracoes": [{"profundidade": profundidade, "nos": nos, "tempo_ms": round(tempo_ms, 3)}
+                          for profundidade, nos, tempo_ms in self.iteracoes],
+        }
+    
+    def para_json(self):
+        return json.dumps(self.para_dict(), separators=(",", ":"))
+    
+    def resumo(self):
+        """Texto mostrado no console pela IA verbosa"""
+        if self.do_livro:
+            return f"IA jogou do livro de aberturas em {self.tempo_ms:.2f} ms"
+        if self.da_tabela_final:
+            return f"IA jogou pelas tabelas de finais em {self.tempo_ms:.2f} ms (valor {self.valor})"
+        linhas = [
+            f"IA escolheu um movimento em {self.tempo_ms / 1000:.2f} segundos (profundidade {self.profundidade})",
+            f"Valor da jogada: {self.valor:.2f} | Nós visitados: {self.nos} ({self.nos_por_segundo():.0f} nós/s)",
+            f"Cortes: {self.cortes} ({self.taxa_corte_primeiro():.0%} no primeiro movimento) | "
+            f"Ramificação efetiva: {self.fator_ramificacao():.2f} | Ply máximo: {self.ply_maximo}",
+        ]
+        if self.nos_quiescencia:
+            linhas.append(f"Quiescência: {self.nos_quiescencia} nós ({self.nos_quiescencia / self.nos:.0%})")
+        if self.consultas_tt:
+            linhas.append(f"Tabela de transposição: {self.acertos_tt}/{self.consultas_tt} acertos")
+        if self.acertos_finais:
+            linhas.append(f"Tabelas de finais: {self.acertos_finais} posições resolvidas")
+        return "\n".join(linhas)
+
+def relatorio_json(arquivo):
+    """Relatório para IA(relatorio=...) que escreve cada busca como uma linha JSON em 'arquivo'"""
+    def relatar(estatisticas):
+        arquivo.write(estatisticas.para_json() + "\n")
+        arquivo.flush()
+    return relatar
+
+class TempoEsgotado(Exception):
+    """Interrompe a busca quando o tempo disponível acaba"""
+
+class BuscaCancelada(Exception):
+    """Interrompe a busca a pedido de outra thread (reinício ou saída do jogo)"""
+
+class IA:
+    """Busca Minimax com poda Alpha-Beta, tabela de transposição e ordenação de movimentos"""
+    def __init__(self, memoria_tt_mb=16, politica_tt="profundidade", ordenar=True, pesos=None,
+                 verboso=True, relatorio=None, livro=None, tabelas=None, quiescencia=True):
+        # A tabela sobrevive entre jogadas e partidas (resetar não a limpa)
+        self.memoria_tt_mb = memoria_tt_mb
+        self.politica_tt = politica_tt
+        self.tt = TabelaTransposicao(memoria_tt_mb, politica_tt)
+        self.executor_paralelo = None  # ProcessPoolExecutor da busca paralela (criado sob demanda)
+        self.trabalhadores = 0
+        self.pesos = pesos  # PesosAvaliacao próprios (None usa os do tabuleiro)
+        self.ordenar = ordenar  # False mantém a ordem de geração (para comparar nós)
+        # Nas folhas, continua pelas capturas até a posição ficar quieta (False para comparar)
+        self.quiescencia = quiescencia
+        self.verboso = verboso  # False não imprime o resumo de cada busca
+        # Função chamada com as EstatisticasBusca de cada busca (substitui o resumo impresso)
+        self.relatorio = relatorio
+        self.estatisticas = None  # Estatísticas da última busca
+        self.livro = livro  # LivroAberturas consultado antes de cada busca (ou None)
+        self.tabelas = tabelas  # TabelasFinais consultadas na raiz e nos nós da busca (ou None)
+        self.killers = [[None, None] for _ in range(PROFUNDIDADE_MAXIMA + 1)]
+        self.historia = {}  # (linha_ini, col_ini, linha_fim, col_fim) -> pontuação
+        self.nos = 0
+        self.folhas = 0
+        self.cortes = 0
+        self.cortes_primeiro = 0
+        self.ply_maximo = 0
+        self.acertos_finais = 0
+        self.nos_quiescencia = 0
+        self.prazo = None  # Instante (time.perf_counter) em que a busca deve parar
+        self.inicio_busca = None  # Instante em que começou a busca em andamento
+        self.cancelamento = None  # threading.Event que cancela a busca em andamento
+        # Ponderação confirmada antes de a busca chegar ao cálculo do prazo:
+        # (cancelamento da busca a que se refere, tempo em ms), ou None
+        self.prazo_confirmado = None
+        self.ponderando = False  # A busca em andamento pondera e já calculou o prazo
+        self.trava_ponderacao = threading.Lock()
+        # Ordem dos movimentos da raiz deixada pela última busca: (chave, movimentos)
+        self.ordem_raiz = (None, [])
+    
+    def minimax(self, tabuleiro, profundidade, alpha, beta, maximizando, ply=1):
+        """
+        Implementação do algoritmo Minimax com poda Alpha-Beta.
+        Os valores são do ponto de vista das brancas: as brancas maximizam e as
+        vermelhas minimizam (ply é a distância até a raiz, usada pelos killer moves)
+        """
+        self.nos += 1
+        if ply > self.ply_maximo:
+            self.ply_maximo = ply
+        if self.nos % INTERVALO_RELOGIO == 0:
+            self._verificar_interrupcao()
+        
+        jogador = "branco" if maximizando else "vermelho"
+        chave = chave_posicao(tabuleiro, jogador)
+        alpha_original, beta_original = alpha, beta
+        
+        # Consulta a tabela de transposição
+        movimento_hash = None
+        entrada = self.tt.buscar(chave)
+        if entrada is not None:
+            _, profundidade_tt, valor_tt, tipo, movimento_hash, _ = entrada
+            valor_tt = valor_da_tabela(valor_tt, ply)
+            if profundidade_tt >= profundidade:
+                if tipo == EXATO:
+                    return valor_tt
+                if tipo == LIMITE_INFERIOR:
+                    alpha = max(alpha, valor_tt)
+                else:
+                    beta = min(beta, valor_tt)
+                if beta <= alpha:
+                    return valor_tt
+        
+        # Poucas peças: resultado exato das tabelas de finais
+        if self.tabelas is not None:
+            sondagem = self.tabelas.sondar(tabuleiro, jogador)
+            if sondagem is not None:
+                self.acertos_finais += 1
+                return self._valor_final(sondagem, jogador, ply)
+        
+        # Condição de parada: quem joga e não tem movimentos (nem peças) perde.
+        # Os movimentos gerados aqui são os mesmos usados para expandir o nó.
+        movimentos = tabuleiro.get_movimentos_validos(jogador)
+        if not movimentos:
+            return valor_derrota(jogador, ply)
+        if profundidade == 0:
+            if self.quiescencia:
+                return self._quiescencia(tabuleiro, alpha, beta, maximizando, ply, movimentos)
+            self.folhas += 1
+            return tabuleiro.avaliar()
+        
+        movimentos = self.ordenar_movimentos(movimentos, ply, movimento_hash)
+        melhor_movimento = None
+        
+        if maximizando:
+            # Brancas querem maximizar a própria vantagem
+            max_eval = float('-inf')
+            
+            for movimento in movimentos:
+                registro = tabuleiro.fazer_movimento(movimento)
+                eval = self.minimax(tabuleiro, profundidade - 1, alpha, beta, False, ply + 1)
+                tabuleiro.desfazer_movimento(registro)
+                if eval > max_eval:
+                    max_eval = eval
+                    melhor_movimento = movimento
+                
+                # Poda Alpha-Beta
+                alpha = max(alpha, eval)
+                if beta <= alpha:
+                    self._registrar_corte(movimento, profundidade, ply, movimento is movimentos[0])
+                    break
+            
+            melhor_valor = max_eval
+        else:
+            # Vermelhas querem minimizar a vantagem das brancas
+            min_eval = float('inf')
+            
+            for movimento in movimentos:
+                registro = tabuleiro.fazer_movimento(movimento)
+                eval = self.minimax(tabuleiro, profundidade - 1, alpha, beta, True, ply + 1)
+                tabuleiro.desfazer_movimento(registro)
+                if eval < min_eval:
+                    min_eval = eval
+                    melhor_movimento = movimento
+                
+                # Poda Alpha-Beta
+                beta = min(beta, eval)
+                if beta <= alpha:
+                    self._registrar_corte(movimento, profundidade, ply, movimento is movimentos[0])
+                    break
+            
+            melhor_valor = min_eval
+        
+        # Guarda o resultado com o tipo de limite em relação à janela original
+        if melhor_valor <= alpha_original:
+            tipo = LIMITE_SUPERIOR
+        elif melhor_valor >= beta_original:
+            tipo = LIMITE_INFERIOR
+        else:
+            tipo = EXATO
+        self.tt.guardar(chave, profundidade, valor_para_tabela(melhor_valor, ply), tipo, melhor_movimento)
+        
+        return melhor_valor
+    
+    def _quiescencia(self, tabuleiro, alpha, beta, maximizando, ply, movimentos=None):
+        """
+        Continua a busca de uma folha só pelas capturas, até a posição ficar quieta.
+        Como a captura é obrigatória, quem tem uma não pode parar na avaliação; numa
+        posição quieta, a avaliação é o valor do nó (stand-pat). As cadeias terminam
+        porque cada captura tira peças do tabuleiro. 'movimentos' vem do minimax na
+        própria folha, que já contou o nó.
+        """
+        if movimentos is None:
+            self.nos += 1
+            self.nos_quiescencia += 1
+            if ply > self.ply_maximo:
+                self.ply_maximo = ply
+            if self.nos % INTERVALO_RELOGIO == 0:
+                self._verificar_interrupcao()
+            jogador = "branco" if maximizando else "vermelho"
+            if self.tabelas is not None:
+                sondagem = self.tabelas.sondar(tabuleiro, jogador)
+                if sondagem is not None:
+                    self.acertos_finais += 1
+                    return self._valor_final(sondagem, jogador, ply)
+            movimentos = tabuleiro.get_movimentos_validos(jogador)
+            if not movimentos:
+                return valor_derrota(jogador, ply)
+        
+        # Sem captura (a geração só traz capturas quando há alguma): posição quieta
+        if not movimentos[0][4]:
+            self.folhas += 1
+            return tabuleiro.avaliar()
+        
+        movimentos = self.ordenar_movimentos(movimentos, ply)
+        melhor_valor = float('-inf') if maximizando else float('inf')
+        for movimento in movimentos:
+            registro = tabuleiro.fazer_movimento(movimento)
+            valor = self._quiescencia(tabuleiro, alpha, beta, not maximizando, ply + 1)
+            tabuleiro.desfazer_movimento(registro)
+            if maximizando:
+                melhor_valor = max(melhor_valor, valor)
+                alpha = max(alpha, valor)
+            else:
+                melhor_valor = min(melhor_valor, valor)
+                beta = min(beta, valor)
+            if beta <= alpha:
+                self._registrar_corte(movimento, 0, ply, movimento is movimentos[0])
+                break
+        return melhor_valor
+    
+    def _verificar_interrupcao(self):
+        """Levanta BuscaCancelada ou TempoEsgotado se a busca deve parar"""
+        if self.cancelamento is not None and self.cancelamento.is_set():
+            raise BuscaCancelada()
+        if self.prazo is not None and time.perf_counter() >= self.prazo:
+            raise TempoEsgotado()
+    
+    def ordenar_movimentos(self, movimentos, ply, movimento_hash=None):
+        """
+        Ordena os movimentos para antecipar os cortes Alpha-Beta: primeiro o movimento
+        da tabela de transposição, depois as cadeias de captura mais longas, os killer
+        moves deste ply e por fim a pontuação da heurística de história
+        """
+        if not self.ordenar or len(movimentos) < 2:
+            return movimentos
+        killers = self.killers[ply] if ply < len(self.killers) else (None, None)
+        
+        def prioridade(movimento):
+            if movimento == killers[0]:
+                killer = 2
+            elif movimento == killers[1]:
+                killer = 1
+            else:
+                killer = 0
+            return (movimento == movimento_hash, len(movimento[4]), killer,
+                    self.historia.get(movimento[:4], 0))
+        
+        return sorted(movimentos, key=prioridade, reverse=True)
+    
+    def _registrar_corte(self, movimento, profundidade, ply, primeiro):
+        """Conta o corte e atualiza killer moves e história com o movimento que o causou"""
+        self.cortes += 1
+        if primeiro:
+            self.cortes_primeiro += 1
+        if movimento[4] or not self.ordenar:
+            return  # Capturas já são ordenadas pelo tamanho da cadeia
+        if ply < len(self.killers):
+            killers = self.killers[ply]
+            if movimento != killers[0]:
+                killers[1] = killers[0]
+                killers[0] = movimento
+        chave = movimento[:4]
+        self.historia[chave] = self.historia.get(chave, 0) + profundidade * profundidade
+    
+    def _nova_busca(self):
+        """Prepara as heurísticas para uma nova busca"""
+        self.tt.nova_busca()
+        self.nos = self.folhas = self.cortes = self.cortes_primeiro = self.ply_maximo = 0
+        self.acertos_finais = self.nos_quiescencia = 0
+        self.prazo = None  # Descarta um prazo dado depois do fim de uma ponderação
+        self.killers = [[None, None] for _ in range(PROFUNDIDADE_MAXIMA + 1)]
+        # A história envelhece em vez de ser apagada
+        self.historia = {chave: valor // 2 for chave, valor in self.historia.items() if valor > 1}
+    
+    def nova_partida(self):
+        """Esquece o que foi aprendido em partidas anteriores (tabela, história e ordem da raiz)"""
+        self.tt.limpar()
+        self.historia = {}
+        self.ordem_raiz = (None, [])
+    
+    def movimento_esperado(self, tabuleiro, jogador):
+        """
+        Resposta esperada de 'jogador' na posição: o melhor movimento guardado na
+        tabela de transposição pela última busca, ou None se não houver
+        """
+        entrada = self.tt.buscar(chave_posicao(tabuleiro, jogador))
+        if entrada is None or entrada[4] is None:
+            return None
+        # Protege contra colisões de chave
+        return entrada[4] if entrada[4] in tabuleiro.get_movimentos_validos(jogador) else None
+    
+    def melhor_movimento_ia(self, tabuleiro, profundidade=3, tempo_limite_ms=None, jogador="vermelho",
+                            cancelamento=None, ponderar=False):
+        """
+        Encontra o melhor movimento para 'jogador' (por padrão a IA, vermelhas) usando Minimax.
+        Igual a buscar(), mas retorna só o movimento.
+        """
+        return self.buscar(tabuleiro, profundidade, tempo_limite_ms, jogador, cancelamento, ponderar)[0]
+    
+    def buscar(self, tabuleiro, profundidade=3, tempo_limite_ms=None, jogador="vermelho", cancelamento=None,
+               ponderar=False):
+        """
+        Busca o melhor movimento para 'jogador' e retorna (movimento, EstatisticasBusca).
+        Com tempo_limite_ms, usa aprofundamento iterativo (profundidade 1, 2, 3...)
+        e retorna o melhor movimento da última iteração completa.
+        Se o threading.Event 'cancelamento' for acionado, levanta BuscaCancelada.
+        Com ponderar=True (busca na vez do adversário), a busca por tempo só ganha
+        prazo quando outra thread chama confirmar_ponderacao().
+        """
+        if self.verboso and self.relatorio is None:
+            if ponderar:
+                print("\nIA pensando na vez do adversário...")
+            elif tempo_limite_ms is None:
+                print(f"\nIA pensando (profundidade {profundidade})...")
+            else:
+                print(f"\nIA pensando (até {tempo_limite_ms} ms)...")
+        tempo_inicio = time.perf_counter()
+        self._nova_busca()
+        self.cancelamento = cancelamento
+        self.inicio_busca = tempo_inicio
+        acertos, falhas = self.tt.acertos, self.tt.falhas
+        estatisticas = EstatisticasBusca(jogador, None if tempo_limite_ms else profundidade, tempo_limite_ms)
+        self.estatisticas = estatisticas
+        
+        movimentos = tabuleiro.get_movimentos_validos(jogador)
+        
+        if not movimentos:
+            return None, estatisticas
+        
+        # Posição conhecida do livro de aberturas: joga sem buscar
+        if self.livro is not None:
+            movimento = self.livro.movimento(tabuleiro, jogador, movimentos)
+            if movimento is not None:
+                estatisticas.movimento = movimento
+                estatisticas.do_livro = True
+                self._coletar_estatisticas(estatisticas, tempo_inicio, 0, 0)
+                return movimento, estatisticas
+        
+        # A busca altera uma única cópia no lugar (fazer/desfazer movimento)
+        tabuleiro = tabuleiro.copiar()
+        if self.pesos is not None and tabuleiro.pesos is not self.pesos:
+            tabuleiro.definir_pesos(self.pesos)
+        chave = chave_posicao(tabuleiro, jogador)
+        
+        # Final coberto pelas tabelas: vitória ou derrota se jogam direto; no empate,
+        # a busca escolhe só entre os movimentos que mantêm o empate
+        if self.tabelas is not None and self.tabelas.sondar(tabuleiro, jogador) is not None:
+            movimento, valor, movimentos = self._movimento_final(tabuleiro, movimentos, jogador)
+            if movimento is not None or len(movimentos) == 1:
+                estatisticas.movimento = movimento or movimentos[0]
+                estatisticas.valor = valor
+                estatisticas.da_tabela_final = True
+                self._coletar_estatisticas(estatisticas, tempo_inicio, 0, 0)
+                return estatisticas.movimento, estatisticas
+        
+        # Reaproveita a ordem deixada por uma busca anterior nesta posição
+        chave_ordem, ordem = self.ordem_raiz
+        if chave_ordem == chave:
+            movimentos = [m for m in ordem if m in movimentos] + [m for m in movimentos if m not in ordem]
+        else:
+            entrada = self.tt.buscar(chave)
+            movimentos = self.ordenar_movimentos(movimentos, 0, entrada[4] if entrada else None)
+        
+        try:
+            if tempo_limite_ms is None:
+                melhor_movimento, melhor_valor, _ = self._buscar_raiz(tabuleiro, movimentos, profundidade, jogador)
+                profundidade_completa = profundidade
+                estatisticas.iteracoes.append((profundidade, self.nos, (time.perf_counter() - tempo_inicio) * 1000))
+            else:
+                melhor_movimento, melhor_valor = movimentos[0], tabuleiro.avaliar()
+                profundidade_completa = 0
+                with self.trava_ponderacao:
+                    if not ponderar:
+                        self.prazo = tempo_inicio + tempo_limite_ms / 1000
+                    elif self.prazo_confirmado is not None and self.prazo_confirmado[0] is cancelamento:
+                        # Confirmada antes de chegar aqui: o prazo já vale
+                        self.prazo = tempo_inicio + self.prazo_confirmado[1] / 1000
+                    else:
+                        self.prazo = None
+                    self.prazo_confirmado = None
+                    self.ponderando = ponderar
+                try:
+                    # Com um único movimento não há o que buscar
+                    for prof in range(1, PROFUNDIDADE_MAXIMA + 1 if len(movimentos) > 1 else 1):
+                        valores = {}
+                        nos_antes, inicio_iteracao = self.nos, time.perf_counter()
+                        try:
+                            melhor_movimento, melhor_valor, _ = self._buscar_raiz(tabuleiro, movimentos, prof,
+                                                                                  jogador, valores)
+                        finally:
+                            # Mesmo numa iteração interrompida, os movimentos já avaliados
+                            # passam à frente na ordem da próxima busca
+                            movimentos = self._ordenar_raiz(movimentos, valores, jogador)
+                        profundidade_completa = prof
+                        estatisticas.iteracoes.append((prof, self.nos - nos_antes,
+                                                       (time.perf_counter() - inicio_iteracao) * 1000))
+                except TempoEsgotado:
+                    pass
+                finally:
+                    with self.trava_ponderacao:
+                        self.prazo = None
+                        self.ponderando = False
+        finally:
+            self.cancelamento = None
+            self.inicio_busca = None
+        
+        self.ordem_raiz = (chave, movimentos)
+        
+        estatisticas.movimento = melhor_movimento
+        estatisticas.valor = melhor_valor
+        estatisticas.profundidade = profundidade_completa
+        acertos = self.tt.acertos - acertos
+        self._coletar_estatisticas(estatisticas, tempo_inicio, acertos, acertos + self.tt.falhas - falhas)
+        return melhor_movimento, estatisticas
+    
+    def confirmar_ponderacao(self, tempo_limite_ms, cancelamento=None):
+        """
+        Chamada por outra thread quando o adversário faz o movimento previsto: a busca
+        iniciada com ponderar=True (a do threading.Event 'cancelamento') passa a ter
+        prazo. O tempo já gasto ponderando conta, então a resposta pode sair na hora.
+        Se a busca ainda não começou, o prazo fica guardado e ela o aplica ao começar.
+        """
+        with self.trava_ponderacao:
+            if self.ponderando and (cancelamento is None or cancelamento is self.cancelamento):
+                self.prazo = self.inicio_busca + tempo_limite_ms / 1000
+            else:
+                self.prazo_confirmado = (cancelamento, tempo_limite_ms)
+    
+    def _coletar_estatisticas(self, estatisticas, tempo_inicio, acertos_tt, consultas_tt):
+        """Copia os contadores da busca para 'estatisticas' e as entrega ao relatório"""
+        estatisticas.tempo_ms = (time.perf_counter() - tempo_inicio) * 1000
+        estatisticas.nos = self.nos
+        estatisticas.folhas = self.folhas
+        estatisticas.cortes = self.cortes
+        estatisticas.cortes_primeiro = self.cortes_primeiro
+        estatisticas.ply_maximo = self.ply_maximo
+        estatisticas.acertos_tt = acertos_tt
+        estatisticas.consultas_tt = consultas_tt
+        estatisticas.acertos_finais = self.acertos_finais
+        estatisticas.nos_quiescencia = self.nos_quiescencia
+        if self.relatorio is not None:
+            self.relatorio(estatisticas)
+        elif self.verboso:
+            print(estatisticas.resumo())
+    
+    def _valor_final(self, sondagem, jogador, ply):
+        """Valor de busca (ponto de vista das brancas) de um resultado das tabelas de finais"""
+        resultado, distancia = sondagem
+        if resultado == 0:
+            return 0
+        adversario = "vermelho" if jogador == "branco" else "branco"
+        # A partida acaba 'distancia' lances depois deste nó, com o perdedor sem movimentos
+        return valor_derrota(adversario if resultado > 0 else jogador, ply + distancia)
+    
+    def _movimento_final(self, tabuleiro, movimentos, jogador):
+        """
+        Movimento da raiz pelas tabelas de finais: (movimento, valor, movimentos).
+        Na vitória, o que vence mais rápido; na derrota, o que resiste mais. No
+        empate, movimento é None e 'movimentos' traz só os que mantêm o empate.
+        """
+        adversario = "vermelho" if jogador == "branco" else "branco"
+        sondagens = []
+        for movimento in movimentos:
+            registro = tabuleiro.fazer_movimento(movimento)
+            sondagens.append(self.tabelas.sondar(tabuleiro, adversario))
+            tabuleiro.desfazer_movimento(registro)
+        # Valor de cada movimento do ponto de vista das brancas (um lance além da raiz)
+        valores = [self._valor_final(sondagem, adversario, 1) for sondagem in sondagens]
+        sinal = 1 if jogador == "branco" else -1
+        melhor = max(range(len(movimentos)), key=lambda i: sinal * valores[i])
+        if valores[melhor] != 0:
+            return movimentos[melhor], valores[melhor], movimentos
+        return None, 0, [m for m, valor in zip(movimentos, valores) if valor == 0]
+    
+    def _buscar_raiz(self, tabuleiro, movimentos, profundidade, jogador, valores=None):
+        """Avalia cada movimento da raiz; preenche 'valores' à medida que termina cada um"""
+        maximizando = jogador == "branco"
+        melhor_movimento = None
+        melhor_valor = float('-inf') if maximizando else float('inf')
+        if valores is None:
+            valores = {}
+        
+        # Para cada movimento possível
+        for i, movimento in enumerate(movimentos):
+            registro = tabuleiro.fazer_movimento(movimento)
+            
+            # Avalia o movimento; o melhor valor até aqui serve de limite para os seguintes
+            # (um movimento que não o supera devolve apenas um limite)
+            try:
+                if maximizando:
+                    valor_movimento = self.minimax(tabuleiro, profundidade - 1, melhor_valor, float('inf'), False)
+                else:
+                    valor_movimento = self.minimax(tabuleiro, profundidade - 1, float('-inf'), melhor_valor, True)
+            finally:
+                tabuleiro.desfazer_movimento(registro)
+            valores[i] = valor_movimento
+            
+            # Atualiza melhor movimento
+            if valor_movimento > melhor_valor if maximizando else valor_movimento < melhor_valor:
+                melhor_valor = valor_movimento
+                melhor_movimento = movimento
+        
+        self.tt.guardar(chave_posicao(tabuleiro, jogador), profundidade, melhor_valor, EXATO, melhor_movimento)
+        return melhor_movimento, melhor_valor, valores
+    
+    def _ordenar_raiz(self, movimentos, valores, jogador):
+        """Coloca os movimentos avaliados à frente, do melhor para o pior (ordenação estável)"""
+        sinal = -1 if jogador == "branco" else 1
+        avaliados = sorted(valores, key=lambda i: sinal * valores[i])
+        return [movimentos[i] for i in avaliados] + [m for i, m in enumerate(movimentos) if i not in valores]
+    
+    def avaliar_movimentos(self, tabuleiro, movimentos, profundidade, jogador):
+        """
+        Valor exato de cada movimento (janela completa para todos, não só para o melhor).
+        Bem mais lento que buscar(); usado para construir o livro de aberturas.
+        """
+        self._nova_busca()
+        tabuleiro = tabuleiro.copiar()
+        if self.pesos is not None and tabuleiro.pesos is not self.pesos:
+            tabuleiro.definir_pesos(self.pesos)
+        valores = []
+        for movimento in movimentos:
+            registro = tabuleiro.fazer_movimento(movimento)
+            valores.append(self.minimax(tabuleiro, profundidade - 1, float('-inf'), float('inf'),
+                                        jogador != "branco"))
+            tabuleiro.desfazer_movimento(registro)
+        return valores
+    
+    def melhor_movimento_paralelo(self, tabuleiro, profundidade=3, jogador="vermelho", trabalhadores=None):
+        """
+        Divide os movimentos da raiz entre processos (ProcessPoolExecutor).
+        Cada processo mantém a própria IA e tabela de transposição entre tarefas, e cada
+        movimento é avaliado com janela completa; com um único trabalhador as tarefas
+        rodam sempre na mesma ordem e o resultado é determinístico.
+        """
+        trabalhadores = trabalhadores or os.cpu_count() or 1
+        if self.verboso and self.relatorio is None:
+            print(f"\nIA pensando (profundidade {profundidade}, {trabalhadores} processo(s))...")
+        tempo_inicio = time.perf_counter()
+        self.estatisticas = estatisticas = EstatisticasBusca(jogador, profundidade)
+        
+        movimentos = tabuleiro.get_movimentos_validos(jogador)
+        if not movimentos:
+            return None
+        
+        tabuleiro = tabuleiro.copiar()
+        if self.pesos is not None and tabuleiro.pesos is not self.pesos:
+            tabuleiro.definir_pesos(self.pesos)
+        entrada = self.tt.buscar(chave_posicao(tabuleiro, jogador))
+        movimentos = self.ordenar_movimentos(movimentos, 0, entrada[4] if entrada else None)
+        
+        executor = self._executor_paralelo(trabalhadores)
+        tarefas = [(tabuleiro, movimento, profundidade, jogador) for movimento in movimentos]
+        resultados = list(executor.map(_avaliar_movimento_raiz, tarefas))
+        
+        # Empates ficam com o primeiro movimento na ordem da raiz
+        maximizando = jogador == "branco"
+        melhor_indice = 0
+        for i, (valor, _) in enumerate(resultados):
+            if valor > resultados[melhor_indice][0] if maximizando else valor < resultados[melhor_indice][0]:
+                melhor_indice = i
+        melhor_valor = resultados[melhor_indice][0]
+        self.tt.guardar(chave_posicao(tabuleiro, jogador), profundidade, melhor_valor, EXATO,
+                        movimentos[melhor_indice])
+        
+        # Soma os contadores dos processos
+        contadores = [sum(coluna) for coluna in zip(*(contadores for _, contadores in resultados))]
+        (self.nos, self.folhas, self.cortes, self.cortes_primeiro, _, acertos, consultas,
+         self.acertos_finais, self.nos_quiescencia) = contadores
+        self.ply_maximo = max(contadores[4] for _, contadores in resultados)
+        estatisticas.movimento = movimentos[melhor_indice]
+        estatisticas.valor = melhor_valor
+        estatisticas.profundidade = profundidade
+        estatisticas.iteracoes.append((profundidade, self.nos, (time.perf_counter() - tempo_inicio) * 1000))
+        # Os acertos na tabela são os das tabelas dos processos
+        self._coletar_estatisticas(estatisticas, tempo_inicio, acertos, consultas)
+        
+        return movimentos[melhor_indice]
+    
+    def _executor_paralelo(self, trabalhadores):
+        """Cria (ou reaproveita) o conjunto de processos da busca paralela"""
+        if self.executor_paralelo is None or self.trabalhadores != trabalhadores:
+            # Importado aqui: concurrent.futures.process (multiprocessing) dobraria
+            # o tempo de importação do pacote para quem não usa a busca paralela
+            from concurrent.futures import ProcessPoolExecutor
+            self.encerrar()
+            self.executor_paralelo = ProcessPoolExecutor(
+                max_workers=trabalhadores, initializer=_iniciar_trabalhador,
+                initargs=(self.memoria_tt_mb, self.politica_tt, self.ordenar, self.pesos, self.tabelas,
+                          self.quiescencia))
+            self.trabalhadores = trabalhadores
+        return self.executor_paralelo
+    
+    def encerrar(self):
+        """Encerra os processos da busca paralela, se existirem"""
+        if self.executor_paralelo is not None:
+            self.executor_paralelo.shutdown(wait=True)
+            self.executor_paralelo = None
+            self.trabalhadores = 0
+
+# IA de cada processo da busca paralela (criada por _iniciar_trabalhador)
+_ia_trabalhador = None
+
+def _iniciar_trabalhador(memoria_tt_mb, politica_tt, ordenar, pesos, tabelas, quiescencia):
+    """Inicializa a IA de um processo da busca paralela"""
+    global _ia_trabalhador
+    _ia_trabalhador = IA(memoria_tt_mb, politica_tt, ordenar, pesos, tabelas=tabelas, quiescencia=quiescencia)
+
+def _avaliar_movimento_raiz(tarefa):
+    """
+    Avalia um movimento da raiz com janela completa; retorna (valor, contadores) com
+    contadores = (nós, folhas, cortes, cortes do primeiro movimento, ply máximo,
+    acertos na tabela, consultas à tabela, acertos nas tabelas de finais, nós de quiescência)
+    """
+    tabuleiro, movimento, profundidade, jogador = tarefa
+    ia = _ia_trabalhador
+    ia._nova_busca()
+    acertos, falhas = ia.tt.acertos, ia.tt.falhas
+    tabuleiro.fazer_movimento(movimento)
+    valor = ia.minimax(tabuleiro, profundidade - 1, float('-inf'), float('inf'), jogador != "branco")
+    acertos = ia.tt.acertos - acertos
+    return valor, (ia.nos, ia.folhas, ia.cortes, ia.cortes_primeiro, ia.ply_maximo,
+                   acertos, acertos + ia.tt.falhas - falhas, ia.acertos_finais, ia.nos_quiescencia)
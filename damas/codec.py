@@ -0,0 +1,142 @@
+"""
+Codificação de posições (tabuleiro + lado que joga).
+
+Binário: registro fixo de 13 bytes (bitboards das brancas, das vermelhas e das
+damas, em little-endian, e um byte com o lado que joga), para arquivos com
+milhões de posições.
+
+Texto (FEN do PDN): "W:W21,22,K30:B1,2,3" — lado que joga (W brancas, B vermelhas)
+e as casas de cada cor, com K antes das damas. As casas escuras são numeradas de
+1 a 32 na ordem de leitura a partir das vermelhas (índice do bitboard + 1).
+"""
+import struct
+
+from .constantes import (CASAS_ESCURAS, COORDENADAS, PEDRA_BRANCA, PEDRA_PRETA, DAMA_BRANCA,
+                         DAMA_PRETA, LINHA_PROMOCAO_BRANCAS, LINHA_PROMOCAO_VERMELHAS)
+from .bitboard import TabuleiroBitboard
+
+# brancas, vermelhas, damas (uint32) e lado que joga (uint8)
+REGISTRO = struct.Struct("<IIIB")
+TAMANHO_REGISTRO = REGISTRO.size
+
+VEZ = {"branco": 0, "vermelho": 1}
+JOGADORES = ("branco", "vermelho")
+CORES_FEN = {"branco": "W", "vermelho": "B"}
+
+def bitboards(tabuleiro):
+    """(brancas, vermelhas, damas) de qualquer tabuleiro (bitboard ou matriz)"""
+    if isinstance(tabuleiro, TabuleiroBitboard):
+        return tabuleiro.brancas, tabuleiro.vermelhas, tabuleiro.damas
+    brancas = vermelhas = damas = 0
+    matriz = tabuleiro.tabuleiro
+    for indice, (linha, coluna) in enumerate(COORDENADAS):
+        peca = matriz[linha][coluna]
+        if peca in (PEDRA_BRANCA, DAMA_BRANCA):
+            brancas |= 1 << indice
+        elif peca in (PEDRA_PRETA, DAMA_PRETA):
+            vermelhas |= 1 << indice
+        if peca in (DAMA_BRANCA, DAMA_PRETA):
+            damas |= 1 << indice
+    return brancas, vermelhas, damas
+
+def montar(brancas, vermelhas, damas, classe=TabuleiroBitboard):
+    """Cria um tabuleiro da classe pedida a partir dos bitboards"""
+    tabuleiro = TabuleiroBitboard.de_bitboards(brancas, vermelhas, damas)
+    if classe is TabuleiroBitboard:
+        return tabuleiro
+    outro = classe.__new__(classe)
+    outro.tabuleiro = tabuleiro.tabuleiro
+    outro.recalcular()
+    return outro
+
+def codificar(tabuleiro, jogador):
+    """Registro binário de 13 bytes da posição"""
+    return REGISTRO.pack(*bitboards(tabuleiro), VEZ[jogador])
+
+def decodificar(dados, classe=TabuleiroBitboard):
+    """Inverso de codificar: retorna (tabuleiro, jogador)"""
+    brancas, vermelhas, damas, vez = REGISTRO.unpack(dados)
+    if vez > 1:
+        raise ValueError(f"Lado que joga inválido: {vez}")
+    return montar(brancas, vermelhas, damas, classe), JOGADORES[vez]
+
+def codificar_lote(posicoes):
+    """Concatena os registros de um iterável de (tabuleiro, jogador)"""
+    empacotar = REGISTRO.pack
+    return b"".join([empacotar(*bitboards(tabuleiro), VEZ[jogador]) for tabuleiro, jogador in posicoes])
+
+def ler_registros(dados):
+    """
+    Percorre um bloco de registros sem criar tabuleiros: gera tuplas
+    (brancas, vermelhas, damas, vez). É o caminho mais rápido para filtrar
+    ou converter conjuntos de posições.
+    """
+    if len(dados) % TAMANHO_REGISTRO:
+        raise ValueError(f"O tamanho dos dados não é múltiplo de {TAMANHO_REGISTRO} bytes")
+    return REGISTRO.iter_unpack(dados)
+
+def decodificar_lote(dados, classe=TabuleiroBitboard):
+    """Gera (tabuleiro, jogador) para cada registro de 'dados'"""
+    for brancas, vermelhas, damas, vez in ler_registros(dados):
+        if vez > 1:
+            raise ValueError(f"Lado que joga inválido: {vez}")
+        yield montar(brancas, vermelhas, damas, classe), JOGADORES[vez]
+
+def _casas(bitboard, damas):
+    """Lista de casas do FEN (com K nas damas) em ordem crescente"""
+    casas = []
+    while bitboard:
+        bit = bitboard & -bitboard
+        casas.append(("K" if damas & bit else "") + str(bit.bit_length()))
+        bitboard ^= bit
+    return ",".join(casas)
+
+def para_fen(tabuleiro, jogador):
+    """Texto FEN (PDN) da posição"""
+    brancas, vermelhas, damas = bitboards(tabuleiro)
+    return f"{CORES_FEN[jogador]}:W{_casas(brancas, damas)}:B{_casas(vermelhas, damas)}"
+
+def _ler_casas(texto, fen):
+    """Bitboards (peças, damas) de uma lista de casas do FEN; aceita intervalos 'a-b'"""
+    pecas = damas = 0
+    for item in filter(None, (parte.strip() for parte in texto.split(","))):
+        dama = item[0] in "Kk"
+        if dama:
+            item = item[1:]
+        try:
+            inicio, _, fim = item.partition("-")
+            numeros = range(int(inicio), int(fim or inicio) + 1)
+        except ValueError:
+            raise ValueError(f"Casa inválida '{item}' em '{fen}'") from None
+        for numero in numeros:
+            if not 1 <= numero <= CASAS_ESCURAS:
+                raise ValueError(f"Casa fora do tabuleiro ({numero}) em '{fen}'")
+            bit = 1 << (numero - 1)
+            if pecas & bit:
+                raise ValueError(f"Casa repetida ({numero}) em '{fen}'")
+            pecas |= bit
+            if dama:
+                damas |= bit
+    return pecas, damas
+
+def de_fen(fen, classe=TabuleiroBitboard):
+    """Inverso de para_fen: retorna (tabuleiro, jogador)"""
+    partes = fen.strip().rstrip(".").split(":")
+    if len(partes) != 3 or partes[0].upper() not in ("W", "B"):
+        raise ValueError(f"FEN inválido: '{fen}'")
+    jogador = "branco" if partes[0].upper() == "W" else "vermelho"
+    
+    cores = {}
+    for parte in partes[1:]:
+        cor = parte.strip()[:1].upper()
+        if cor not in ("W", "B") or cor in cores:
+            raise ValueError(f"FEN inválido: '{fen}'")
+        cores[cor] = _ler_casas(parte.strip()[1:], fen)
+    (brancas, damas_brancas), (vermelhas, damas_vermelhas) = cores["W"], cores["B"]
+    if brancas & vermelhas:
+        raise ValueError(f"Casa ocupada pelas duas cores em '{fen}'")
+    # Nenhum lance deixa uma pedra na linha de promoção (ela já teria virado dama)
+    if (brancas & ~damas_brancas & LINHA_PROMOCAO_BRANCAS
+            or vermelhas & ~damas_vermelhas & LINHA_PROMOCAO_VERMELHAS):
+        raise ValueError(f"Pedra na linha de promoção em '{fen}'")
+    return montar(brancas, vermelhas, damas_brancas | damas_vermelhas, classe), jogador
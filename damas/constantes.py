@@ -0,0 +1,54 @@
+"""Constantes das regras, numeração das casas escuras e hashing Zobrist"""
+import random
+
+# Dimensões do tabuleiro
+LINHAS = 8
+COLUNAS = 8
+
+# Constantes do jogo
+VAZIO = 0
+PEDRA_BRANCA = 1
+PEDRA_PRETA = 2
+DAMA_BRANCA = 3
+DAMA_PRETA = 4
+
+# Direções diagonais (mesma ordem usada na geração de movimentos)
+DIRECOES = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+# Passos diagonais e peças inimigas de cada tipo de peça
+PASSOS_PECA = {
+    PEDRA_BRANCA: DIRECOES[:2],  # Move para cima
+    PEDRA_PRETA: DIRECOES[2:],   # Move para baixo
+    DAMA_BRANCA: DIRECOES,
+    DAMA_PRETA: DIRECOES,
+}
+INIMIGAS = {
+    PEDRA_BRANCA: (PEDRA_PRETA, DAMA_PRETA),
+    DAMA_BRANCA: (PEDRA_PRETA, DAMA_PRETA),
+    PEDRA_PRETA: (PEDRA_BRANCA, DAMA_BRANCA),
+    DAMA_PRETA: (PEDRA_BRANCA, DAMA_BRANCA),
+}
+
+# Bitboards: as 32 casas escuras são numeradas de 0 a 31 na ordem de leitura
+CASAS_ESCURAS = 32
+MASCARA_TOTAL = (1 << CASAS_ESCURAS) - 1
+# Pedras não podem estar na linha em que seriam promovidas
+LINHA_PROMOCAO_BRANCAS = 0xF          # Linha 0
+LINHA_PROMOCAO_VERMELHAS = 0xF << 28  # Linha 7
+
+def indice_casa(linha, coluna):
+    """Converte uma casa escura (linha, coluna) no índice do bitboard"""
+    return linha * 4 + coluna // 2
+
+# Coordenadas (linha, coluna) de cada índice do bitboard
+COORDENADAS = [(i // 4, 2 * (i % 4) + (1 - (i // 4) % 2)) for i in range(CASAS_ESCURAS)]
+
+# Hashing Zobrist: uma chave de 64 bits por (casa escura, peça). A semente é fixa
+# para que o hash de uma posição seja o mesmo em qualquer processo.
+_gerador_zobrist = random.Random(20240611)
+ZOBRIST = [[0] + [_gerador_zobrist.getrandbits(64) for _ in range(4)] for _ in range(CASAS_ESCURAS)]
+ZOBRIST_VEZ = _gerador_zobrist.getrandbits(64)  # Combinada à chave quando as vermelhas jogam
+
+def chave_posicao(tabuleiro, jogador):
+    """Chave Zobrist da posição incluindo o lado que joga"""
+    return tabuleiro.hash ^ ZOBRIST_VEZ if jogador == "vermelho" else tabuleiro.hash
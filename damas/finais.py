@@ -0,0 +1,340 @@
+"""
+Tabelas de finais: resultado exato (vitória, derrota ou empate) e distância até
+o fim, em lances (plies), de todas as posições com poucas peças.
+
+Cada combinação de material (pedras e damas de cada lado, a "assinatura") tem
+o seu arquivo, com um byte por posição. O índice de uma posição combina o posto
+(na ordem colexicográfica) das casas de cada grupo de peças e o lado que joga.
+Valor do byte: 0 empate, 1 + d para fim em d lances (d par: quem joga perde;
+d ímpar: quem joga vence) e 255 para índices que não são posições (casas repetidas
+ou pedra na linha de promoção).
+
+A geração é retrógrada dentro de cada assinatura: as posições sem movimentos são
+derrotas, e os resultados se propagam para os predecessores em ordem crescente de
+distância. Capturas e promoções levam a assinaturas já geradas, em ondas por
+(número de peças, número de pedras); as assinaturas de uma onda são geradas em
+paralelo e cada arquivo pronto é mantido, então a geração pode ser retomada.
+
+Uso: python -m damas.finais [--pecas 4] [--processos N] [--diretorio caminho]
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+from array import array
+from collections import OrderedDict
+
+from .constantes import CASAS_ESCURAS, LINHA_PROMOCAO_BRANCAS, LINHA_PROMOCAO_VERMELHAS
+from .bitboard import TabuleiroBitboard, contar_bits
+
+DIRETORIO_TABELAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tabelas_finais")
+PECAS_MAXIMAS = 4  # Padrão da geração (5 peças levam horas em Python)
+
+MARCA = b"DFIN"
+VERSAO = 1
+TAMANHO_CABECALHO = 10  # Marca, versão, assinatura (4 bytes)
+
+EMPATE = 0
+INVALIDA = 255
+DISTANCIA_MAXIMA = 253
+
+# Resultados de sondar(), do ponto de vista de quem joga
+VENCE = 1
+EMPATA = 0
+PERDE = -1
+
+BINOMIAL = [[0] * (PECAS_MAXIMAS + 2) for _ in range(CASAS_ESCURAS + 1)]
+for _n in range(CASAS_ESCURAS + 1):
+    for _k in range(PECAS_MAXIMAS + 2):
+        BINOMIAL[_n][_k] = 1 if _k == 0 else (0 if _n == 0 else BINOMIAL[_n - 1][_k - 1] + BINOMIAL[_n - 1][_k])
+
+def posto(bitboard):
+    """Posto colexicográfico do conjunto de casas do bitboard entre os de mesmo tamanho"""
+    resultado = 0
+    k = 1
+    while bitboard:
+        bit = bitboard & -bitboard
+        resultado += BINOMIAL[bit.bit_length() - 1][k]
+        k += 1
+        bitboard ^= bit
+    return resultado
+
+def conjuntos(k):
+    """Bitboards com k casas, na ordem do posto"""
+    lista = [0] * BINOMIAL[CASAS_ESCURAS][k]
+    for casas in itertools.combinations(range(CASAS_ESCURAS), k):
+        bitboard = sum(1 << casa for casa in casas)
+        lista[posto(bitboard)] = bitboard
+    return lista
+
+def assinatura(brancas, vermelhas, damas):
+    """(pedras brancas, damas brancas, pedras vermelhas, damas vermelhas)"""
+    damas_brancas = contar_bits(brancas & damas)
+    damas_vermelhas = contar_bits(vermelhas & damas)
+    return (contar_bits(brancas) - damas_brancas, damas_brancas,
+            contar_bits(vermelhas) - damas_vermelhas, damas_vermelhas)
+
+def tamanho(assinatura_):
+    """Número de índices (posições possíveis x 2 lados) de uma assinatura"""
+    total = 2
+    for quantidade in assinatura_:
+        total *= BINOMIAL[CASAS_ESCURAS][quantidade]
+    return total
+
+def indice(assinatura_, brancas, vermelhas, damas, jogador):
+    """Índice da posição na tabela da sua assinatura"""
+    pedras_brancas, damas_brancas, pedras_vermelhas, damas_vermelhas = assinatura_
+    resultado = posto(brancas & ~damas)
+    resultado = resultado * BINOMIAL[CASAS_ESCURAS][damas_brancas] + posto(brancas & damas)
+    resultado = resultado * BINOMIAL[CASAS_ESCURAS][pedras_vermelhas] + posto(vermelhas & ~damas)
+    resultado = resultado * BINOMIAL[CASAS_ESCURAS][damas_vermelhas] + posto(vermelhas & damas)
+    return resultado * 2 + (jogador == "vermelho")
+
+def nome_arquivo(diretorio, assinatura_):
+    return os.path.join(diretorio, "finais_{}{}{}{}.tab".format(*assinatura_))
+
+def assinaturas(pecas):
+    """Assinaturas com 2 a 'pecas' peças e ao menos uma de cada lado, em ondas (peças, pedras)"""
+    ondas = {}
+    for total in range(2, pecas + 1):
+        for brancas in range(1, total):
+            for pedras_brancas in range(brancas + 1):
+                for pedras_vermelhas in range(total - brancas + 1):
+                    assinatura_ = (pedras_brancas, brancas - pedras_brancas,
+                                   pedras_vermelhas, total - brancas - pedras_vermelhas)
+                    ondas.setdefault((total, pedras_brancas + pedras_vermelhas), []).append(assinatura_)
+    return [ondas[chave] for chave in sorted(ondas)]
+
+def ler_tabela(caminho, assinatura_):
+    """Lê e valida o arquivo de uma assinatura; retorna os valores (bytes) ou None"""
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, "rb") as arquivo:
+        dados = arquivo.read()
+    cabecalho = MARCA + bytes([VERSAO, 0]) + bytes(assinatura_)
+    if dados[:TAMANHO_CABECALHO] != cabecalho or len(dados) != TAMANHO_CABECALHO + tamanho(assinatura_):
+        return None
+    return dados[TAMANHO_CABECALHO:]
+
+class TabelasFinais:
+    """
+    Consulta às tabelas geradas. As tabelas são lidas sob demanda e mantidas num
+    cache LRU limitado a 'memoria_mb'.
+    """
+    def __init__(self, diretorio=DIRETORIO_TABELAS, memoria_mb=64):
+        self.diretorio = diretorio
+        self.limite = memoria_mb * 1024 * 1024
+        self.cache = OrderedDict()  # assinatura -> valores
+        self.bytes_em_cache = 0
+        self.sondagens = 0
+        # Maior número de peças coberto: todas as assinaturas até ele precisam existir
+        self.pecas = 0
+        for pecas in range(2, PECAS_MAXIMAS + 2):
+            if not all(os.path.exists(nome_arquivo(diretorio, a)) for onda in assinaturas(pecas) for a in onda):
+                break
+            self.pecas = pecas
+    
+    def __getstate__(self):
+        # Enviada a outro processo (busca paralela) sem o cache: ele lê as próprias tabelas
+        estado = self.__dict__.copy()
+        estado["cache"] = OrderedDict()
+        estado["bytes_em_cache"] = 0
+        return estado
+    
+    @classmethod
+    def carregar(cls, diretorio=DIRETORIO_TABELAS, memoria_mb=64):
+        """Abre as tabelas, ou retorna None se nenhuma tiver sido gerada"""
+        tabelas = cls(diretorio, memoria_mb)
+        return tabelas if tabelas.pecas else None
+    
+    def _valores(self, assinatura_):
+        """Valores de uma assinatura, do cache ou do disco"""
+        valores = self.cache.get(assinatura_)
+        if valores is not None:
+            self.cache.move_to_end(assinatura_)
+            return valores
+        valores = ler_tabela(nome_arquivo(self.diretorio, assinatura_), assinatura_)
+        if valores is None:
+            raise ValueError(f"Tabela de finais ausente ou inválida: {assinatura_}")
+        # Descarta as menos usadas até caber
+        while self.cache and self.bytes_em_cache + len(valores) > self.limite:
+            _, antiga = self.cache.popitem(last=False)
+            self.bytes_em_cache -= len(antiga)
+        self.cache[assinatura_] = valores
+        self.bytes_em_cache += len(valores)
+        return valores
+    
+    def valor(self, brancas, vermelhas, damas, jogador):
+        """Byte da tabela para a posição (veja o início do módulo), ou None se não coberta"""
+        ocupadas = brancas | vermelhas
+        if contar_bits(ocupadas) > self.pecas:
+            return None
+        # Quem joga sem peças já perdeu
+        if not (brancas if jogador == "branco" else vermelhas):
+            return 1
+        if not (vermelhas if jogador == "branco" else brancas):
+            return None
+        self.sondagens += 1
+        assinatura_ = assinatura(brancas, vermelhas, damas)
+        return self._valores(assinatura_)[indice(assinatura_, brancas, vermelhas, damas, jogador)]
+    
+    def sondar(self, tabuleiro, jogador):
+        """
+        (resultado, distância em lances) da posição para quem joga, com resultado
+        VENCE, EMPATA ou PERDE; None se a posição tem peças demais.
+        """
+        if isinstance(tabuleiro, TabuleiroBitboard):
+            if contar_bits(tabuleiro.brancas | tabuleiro.vermelhas) > self.pecas:
+                return None
+            valor = self.valor(tabuleiro.brancas, tabuleiro.vermelhas, tabuleiro.damas, jogador)
+        else:
+            if sum(tabuleiro.contar_pecas()) > self.pecas:
+                return None
+            from .codec import bitboards
+            valor = self.valor(*bitboards(tabuleiro), jogador)
+        if valor is None:
+            return None
+        if valor == EMPATE:
+            return EMPATA, 0
+        distancia = valor - 1
+        return (VENCE if distancia % 2 else PERDE), distancia
+
+def gerar(assinatura_, diretorio):
+    """Gera e grava a tabela de uma assinatura; retorna (assinatura, vitórias, derrotas, empates, segundos)"""
+    inicio = time.perf_counter()
+    tabelas = TabelasFinais(diretorio, memoria_mb=256)
+    # As assinaturas alcançáveis por captura ou promoção são de ondas anteriores
+    tabelas.pecas = sum(assinatura_)
+    pedras_brancas, damas_brancas, pedras_vermelhas, damas_vermelhas = assinatura_
+    total = tamanho(assinatura_)
+    
+    valores = bytearray([INVALIDA]) * total
+    filhos = array("i", bytes(4 * total))          # Filhos na mesma assinatura ainda sem resultado
+    distancia_filhos = array("h", bytes(2 * total))  # Maior distância entre os filhos vencedores
+    bloqueada = bytearray(total)                   # Tem um filho empatado ou perdedor: não pode perder
+    arestas_filho = array("i")
+    arestas_pai = array("i")
+    baldes = [[] for _ in range(DISTANCIA_MAXIMA + 2)]
+    
+    tabuleiro = TabuleiroBitboard()
+    grupos = [conjuntos(quantidade) for quantidade in assinatura_]
+    posicao = 0
+    for pb, db, pv, dv in itertools.product(*grupos):
+        for jogador in ("branco", "vermelho"):
+            indice_atual = posicao
+            posicao += 1
+            ocupadas = pb | db | pv | dv
+            if (contar_bits(ocupadas) != sum(assinatura_) or pb & LINHA_PROMOCAO_BRANCAS
+                    or pv & LINHA_PROMOCAO_VERMELHAS):
+                continue
+            valores[indice_atual] = EMPATE
+            tabuleiro.brancas, tabuleiro.vermelhas, tabuleiro.damas = pb | db, pv | dv, db | dv
+            movimentos = tabuleiro.get_movimentos_validos(jogador)
+            if not movimentos:
+                baldes[0].append(indice_atual)
+                continue
+            adversario = "vermelho" if jogador == "branco" else "branco"
+            vitoria_externa = None
+            for movimento in movimentos:
+                registro = tabuleiro.fazer_movimento(movimento)
+                brancas, vermelhas, damas = tabuleiro.brancas, tabuleiro.vermelhas, tabuleiro.damas
+                tabuleiro.desfazer_movimento(registro)
+                assinatura_filho = assinatura(brancas, vermelhas, damas)
+                if assinatura_filho == assinatura_:
+                    arestas_filho.append(indice(assinatura_, brancas, vermelhas, damas, adversario))
+                    arestas_pai.append(indice_atual)
+                    filhos[indice_atual] += 1
+                    continue
+                valor_filho = tabelas.valor(brancas, vermelhas, damas, adversario)
+                if valor_filho == EMPATE:
+                    bloqueada[indice_atual] = 1
+                elif (valor_filho - 1) % 2 == 0:
+                    # O adversário perde: vitória
+                    bloqueada[indice_atual] = 1
+                    if vitoria_externa is None or valor_filho < vitoria_externa:
+                        vitoria_externa = valor_filho
+                else:
+                    distancia_filhos[indice_atual] = max(distancia_filhos[indice_atual], valor_filho - 1)
+            if vitoria_externa is not None:
+                baldes[vitoria_externa].append(indice_atual)  # Distância (valor - 1) + 1
+            elif not filhos[indice_atual] and not bloqueada[indice_atual]:
+                baldes[distancia_filhos[indice_atual] + 1].append(indice_atual)
+    
+    # Predecessores de cada posição (arestas agrupadas pelo filho)
+    inicio_pais = array("i", bytes(4 * (total + 1)))
+    for filho in arestas_filho:
+        inicio_pais[filho + 1] += 1
+    for i in range(total):
+        inicio_pais[i + 1] += inicio_pais[i]
+    proxima = array("i", inicio_pais)
+    pais = array("i", bytes(4 * len(arestas_filho)))
+    for filho, pai in zip(arestas_filho, arestas_pai):
+        pais[proxima[filho]] = pai
+        proxima[filho] += 1
+    del arestas_filho, arestas_pai, proxima
+    
+    # Propagação em ordem crescente de distância: a primeira atribuição é a mais curta
+    resolvida = bytearray(total)
+    for distancia in range(DISTANCIA_MAXIMA + 1):
+        balde = baldes[distancia]
+        while balde:
+            atual = balde.pop()
+            if resolvida[atual]:
+                continue
+            resolvida[atual] = 1
+            valores[atual] = distancia + 1
+            for i in range(inicio_pais[atual], inicio_pais[atual + 1]):
+                pai = pais[i]
+                if resolvida[pai]:
+                    continue
+                if distancia % 2 == 0:
+                    # O filho perde: o pai vence no lance seguinte
+                    baldes[distancia + 1].append(pai)
+                    bloqueada[pai] = 1
+                else:
+                    filhos[pai] -= 1
+                    if distancia > distancia_filhos[pai]:
+                        distancia_filhos[pai] = distancia
+                    if not filhos[pai] and not bloqueada[pai]:
+                        baldes[distancia_filhos[pai] + 1].append(pai)
+    if baldes[DISTANCIA_MAXIMA + 1]:
+        raise ValueError(f"Distância maior que {DISTANCIA_MAXIMA} lances em {assinatura_}")
+    
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = nome_arquivo(diretorio, assinatura_)
+    with open(caminho + ".tmp", "wb") as arquivo:
+        arquivo.write(MARCA + bytes([VERSAO, 0]) + bytes(assinatura_))
+        arquivo.write(valores)
+    os.replace(caminho + ".tmp", caminho)
+    
+    vitorias = sum(1 for valor in valores if valor not in (EMPATE, INVALIDA) and (valor - 1) % 2)
+    derrotas = sum(1 for valor in valores if valor not in (EMPATE, INVALIDA) and (valor - 1) % 2 == 0)
+    empates = valores.count(EMPATE)
+    return assinatura_, vitorias, derrotas, empates, time.perf_counter() - inicio
+
+def gerar_todas(pecas=PECAS_MAXIMAS, diretorio=DIRETORIO_TABELAS, processos=None):
+    """Gera as tabelas que faltam, onda por onda; as de uma onda rodam em paralelo"""
+    # Importado aqui pelo mesmo motivo que em IA._executor_paralelo (tempo de importação)
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=processos or os.cpu_count() or 1) as executor:
+        for onda in assinaturas(pecas):
+            # Retomada: as tabelas já gravadas (e válidas) são mantidas
+            faltando = [a for a in onda if ler_tabela(nome_arquivo(diretorio, a), a) is None]
+            for assinatura_, vitorias, derrotas, empates, segundos in executor.map(
+                    gerar, faltando, itertools.repeat(diretorio)):
+                print(f"{assinatura_}: {vitorias} vitórias, {derrotas} derrotas, {empates} empates "
+                      f"({segundos:.1f}s)", file=sys.stderr)
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Gera as tabelas de finais (análise retrógrada)")
+    parser.add_argument("--pecas", type=int, default=PECAS_MAXIMAS, choices=range(2, PECAS_MAXIMAS + 2),
+                        help="número máximo de peças no tabuleiro")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--diretorio", default=DIRETORIO_TABELAS)
+    args = parser.parse_args(argumentos)
+    gerar_todas(args.pecas, args.diretorio, args.processos)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Livro de aberturas em arquivo mapeado na memória (mmap).
+
+O arquivo tem um cabeçalho e registros de 16 bytes ordenados pela chave Zobrist
+da posição (com o lado que joga): chave, casa de origem, casa de destino, peso e
+máscara das casas capturadas. A consulta é uma busca binária direto no mmap: abrir
+o livro não lê nada além do cabeçalho, e vários processos compartilham as mesmas
+páginas pelo cache do sistema.
+
+O livro é construído offline avaliando com janela completa todos os movimentos das
+posições até alguns lances do início; entram os que ficam perto do melhor.
+
+Uso: python -m damas.livro saida.bin [--lances 4] [--profundidade 8] [--margem 20]
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+
+from .constantes import indice_casa, chave_posicao
+from .bitboard import TabuleiroBitboard
+from .busca import IA
+from . import codec
+
+ARQUIVO_LIVRO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "livro_aberturas.bin")
+
+# Cabeçalho: marca, versão, tamanho do registro, número de registros e a chave da
+# posição inicial (detecta livros gerados com outras chaves Zobrist)
+CABECALHO = struct.Struct("<4sHHIQ")
+MARCA = b"DLIV"
+VERSAO = 1
+# Registro: chave, origem, destino (índices 0-31), peso e casas capturadas
+REGISTRO = struct.Struct("<QBBHI")
+CHAVE = struct.Struct("<Q")
+PESO_MAXIMO = 0xFFFF
+
+def assinatura():
+    """Chave da posição inicial com as brancas a jogar"""
+    return chave_posicao(TabuleiroBitboard(), "branco")
+
+def codificar_movimento(movimento):
+    """(origem, destino, máscara das capturas) de um movimento"""
+    linha_ini, col_ini, linha_fim, col_fim, capturadas = movimento
+    mascara = 0
+    for linha, coluna in capturadas:
+        mascara |= 1 << indice_casa(linha, coluna)
+    return indice_casa(linha_ini, col_ini), indice_casa(linha_fim, col_fim), mascara
+
+class LivroAberturas:
+    """
+    Livro aberto para leitura. Com 'gerador' (random.Random) o movimento é sorteado
+    pelos pesos; sem ele, é sempre o de maior peso.
+    """
+    def __init__(self, caminho=ARQUIVO_LIVRO, gerador=None):
+        self.caminho = caminho
+        self.gerador = gerador
+        with open(caminho, "rb") as arquivo:
+            self.mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.mapa) < CABECALHO.size:
+            raise ValueError(f"Livro de aberturas inválido: {caminho}")
+        marca, versao, tamanho, self.quantidade, chave_inicial = CABECALHO.unpack_from(self.mapa)
+        if marca != MARCA or versao != VERSAO or tamanho != REGISTRO.size:
+            raise ValueError(f"Livro de aberturas inválido: {caminho}")
+        if chave_inicial != assinatura():
+            raise ValueError(f"Livro de aberturas gerado com outras chaves Zobrist: {caminho}")
+        if len(self.mapa) != CABECALHO.size + self.quantidade * REGISTRO.size:
+            raise ValueError(f"Livro de aberturas truncado: {caminho}")
+    
+    @classmethod
+    def carregar(cls, caminho=ARQUIVO_LIVRO, gerador=None):
+        """Abre o livro, ou retorna None se o arquivo não existir"""
+        if not os.path.exists(caminho):
+            return None
+        return cls(caminho, gerador)
+    
+    def fechar(self):
+        self.mapa.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *excecao):
+        self.fechar()
+    
+    def __len__(self):
+        return self.quantidade
+    
+    def consultar(self, chave):
+        """Entradas (origem, destino, capturas, peso) da posição, em ordem de peso decrescente"""
+        # Busca binária pelo primeiro registro com a chave
+        inicio, fim = 0, self.quantidade
+        while inicio < fim:
+            meio = (inicio + fim) // 2
+            if CHAVE.unpack_from(self.mapa, CABECALHO.size + meio * REGISTRO.size)[0] < chave:
+                inicio = meio + 1
+            else:
+                fim = meio
+        entradas = []
+        for indice in range(inicio, self.quantidade):
+            chave_registro, origem, destino, peso, capturas = REGISTRO.unpack_from(
+                self.mapa, CABECALHO.size + indice * REGISTRO.size)
+            if chave_registro != chave:
+                break
+            entradas.append((origem, destino, capturas, peso))
+        return entradas
+    
+    def movimento(self, tabuleiro, jogador, movimentos=None):
+        """
+        Movimento do livro para a posição, ou None. Só devolve movimentos que
+        estejam entre os válidos (protege contra colisões de chave).
+        """
+        entradas = self.consultar(chave_posicao(tabuleiro, jogador))
+        if not entradas:
+            return None
+        if movimentos is None:
+            movimentos = tabuleiro.get_movimentos_validos(jogador)
+        por_codigo = {codificar_movimento(movimento): movimento for movimento in movimentos}
+        candidatos = [(por_codigo[entrada[:3]], entrada[3]) for entrada in entradas if entrada[:3] in por_codigo]
+        if not candidatos:
+            return None
+        if self.gerador is None:
+            return candidatos[0][0]
+        return self.gerador.choices([m for m, _ in candidatos], weights=[p for _, p in candidatos])[0]
+
+def gravar(caminho, registros):
+    """Grava o livro: 'registros' é uma lista de (chave, origem, destino, peso, capturas)"""
+    registros = sorted(registros, key=lambda registro: (registro[0], -registro[3]))
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(CABECALHO.pack(MARCA, VERSAO, REGISTRO.size, len(registros), assinatura()))
+        for registro in registros:
+            arquivo.write(REGISTRO.pack(*registro))
+    # Troca atômica: processos com o livro antigo aberto continuam lendo o mapa deles
+    os.replace(temporario, caminho)
+
+def posicoes_abertura(lances):
+    """Posições únicas (registro do codec) alcançáveis do início em menos de 'lances' lances"""
+    vistas = set()
+    nivel = [(TabuleiroBitboard(), "branco")]
+    posicoes = []
+    for _ in range(lances):
+        proximo = []
+        for tabuleiro, jogador in nivel:
+            chave = chave_posicao(tabuleiro, jogador)
+            if chave in vistas:
+                continue
+            vistas.add(chave)
+            posicoes.append(codec.codificar(tabuleiro, jogador))
+            adversario = "vermelho" if jogador == "branco" else "branco"
+            for movimento in tabuleiro.get_movimentos_validos(jogador):
+                filho = tabuleiro.copiar()
+                filho.fazer_movimento(movimento)
+                proximo.append((filho, adversario))
+        nivel = proximo
+    return posicoes
+
+# IA de cada processo da construção (criada por _iniciar_processo)
+_ia = None
+
+def _iniciar_processo():
+    """Cria a IA de um processo; reaproveitada entre posições"""
+    global _ia
+    _ia = IA(verboso=False)
+
+def _avaliar_posicao(tarefa):
+    """Registros do livro para uma posição: movimentos a até 'margem' do melhor"""
+    dados, profundidade, margem = tarefa
+    tabuleiro, jogador = codec.decodificar(dados)
+    movimentos = tabuleiro.get_movimentos_validos(jogador)
+    if not movimentos:
+        return []
+    _ia.nova_partida()
+    valores = _ia.avaliar_movimentos(tabuleiro, movimentos, profundidade, jogador)
+    # Valores do ponto de vista de quem joga
+    sinal = 1 if jogador == "branco" else -1
+    melhor = max(sinal * valor for valor in valores)
+    chave = chave_posicao(tabuleiro, jogador)
+    registros = []
+    for movimento, valor in zip(movimentos, valores):
+        perda = melhor - sinal * valor
+        if perda <= margem:
+            origem, destino, capturas = codificar_movimento(movimento)
+            # Peso decresce com a perda em relação ao melhor movimento
+            peso = min(PESO_MAXIMO, int(margem - perda) + 1)
+            registros.append((chave, origem, destino, peso, capturas))
+    return registros
+
+def construir(caminho, lances=4, profundidade=8, margem=20, processos=None):
+    """Constrói o livro avaliando as posições em paralelo; retorna o número de registros"""
+    # Importado aqui pelo mesmo motivo que em IA._executor_paralelo (tempo de importação)
+    from concurrent.futures import ProcessPoolExecutor
+    
+    posicoes = posicoes_abertura(lances)
+    tarefas = [(dados, profundidade, margem) for dados in posicoes]
+    registros = []
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processos or os.cpu_count() or 1,
+                             initializer=_iniciar_processo) as executor:
+        for i, parcial in enumerate(executor.map(_avaliar_posicao, tarefas, chunksize=4), 1):
+            registros.extend(parcial)
+            if i % 100 == 0 or i == len(tarefas):
+                print(f"{i}/{len(tarefas)} posições ({time.perf_counter() - inicio:.0f}s)", file=sys.stderr)
+    gravar(caminho, registros)
+    return len(registros)
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Constrói o livro de aberturas com buscas profundas")
+    parser.add_argument("saida", nargs="?", default=ARQUIVO_LIVRO)
+    parser.add_argument("--lances", type=int, default=4, help="posições até este número de lances do início")
+    parser.add_argument("--profundidade", type=int, default=8, help="profundidade da busca de cada movimento")
+    parser.add_argument("--margem", type=int, default=20,
+                        help="perda máxima (centésimos de pedra) em relação ao melhor movimento")
+    parser.add_argument("--processos", type=int, default=None)
+    args = parser.parse_args(argumentos)
+    
+    total = construir(args.saida, args.lances, args.profundidade, args.margem, args.processos)
+    print(f"{total} movimentos gravados em {args.saida}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
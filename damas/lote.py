@@ -0,0 +1,230 @@
+"""
+Avaliação e contagem de movimentos de muitas posições de uma vez, com NumPy.
+
+As posições são um array (N, 3) de uint32 com os bitboards (brancas, vermelhas,
+damas), o mesmo formato dos registros do codec; de_matrizes, de_tabuleiros e
+de_registros convertem as outras representações. Cada função faz uma passada
+vetorizada sobre o lote inteiro e o resultado é exatamente o de
+Tabuleiro.avaliar / get_movimentos_validos para cada posição.
+
+Só este módulo depende do NumPy; o resto do pacote não o importa.
+"""
+import numpy as np
+
+from .constantes import (LINHAS, COLUNAS, PEDRA_BRANCA, PEDRA_PRETA, DAMA_BRANCA, DAMA_PRETA,
+                         CASAS_ESCURAS, COORDENADAS)
+from .avaliacao import PESOS_PADRAO
+from .bitboard import TabuleiroBitboard, DESLOCAMENTOS, OPOSTA
+from . import codec
+
+# Registro do codec (brancas, vermelhas, damas, lado que joga) lido sem cópia
+REGISTRO = np.dtype([("brancas", "<u4"), ("vermelhas", "<u4"), ("damas", "<u4"), ("vez", "u1")])
+assert REGISTRO.itemsize == codec.TAMANHO_REGISTRO
+
+# Resultado de vencedor_lote: índice nesta tupla
+VENCEDORES = (None, "branco", "vermelho")
+
+# Tabela peça-casa somada por byte, por conjunto de pesos (veja _tabelas_bytes)
+_TABELAS_BYTES = {}
+
+# Contagem de bits por byte (para NumPy sem bitwise_count)
+_BITS_BYTE = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.int64)
+
+def contar_bits(bitboards):
+    """Número de casas ocupadas de cada bitboard do array"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bitboards).astype(np.int64)
+    total = np.zeros(bitboards.shape, dtype=np.int64)
+    for deslocamento in range(0, CASAS_ESCURAS, 8):
+        total += _BITS_BYTE[(bitboards >> deslocamento) & 0xFF]
+    return total
+
+def deslocar(bitboards, direcao):
+    """bitboard.deslocar aplicado a um array de bitboards"""
+    resultado = np.zeros_like(bitboards)
+    for delta, mascara in DESLOCAMENTOS[direcao]:
+        parte = bitboards & np.uint32(mascara)
+        resultado |= parte << np.uint32(delta) if delta > 0 else parte >> np.uint32(-delta)
+    return resultado
+
+def de_matrizes(matrizes):
+    """Array (N, 3) de bitboards a partir de um array (N, 8, 8) de códigos de peça"""
+    matrizes = np.asarray(matrizes)
+    if matrizes.ndim != 3 or matrizes.shape[1:] != (LINHAS, COLUNAS):
+        raise ValueError(f"Esperado um array (N, {LINHAS}, {COLUNAS}), recebido {matrizes.shape}")
+    linhas, colunas = zip(*COORDENADAS)
+    pecas = matrizes[:, linhas, colunas]  # (N, 32) na ordem dos índices do bitboard
+    bits = np.uint32(1) << np.arange(CASAS_ESCURAS, dtype=np.uint32)
+    
+    def bitboard(*codigos):
+        return np.bitwise_or.reduce(np.where(np.isin(pecas, codigos), bits, np.uint32(0)), axis=1)
+    
+    return np.stack([bitboard(PEDRA_BRANCA, DAMA_BRANCA), bitboard(PEDRA_PRETA, DAMA_PRETA),
+                     bitboard(DAMA_BRANCA, DAMA_PRETA)], axis=1).astype(np.uint32)
+
+def de_tabuleiros(tabuleiros):
+    """Array (N, 3) de bitboards a partir de tabuleiros (bitboard ou matriz)"""
+    return np.array([codec.bitboards(tabuleiro) for tabuleiro in tabuleiros], dtype=np.uint32).reshape(-1, 3)
+
+def de_registros(dados):
+    """
+    (bitboards (N, 3), vez (N,)) a partir de registros binários do codec, com
+    vez 0 para as brancas e 1 para as vermelhas (como codec.VEZ)
+    """
+    if len(dados) % REGISTRO.itemsize:
+        raise ValueError(f"O tamanho dos dados não é múltiplo de {REGISTRO.itemsize} bytes")
+    registros = np.frombuffer(dados, dtype=REGISTRO)
+    if registros.size and registros["vez"].max() > 1:
+        raise ValueError("Lado que joga inválido")
+    bitboards = np.stack([registros["brancas"], registros["vermelhas"], registros["damas"]], axis=1)
+    return bitboards, registros["vez"]
+
+def _bitboards(lote):
+    """Aceita (N, 3) bitboards ou (N, 8, 8) matrizes; retorna as três colunas de bitboards"""
+    lote = np.asarray(lote)
+    if lote.ndim == 3:
+        lote = de_matrizes(lote)
+    if lote.ndim != 2 or lote.shape[1] != 3:
+        raise ValueError(f"Esperado um array (N, 3) de bitboards, recebido {lote.shape}")
+    lote = lote.astype(np.uint32, copy=False)
+    return lote[:, 0], lote[:, 1], lote[:, 2]
+
+def _tabelas_bytes(pesos):
+    """
+    Tabela peça-casa somada por byte do bitboard: tabelas[peça][k][b] é o valor das
+    peças nas casas 8k..8k+7 indicadas pelos bits de b
+    """
+    chave = tuple(sorted(pesos.para_dict().items()))
+    tabelas = _TABELAS_BYTES.get(chave)
+    if tabelas is None:
+        tabelas = {}
+        bits = (np.arange(256)[:, None] >> np.arange(8)) & 1  # (256, 8)
+        for peca in (PEDRA_BRANCA, PEDRA_PRETA, DAMA_BRANCA, DAMA_PRETA):
+            valores = np.array(pesos.tabela[peca], dtype=np.int64).reshape(4, 8)
+            tabelas[peca] = [bits @ valores[k] for k in range(4)]
+        _TABELAS_BYTES[chave] = tabelas
+    return tabelas
+
+def _posicional(bitboards, tabela_bytes):
+    total = np.zeros(bitboards.shape, dtype=np.int64)
+    for k in range(4):
+        total += tabela_bytes[k][(bitboards >> np.uint32(8 * k)) & np.uint32(0xFF)]
+    return total
+
+def _pecas_na_direcao(pecas, damas, branco, direcao):
+    """TabuleiroBitboard._pecas_na_direcao para arrays"""
+    if branco:
+        return pecas if direcao < 2 else pecas & damas
+    return pecas & damas if direcao < 2 else pecas
+
+def mobilidade_lote(lote):
+    """Movimentos simples disponíveis para cada lado: (brancas, vermelhas), como Tabuleiro.mobilidade"""
+    return _mobilidade(*_bitboards(lote))
+
+def _mobilidade(brancas, vermelhas, damas):
+    vazias = ~(brancas | vermelhas)
+    resultado = []
+    for pecas, branco in ((brancas, True), (vermelhas, False)):
+        total = np.zeros(brancas.shape, dtype=np.int64)
+        for direcao in range(4):
+            total += contar_bits(deslocar(_pecas_na_direcao(pecas, damas, branco, direcao), direcao) & vazias)
+        resultado.append(total)
+    return tuple(resultado)
+
+def componentes_lote(lote, pesos=None):
+    """
+    (material, posicional, mobilidade) de cada posição, em centésimos de pedra e do
+    ponto de vista das brancas; a soma é o valor de Tabuleiro.avaliar
+    """
+    pesos = pesos or PESOS_PADRAO
+    brancas, vermelhas, damas = _bitboards(lote)
+    tabelas = _tabelas_bytes(pesos)
+    
+    grupos = {PEDRA_BRANCA: brancas & ~damas, PEDRA_PRETA: vermelhas & ~damas,
+              DAMA_BRANCA: brancas & damas, DAMA_PRETA: vermelhas & damas}
+    material = np.zeros(brancas.shape, dtype=np.int64)
+    posicional = np.zeros(brancas.shape, dtype=np.int64)
+    for peca, bitboards in grupos.items():
+        material += contar_bits(bitboards) * pesos.material[peca]
+        posicional += _posicional(bitboards, tabelas[peca])
+    
+    mobilidade_brancas, mobilidade_vermelhas = _mobilidade(brancas, vermelhas, damas)
+    return material, posicional, (mobilidade_brancas - mobilidade_vermelhas) * pesos.mobilidade
+
+def avaliar_lote(lote, pesos=None):
+    """Tabuleiro.avaliar de cada posição do lote (array int64)"""
+    material, posicional, mobilidade = componentes_lote(lote, pesos)
+    return material + posicional + mobilidade
+
+def _saltadores_e_moveis(brancas, vermelhas, damas, branco):
+    """Peças do lado que podem capturar e peças com movimento simples (como get_movimentos_validos)"""
+    pecas, inimigas = (brancas, vermelhas) if branco else (vermelhas, brancas)
+    vazias = ~(brancas | vermelhas)  # As 32 casas do uint32 são casas do tabuleiro
+    saltadores = np.zeros_like(brancas)
+    moveis = np.zeros_like(brancas)
+    simples = np.zeros(brancas.shape, dtype=np.int64)
+    for direcao in range(4):
+        na_direcao = _pecas_na_direcao(pecas, damas, branco, direcao)
+        atras = deslocar(vazias, OPOSTA[direcao])
+        saltadores |= deslocar(atras & inimigas, OPOSTA[direcao]) & na_direcao
+        moveis |= atras & na_direcao
+        simples += contar_bits(atras & na_direcao)
+    return saltadores, moveis, simples
+
+def _vez(vez, tamanho):
+    """Lado que joga como array de 0 (brancas) e 1 (vermelhas)"""
+    if isinstance(vez, str):
+        return np.full(tamanho, codec.VEZ[vez], dtype=np.uint8)
+    vez = np.asarray(vez, dtype=np.uint8)
+    if vez.shape != (tamanho,):
+        raise ValueError(f"Esperado um lado que joga por posição ({tamanho}), recebido {vez.shape}")
+    return vez
+
+def contar_movimentos(lote, vez):
+    """
+    Número de movimentos válidos de quem joga ('vez': "branco", "vermelho" ou um
+    array 0/1 por posição). Sem captura disponível, a contagem é vetorizada; as
+    posições com captura (cadeias) são contadas pelo TabuleiroBitboard.
+    """
+    brancas, vermelhas, damas = _bitboards(lote)
+    vez = _vez(vez, brancas.shape[0])
+    contagem = np.zeros(brancas.shape, dtype=np.int64)
+    for codigo, branco in ((0, True), (1, False)):
+        linhas = vez == codigo
+        if not linhas.any():
+            continue
+        saltadores, _, simples = _saltadores_e_moveis(brancas[linhas], vermelhas[linhas], damas[linhas], branco)
+        contagem[linhas] = simples
+        # Capturas: as sequências máximas só saem da geração completa
+        jogador = codec.JOGADORES[codigo]
+        for i in np.flatnonzero(linhas)[saltadores != 0]:
+            tabuleiro = TabuleiroBitboard.de_bitboards(int(brancas[i]), int(vermelhas[i]), int(damas[i]))
+            contagem[i] = len(tabuleiro.get_movimentos_validos(jogador))
+    return contagem
+
+def _presas(brancas, vermelhas, damas, branco):
+    """Posições em que o lado não tem movimentos (nem peças)"""
+    saltadores, moveis, _ = _saltadores_e_moveis(brancas, vermelhas, damas, branco)
+    return (saltadores | moveis) == 0
+
+def sem_movimentos(lote, vez):
+    """True nas posições em que quem joga não tem movimentos (nem peças): fim de partida"""
+    brancas, vermelhas, damas = _bitboards(lote)
+    vez = _vez(vez, brancas.shape[0])
+    resultado = np.zeros(brancas.shape, dtype=bool)
+    for codigo, branco in ((0, True), (1, False)):
+        linhas = vez == codigo
+        resultado[linhas] = _presas(brancas[linhas], vermelhas[linhas], damas[linhas], branco)
+    return resultado
+
+def vencedor_lote(lote):
+    """
+    Tabuleiro.vencedor de cada posição, como índice em VENCEDORES (0 nenhum,
+    1 brancas, 2 vermelhas). Totalmente vetorizado: basta saber se há movimentos.
+    """
+    brancas, vermelhas, damas = _bitboards(lote)
+    resultado = np.zeros(brancas.shape, dtype=np.uint8)
+    # Mesma precedência de vencedor(): as brancas são verificadas primeiro
+    resultado[_presas(brancas, vermelhas, damas, False)] = 1
+    resultado[_presas(brancas, vermelhas, damas, True)] = 2
+    return resultado
@@ -0,0 +1,243 @@
+"""
+Gravação e leitura de partidas em notação PDN.
+
+As casas são numeradas de 1 a 32 como no FEN do codec, e o lance mostra o caminho
+inteiro: "22-18" num movimento simples, "22x15x6" numa captura em cadeia. O
+GravadorPartidas acrescenta ao fim do arquivo, lance por lance, e cada lance da
+IA pode levar um comentário com os números da busca:
+    
+    [Event "jogoDeDamaDemo"]
+    [FEN "W:W21-32:B1-12"]
+    1. 22-18 11-15 {v=-12 p=6 n=15230 t=41.2} 2. 18x11 8x15 {v=-8 p=6 n=9812 t=30.5} ...
+    1-0
+
+(v: valor do ponto de vista das brancas, p: profundidade, n: nós, t: tempo em ms;
+"livro" e "final" marcam lances do livro de aberturas e das tabelas de finais.)
+Opcionalmente, a posição antes de cada lance também vai para um arquivo binário de
+registros de 13 bytes do codec, que lote.de_registros lê direto.
+
+ler_partidas é um gerador: lê o arquivo linha a linha e guarda só a partida atual,
+então arquivos de qualquer tamanho são percorridos com memória constante.
+"""
+import re
+import time
+
+from .constantes import indice_casa, COORDENADAS
+from .bitboard import TabuleiroBitboard
+from . import codec
+
+# Resultado PDN pelo vencedor (brancas primeiro, como no FEN)
+RESULTADOS = {"branco": "1-0", "vermelho": "0-1", None: "1/2-1/2"}
+VENCEDORES = {resultado: vencedor for vencedor, resultado in RESULTADOS.items()}
+INCOMPLETA = "*"
+
+_TAG = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+# Comentário {...} (ou o começo de um que continua na próxima linha), resultado,
+# número do lance ("12." ou "12...") ou lance
+_SIMBOLO = re.compile(r"\{[^}]*\}|\{[^}]*$|1-0|0-1|1/2-1/2|\*|\d+\.+|[^\s{]+")
+
+def numero_casa(linha, coluna):
+    """Número PDN (1 a 32) de uma casa escura"""
+    return indice_casa(linha, coluna) + 1
+
+def notacao(movimento):
+    """Texto PDN do movimento, com as casas de pouso de uma captura em cadeia"""
+    linha, coluna, linha_fim, coluna_fim, capturadas = movimento
+    if not capturadas:
+        return f"{numero_casa(linha, coluna)}-{numero_casa(linha_fim, coluna_fim)}"
+    casas = [numero_casa(linha, coluna)]
+    # Cada salto pousa na casa logo depois da peça capturada
+    for linha_cap, coluna_cap in capturadas:
+        linha, coluna = 2 * linha_cap - linha, 2 * coluna_cap - coluna
+        casas.append(numero_casa(linha, coluna))
+    return "x".join(map(str, casas))
+
+def ler_lance(texto, tabuleiro, jogador):
+    """
+    Movimento válido correspondente ao texto PDN. Aceita também a forma curta de
+    uma captura ("22x6", só origem e destino) quando ela não é ambígua.
+    """
+    movimentos = tabuleiro.get_movimentos_validos(jogador)
+    for movimento in movimentos:
+        if notacao(movimento) == texto:
+            return movimento
+    casas = re.split(r"[-x]", texto)
+    if len(casas) == 2 and all(casa.isdigit() for casa in casas):
+        origem, destino = (COORDENADAS[int(casa) - 1] if 1 <= int(casa) <= len(COORDENADAS) else None
+                           for casa in casas)
+        candidatos = [movimento for movimento in movimentos
+                      if movimento[:2] == origem and movimento[2:4] == destino]
+        if len(candidatos) == 1:
+            return candidatos[0]
+        if candidatos:
+            raise ValueError(f"Lance ambíguo: '{texto}'")
+    raise ValueError(f"Lance inválido para {jogador}: '{texto}'")
+
+def comentario(estatisticas):
+    """Comentário do lance a partir das estatísticas da busca (EstatisticasBusca ou para_dict)"""
+    if hasattr(estatisticas, "para_dict"):
+        estatisticas = estatisticas.para_dict()
+    if estatisticas["do_livro"]:
+        return "livro"
+    partes = ["final"] if estatisticas["da_tabela_final"] else []
+    if estatisticas["valor"] is not None:
+        partes.append(f"v={estatisticas['valor']}")
+    if not estatisticas["da_tabela_final"]:
+        partes.append(f"p={estatisticas['profundidade']} n={estatisticas['nos']} "
+                      f"t={estatisticas['tempo_ms']:.1f}")
+    return " ".join(partes)
+
+def ler_comentario(texto):
+    """Dicionário de um comentário gerado por comentario() ("chave=valor"; palavras soltas valem True)"""
+    dados = {}
+    for parte in texto.split():
+        chave, igual, valor = parte.partition("=")
+        if not igual:
+            dados[parte] = True
+            continue
+        try:
+            dados[chave] = float(valor) if "." in valor else int(valor)
+        except ValueError:
+            dados[chave] = valor
+    return dados
+
+def _tag(nome, valor):
+    texto = str(valor).replace("\\", "\\\\").replace('"', '\\"')
+    return f'[{nome} "{texto}"]\n'
+
+class GravadorPartidas:
+    """
+    Arquivo PDN aberto para acréscimo. O cabeçalho de uma partida só é escrito no
+    primeiro lance (partidas sem lances não deixam rastro) e cada lance é gravado
+    na hora: se o programa fechar no meio, o arquivo tem a partida até ali.
+    """
+    def __init__(self, caminho, caminho_binario=None):
+        self.caminho = caminho
+        self.arquivo = open(caminho, "a", encoding="utf-8")
+        self.binario = open(caminho_binario, "ab") if caminho_binario else None
+        self.tags = None
+        self.tabuleiro = None
+        self.jogador = None
+        self.lances = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *_):
+        self.fechar()
+    
+    def iniciar(self, tags=None, tabuleiro=None, jogador="branco"):
+        """Começa uma partida (encerra como incompleta a anterior, se houver)"""
+        self.terminar(INCOMPLETA)
+        # Cópia própria em bitboard, qualquer que seja a representação do jogo
+        if tabuleiro is None:
+            tabuleiro = TabuleiroBitboard()
+        self.tabuleiro = codec.montar(*codec.bitboards(tabuleiro))
+        self.jogador = jogador
+        self.tags = {"Event": "?", "Date": time.strftime("%Y.%m.%d")}
+        self.tags.update(tags or {})
+        self.tags["FEN"] = codec.para_fen(self.tabuleiro, jogador)
+        self.lances = 0
+    
+    def lance(self, movimento, estatisticas=None):
+        """Grava um lance da partida atual, com as estatísticas da busca se houver"""
+        if self.tabuleiro is None:
+            self.iniciar()
+        partes = []
+        if self.lances == 0:
+            self.arquivo.write("".join(_tag(nome, valor) for nome, valor in self.tags.items()))
+            if self.jogador == "vermelho":
+                partes.append("1...")
+        if self.jogador == "branco":
+            partes.append(f"{self.lances // 2 + 1}.")
+        partes.append(notacao(movimento))
+        if estatisticas is not None:
+            partes.append(f"{{{comentario(estatisticas)}}}")
+        self.arquivo.write(" ".join(partes) + " ")
+        self.arquivo.flush()
+        if self.binario is not None:
+            self.binario.write(codec.codificar(self.tabuleiro, self.jogador))
+            self.binario.flush()
+        self.tabuleiro.fazer_movimento(movimento)
+        self.jogador = "vermelho" if self.jogador == "branco" else "branco"
+        self.lances += 1
+    
+    def terminar(self, resultado):
+        """Encerra a partida atual com o resultado PDN ('1-0', '0-1', '1/2-1/2' ou '*')"""
+        if self.tabuleiro is not None and self.lances:
+            self.arquivo.write(f"{resultado}\n\n")
+            self.arquivo.flush()
+        self.tabuleiro = None
+        self.lances = 0
+    
+    def fechar(self):
+        self.terminar(INCOMPLETA)
+        self.arquivo.close()
+        if self.binario is not None:
+            self.binario.close()
+
+def _nova_partida():
+    return {"tags": {}, "lances": [], "comentarios": [], "resultado": INCOMPLETA}
+
+def ler_partidas(arquivo):
+    """
+    Gera as partidas de um arquivo PDN aberto, uma por vez, como dicionários com
+    "tags", "lances" (textos PDN), "comentarios" (dicionário ou None por lance) e
+    "resultado"
+    """
+    partida = _nova_partida()
+    comentario_aberto = None  # Comentário que continua na próxima linha
+    for linha in arquivo:
+        if comentario_aberto is not None:
+            fim = linha.find("}")
+            if fim < 0:
+                comentario_aberto += " " + linha.strip()
+                continue
+            linha = "{" + comentario_aberto + " " + linha
+            comentario_aberto = None
+        texto = linha.strip()
+        if texto.startswith("["):
+            # Tags depois de lances sem resultado: começou outra partida
+            if partida["lances"]:
+                yield partida
+                partida = _nova_partida()
+            for nome, valor in _TAG.findall(texto):
+                partida["tags"][nome] = re.sub(r"\\(.)", r"\1", valor)
+            continue
+        for simbolo in _SIMBOLO.findall(texto):
+            if simbolo.startswith("{"):
+                if not simbolo.endswith("}"):
+                    comentario_aberto = simbolo[1:]
+                elif partida["lances"]:
+                    partida["comentarios"][-1] = ler_comentario(simbolo[1:-1])
+            elif simbolo in VENCEDORES or simbolo == INCOMPLETA:
+                partida["resultado"] = simbolo
+                if partida["lances"] or partida["tags"]:
+                    yield partida
+                partida = _nova_partida()
+            elif not simbolo[0].isdigit() or simbolo.endswith("."):
+                continue  # Número do lance ou símbolo desconhecido
+            else:
+                partida["lances"].append(simbolo)
+                partida["comentarios"].append(None)
+    if partida["lances"]:
+        yield partida
+
+def posicao_inicial(partida):
+    """(tabuleiro, jogador) do início da partida (tag FEN ou posição inicial)"""
+    fen = partida["tags"].get("FEN")
+    if fen:
+        return codec.de_fen(fen)
+    return TabuleiroBitboard(), "branco"
+
+def reproduzir(partida):
+    """
+    Gera (tabuleiro, jogador, movimento) para cada lance, com o tabuleiro ANTES do
+    lance; o mesmo tabuleiro é alterado no lugar entre um passo e o próximo
+    """
+    tabuleiro, jogador = posicao_inicial(partida)
+    for texto in partida["lances"]:
+        movimento = ler_lance(texto, tabuleiro, jogador)
+        yield tabuleiro, jogador, movimento
+        tabuleiro.fazer_movimento(movimento)
+        jogador = "vermelho" if jogador == "branco" else "branco"
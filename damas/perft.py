@@ -0,0 +1,156 @@
+"""
+Perft: conta as folhas da árvore de movimentos até uma profundidade fixa.
+Serve de teste de regressão do gerador de movimentos (os números têm que bater
+com os esperados e entre os dois motores) e de medida de velocidade (nós/s).
+
+Uso: python -m damas.perft [--profundidade N] [--posicao nome] [--motor bitboard|lista|ambos] [--divide]
+"""
+import argparse
+import sys
+import time
+
+from .constantes import LINHAS, COLUNAS, VAZIO, PEDRA_BRANCA, PEDRA_PRETA, DAMA_BRANCA, DAMA_PRETA
+from .tabuleiro import Tabuleiro
+from .bitboard import TabuleiroBitboard
+
+# Caracteres das posições em texto (uma string por linha, de cima para baixo)
+SIMBOLOS = {".": VAZIO, "b": PEDRA_BRANCA, "v": PEDRA_PRETA, "B": DAMA_BRANCA, "V": DAMA_PRETA}
+
+MOTORES = {"bitboard": TabuleiroBitboard, "lista": Tabuleiro}
+
+# Profundidade usada quando nenhuma é pedida (alguns segundos por posição)
+PROFUNDIDADE_PADRAO = 7
+
+# Posições de teste com o número de folhas esperado nas profundidades 1, 2, 3...
+# (os valores da posição inicial são os conhecidos para as damas inglesas 8x8)
+POSICOES = {
+    "inicio": {
+        "jogador": "branco",
+        "linhas": [".v.v.v.v", "v.v.v.v.", ".v.v.v.v", "........",
+                   "........", "b.b.b.b.", ".b.b.b.b", "b.b.b.b."],
+        "esperado": [7, 49, 302, 1469, 7361, 36768, 179740, 845931, 3963680],
+    },
+    "meio_jogo": {
+        "jogador": "vermelho",
+        "linhas": [".v.v...v", "..v.v...", "...v.v.v", "........",
+                   "...b.b..", "v...v.b.", ".b.....b", "b.b...b."],
+        "esperado": [10, 37, 153, 670, 3003, 13338, 62654, 280037, 1338914],
+    },
+    "multi_dama": {
+        "jogador": "vermelho",
+        "linhas": [".v.v.B.v", "v.......", ".....v..", "v.v.....",
+                   ".b.....v", "........", ".b.b.b.b", "b.b...b."],
+        "esperado": [2, 16, 91, 449, 2551, 12461, 67096, 324227, 1632327],
+    },
+    "damas_pedras": {
+        "jogador": "branco",
+        "linhas": [".v...B.v", "v.v.....", ".....v..", "........",
+                   ".......v", "v.......", ".....b.b", "b.b.V.b."],
+        "esperado": [8, 26, 129, 640, 2885, 14971, 65052, 341326, 1498439],
+    },
+    "cadeia": {
+        "jogador": "branco",
+        "linhas": [".......v", "....v.v.", ".....v..", "......v.",
+                   "...b.B..", "....b.b.", ".....b.b", "b...b.b."],
+        "esperado": [1, 3, 24, 61, 385, 938, 6552, 12843, 78877],
+    },
+    "so_damas": {
+        "jogador": "vermelho",
+        "linhas": [".....B..", "........", "........", "......B.",
+                   "........", "........", ".V.V....", "....V..."],
+        "esperado": [8, 48, 333, 1946, 15513, 86644, 642849, 3805851],
+    },
+}
+
+def tabuleiro_de_texto(linhas, classe=TabuleiroBitboard):
+    """Monta um tabuleiro a partir de 8 strings de 8 caracteres (veja SIMBOLOS)"""
+    if len(linhas) != LINHAS or any(len(linha) != COLUNAS for linha in linhas):
+        raise ValueError("A posição deve ter 8 linhas de 8 caracteres")
+    tabuleiro = classe()
+    tabuleiro.tabuleiro = [[SIMBOLOS[simbolo] for simbolo in linha] for linha in linhas]
+    tabuleiro.recalcular()
+    return tabuleiro
+
+def perft(tabuleiro, jogador, profundidade):
+    """Número de posições (folhas) a 'profundidade' lances de distância (1 na profundidade 0)"""
+    if profundidade <= 0:
+        return 1
+    movimentos = tabuleiro.get_movimentos_validos(jogador)
+    if profundidade == 1:
+        return len(movimentos)
+    adversario = "vermelho" if jogador == "branco" else "branco"
+    folhas = 0
+    for movimento in movimentos:
+        registro = tabuleiro.fazer_movimento(movimento)
+        folhas += perft(tabuleiro, adversario, profundidade - 1)
+        tabuleiro.desfazer_movimento(registro)
+    return folhas
+
+def divide(tabuleiro, jogador, profundidade):
+    """Folhas abaixo de cada movimento da raiz: lista de (movimento, folhas)"""
+    adversario = "vermelho" if jogador == "branco" else "branco"
+    resultado = []
+    for movimento in tabuleiro.get_movimentos_validos(jogador):
+        registro = tabuleiro.fazer_movimento(movimento)
+        folhas = perft(tabuleiro, adversario, profundidade - 1) if profundidade > 1 else 1
+        tabuleiro.desfazer_movimento(registro)
+        resultado.append((movimento, folhas))
+    return resultado
+
+def medir(nome, motor, profundidade, mostrar_divide=False):
+    """Roda o perft de uma posição de teste; retorna (folhas, segundos, confere)"""
+    posicao = POSICOES[nome]
+    tabuleiro = tabuleiro_de_texto(posicao["linhas"], MOTORES[motor])
+    inicio = time.perf_counter()
+    if mostrar_divide:
+        partes = divide(tabuleiro, posicao["jogador"], profundidade)
+        folhas = sum(parcial for _, parcial in partes)
+    else:
+        folhas = perft(tabuleiro, posicao["jogador"], profundidade)
+    tempo = time.perf_counter() - inicio
+    
+    if mostrar_divide:
+        for (linha_ini, col_ini, linha_fim, col_fim, capturadas), parcial in partes:
+            print(f"  ({linha_ini},{col_ini})->({linha_fim},{col_fim}) x{len(capturadas)}: {parcial}")
+    
+    esperados = posicao["esperado"]
+    confere = esperados[profundidade - 1] == folhas if profundidade <= len(esperados) else None
+    return folhas, tempo, confere
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Perft do gerador de movimentos")
+    parser.add_argument("--profundidade", type=int, default=None,
+                        help=f"padrão: {PROFUNDIDADE_PADRAO} (ou a maior com valor esperado, se menor)")
+    parser.add_argument("--posicao", choices=sorted(POSICOES), action="append",
+                        help="posição de teste (pode repetir; padrão: todas)")
+    parser.add_argument("--motor", choices=sorted(MOTORES) + ["ambos"], default="ambos")
+    parser.add_argument("--divide", action="store_true", help="mostra as folhas por movimento da raiz")
+    args = parser.parse_args(argumentos)
+    if args.profundidade is not None and args.profundidade < 1:
+        parser.error("--profundidade deve ser pelo menos 1")
+    
+    motores = sorted(MOTORES) if args.motor == "ambos" else [args.motor]
+    falhas = 0
+    print(f"{'posição':<14} {'motor':<9} {'prof':>4} {'folhas':>11} {'tempo':>8} {'nós/s':>10}  resultado")
+    for nome in args.posicao or POSICOES:
+        profundidade = args.profundidade or min(PROFUNDIDADE_PADRAO, len(POSICOES[nome]["esperado"]))
+        contagens = set()
+        for motor in motores:
+            folhas, tempo, confere = medir(nome, motor, profundidade, args.divide)
+            contagens.add(folhas)
+            if confere is False:
+                falhas += 1
+            situacao = {True: "ok", False: "ERRO", None: "sem valor esperado"}[confere]
+            print(f"{nome:<14} {motor:<9} {profundidade:>4} {folhas:>11} {tempo:>7.2f}s "
+                  f"{folhas / max(tempo, 1e-9):>10.0f}  {situacao}")
+        # Os dois motores devem gerar exatamente os mesmos movimentos
+        if len(contagens) > 1:
+            falhas += 1
+            print(f"{nome:<14} ERRO: os motores divergem")
+    
+    if falhas:
+        print(f"{falhas} falha(s)")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""
+Servidor de partidas: muitas partidas simultâneas num só processo, com as buscas
+da IA distribuídas por um conjunto limitado de processos.
+
+Protocolo: uma mensagem JSON por linha, numa conexão TCP local ou socket Unix.
+Cada pedido tem "op" (e opcionalmente "id", devolvido na resposta); a resposta
+tem "ok" e, em caso de erro, "erro" (também para uma linha maior que 64 KB, que é
+descartada, e para a falha de um processo de busca).
+    
+    {"op": "nova", "fen": "W:W21,...:B1,..."}         cria uma partida (fen opcional)
+    {"op": "estado", "partida": 3}                     posição, vez e movimentos válidos
+    {"op": "mover", "partida": 3, "movimento": [5, 0, 4, 1]}
+    {"op": "ia", "partida": 3, "tempo_ms": 300}        a IA joga (ou "profundidade": 4)
+    {"op": "fim", "partida": 3}                        descarta a partida
+    {"op": "metricas"}                                 latências, fila e contadores
+
+Cada partida guarda só o registro de 13 bytes do codec e o número de lances. Os
+pedidos "ia" esperam numa fila do próprio servidor (não no conjunto de processos),
+então o tempo de espera é medido e descontado do tempo pedido; com a fila cheia,
+o pedido é recusado na hora ("servidor ocupado") para o cliente tentar de novo.
+
+Uso: python -m damas.servidor [--porta 8765 | --unix caminho] [--processos N] [--fila 256]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import BrokenExecutor
+
+from . import codec
+from .bitboard import TabuleiroBitboard
+from .busca import IA
+
+PORTA_PADRAO = 8765
+TEMPO_PADRAO_MS = 500      # Tempo de busca quando o pedido não diz
+TEMPO_MAXIMO_MS = 10000    # Maior tempo aceito num pedido
+TEMPO_MINIMO_MS = 20       # Tempo mínimo de busca, mesmo se a espera na fila gastou o orçamento
+PROFUNDIDADE_MAXIMA_PEDIDO = 10
+JANELA_METRICAS = 1000     # Latências guardadas para os percentis (as mais recentes)
+LIMITE_LINHA = 2 ** 16     # Maior pedido aceito, em bytes (o limite padrão do asyncio)
+
+class Partida:
+    """Estado compacto de uma partida: registro do codec (posição e vez) e lances jogados"""
+    __slots__ = ("registro", "lances", "ocupada")
+    
+    def __init__(self, registro):
+        self.registro = registro
+        self.lances = 0
+        self.ocupada = False  # Uma busca da IA está em andamento
+
+def movimento_para_json(movimento):
+    linha_ini, col_ini, linha_fim, col_fim, capturadas = movimento
+    return [linha_ini, col_ini, linha_fim, col_fim, [list(casa) for casa in capturadas]]
+
+def _inteiro(valor):
+    """True para inteiros do JSON (bool é subclasse de int, mas true/false não são números)"""
+    return isinstance(valor, int) and not isinstance(valor, bool)
+
+def percentis(valores):
+    """p50, p95, p99 e máximo de uma sequência de valores (None se vazia)"""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    
+    def percentil(p):
+        return round(ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))], 2)
+    
+    return {"p50": percentil(50), "p95": percentil(95), "p99": percentil(99),
+            "max": round(ordenados[-1], 2), "amostras": len(ordenados)}
+
+async def _descartar_linha(leitor, consumidos):
+    """Descarta o resto de uma linha maior que o limite do leitor, até o fim de linha inclusive"""
+    while True:
+        await leitor.readexactly(consumidos)
+        try:
+            await leitor.readuntil(b"\n")
+            return
+        except asyncio.LimitOverrunError as erro:
+            consumidos = erro.consumed
+
+class Metricas:
+    """Contadores do servidor e latências recentes (em ms)"""
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.pedidos = Counter()
+        self.erros = 0
+        self.recusados = 0
+        self.fila = 0          # Pedidos "ia" esperando um processo livre
+        self.fila_maxima = 0
+        self.em_busca = 0      # Pedidos "ia" rodando nos processos
+        self.latencias_ms = deque(maxlen=JANELA_METRICAS)  # Pedido "ia" completo
+        self.esperas_ms = deque(maxlen=JANELA_METRICAS)    # Só a espera na fila
+        self.jogadas = 0       # Pedidos "ia" concluídos
+        self.nos = 0
+    
+    def para_dict(self, partidas):
+        segundos = time.perf_counter() - self.inicio
+        return {
+            "partidas": partidas,
+            "pedidos": dict(self.pedidos),
+            "erros": self.erros,
+            "recusados": self.recusados,
+            "fila": self.fila,
+            "fila_maxima": self.fila_maxima,
+            "em_busca": self.em_busca,
+            "latencia_ia_ms": percentis(self.latencias_ms),
+            "espera_fila_ms": percentis(self.esperas_ms),
+            "jogadas_ia_por_segundo": round(self.jogadas / segundos, 2) if segundos else 0.0,
+            "nos": self.nos,
+            "segundos": round(segundos, 1),
+        }
+
+# IA de cada processo do conjunto (criada por _iniciar_processo)
+_ia = None
+
+def _iniciar_processo(arquivo_livro, diretorio_finais):
+    """Cria a IA de um processo; ela é reaproveitada entre pedidos de qualquer partida"""
+    global _ia
+    livro = tabelas = None
+    if arquivo_livro:
+        from .livro import LivroAberturas
+        livro = LivroAberturas(arquivo_livro)
+    if diretorio_finais:
+        from .finais import TabelasFinais
+        tabelas = TabelasFinais.carregar(diretorio_finais)
+    _ia = IA(verboso=False, livro=livro, tabelas=tabelas)
+
+def _buscar(tarefa):
+    """Busca a jogada de uma posição (registro do codec); retorna (movimento, estatísticas)"""
+    registro, profundidade, tempo_ms = tarefa
+    tabuleiro, jogador = codec.decodificar(registro)
+    if profundidade:
+        movimento, estatisticas = _ia.buscar(tabuleiro, profundidade, None, jogador)
+    else:
+        movimento, estatisticas = _ia.buscar(tabuleiro, tempo_limite_ms=tempo_ms, jogador=jogador)
+    return movimento, estatisticas.para_dict()
+
+class Servidor:
+    """Partidas em memória e despacho das buscas para o conjunto de processos"""
+    def __init__(self, processos=None, limite_fila=256, tempo_padrao_ms=TEMPO_PADRAO_MS,
+                 arquivo_livro=None, diretorio_finais=None):
+        self.processos = processos or os.cpu_count() or 1
+        self.limite_fila = limite_fila
+        self.tempo_padrao_ms = tempo_padrao_ms
+        self.arquivos = (arquivo_livro, diretorio_finais)
+        self.executor = self._novo_executor()
+        # Só entra no conjunto de processos quem tem um processo livre: a fila fica aqui
+        self.vagas = asyncio.Semaphore(self.processos)
+        self.partidas = {}
+        self.proxima_partida = 1
+        self.metricas = Metricas()
+        self.operacoes = {"nova": self._nova, "estado": self._estado, "mover": self._mover,
+                          "ia": self._jogada_ia, "fim": self._fim, "metricas": self._metricas}
+    
+    def _novo_executor(self):
+        # Importado aqui pelo mesmo motivo que em IA._executor_paralelo (tempo de importação)
+        from concurrent.futures import ProcessPoolExecutor
+        
+        return ProcessPoolExecutor(max_workers=self.processos, initializer=_iniciar_processo,
+                                   initargs=self.arquivos)
+    
+    def fechar(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+    
+    async def atender(self, leitor, escritor):
+        """
+        Atende uma conexão. Os pedidos de uma conexão são respondidos em ordem, um de
+        cada vez: enquanto um está em andamento a conexão não é lida, e o controle de
+        fluxo do TCP segura o cliente (as conexões entre si seguem em paralelo).
+        """
+        try:
+            while True:
+                try:
+                    linha = await leitor.readuntil(b"\n")
+                except asyncio.IncompleteReadError as erro:
+                    linha = erro.partial  # Última linha sem "\n" (vazia no fim da conexão)
+                    if not linha:
+                        break
+                except asyncio.LimitOverrunError as erro:
+                    # Responde já e pula o resto da linha para seguir no próximo pedido
+                    self.metricas.erros += 1
+                    await self._responder(escritor, {"ok": False,
+                                                     "erro": f"Pedido maior que {LIMITE_LINHA} bytes"})
+                    await _descartar_linha(leitor, erro.consumed)
+                    continue
+                if not linha.strip():
+                    continue
+                await self._responder(escritor, await self.processar(linha))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # Servidor encerrando: a conexão só é fechada
+        finally:
+            escritor.close()
+    
+    @staticmethod
+    async def _responder(escritor, resposta):
+        escritor.write(json.dumps(resposta, separators=(",", ":")).encode() + b"\n")
+        await escritor.drain()
+    
+    async def processar(self, linha):
+        """Resposta (dicionário) para uma linha do protocolo"""
+        identificador = None
+        try:
+            try:
+                mensagem = json.loads(linha)
+            except ValueError:
+                raise ValueError("JSON inválido") from None
+            if not isinstance(mensagem, dict):
+                raise ValueError("A mensagem deve ser um objeto JSON")
+            identificador = mensagem.get("id")
+            nome = mensagem.get("op")
+            operacao = self.operacoes.get(nome) if isinstance(nome, str) else None
+            if operacao is None:
+                raise ValueError(f"Operação desconhecida: {mensagem.get('op')!r}")
+            self.metricas.pedidos[mensagem["op"]] += 1
+            resposta = await operacao(mensagem)
+            resposta["ok"] = True
+        except ValueError as erro:
+            self.metricas.erros += 1
+            resposta = {"ok": False, "erro": str(erro)}
+        if identificador is not None:
+            resposta["id"] = identificador
+        return resposta
+    
+    def _partida(self, mensagem):
+        numero = mensagem.get("partida")
+        if not _inteiro(numero):
+            raise ValueError(f"Número de partida inválido: {numero!r}")
+        partida = self.partidas.get(numero)
+        if partida is None:
+            raise ValueError(f"Partida inexistente: {mensagem.get('partida')!r}")
+        return partida
+    
+    def _descrever(self, numero, partida, movimentos=True):
+        """Estado de uma partida para a resposta"""
+        tabuleiro, jogador = codec.decodificar(partida.registro)
+        validos = tabuleiro.get_movimentos_validos(jogador)
+        estado = {"partida": numero, "fen": codec.para_fen(tabuleiro, jogador), "vez": jogador,
+                  "lances": partida.lances,
+                  # Quem joga sem movimentos (ou sem peças) perde
+                  "vencedor": None if validos else ("vermelho" if jogador == "branco" else "branco")}
+        if movimentos:
+            estado["movimentos"] = [movimento_para_json(movimento) for movimento in validos]
+        return estado
+    
+    async def _nova(self, mensagem):
+        fen = mensagem.get("fen")
+        if fen is not None and not isinstance(fen, str):
+            raise ValueError(f"FEN deve ser um texto: {fen!r}")
+        if fen:
+            tabuleiro, jogador = codec.de_fen(fen)
+        else:
+            tabuleiro, jogador = TabuleiroBitboard(), "branco"
+        numero = self.proxima_partida
+        self.proxima_partida += 1
+        self.partidas[numero] = Partida(codec.codificar(tabuleiro, jogador))
+        return self._descrever(numero, self.partidas[numero])
+    
+    async def _estado(self, mensagem):
+        return self._descrever(mensagem["partida"], self._partida(mensagem))
+    
+    async def _fim(self, mensagem):
+        self._partida(mensagem)
+        del self.partidas[mensagem["partida"]]
+        return {"partida": mensagem["partida"]}
+    
+    async def _metricas(self, mensagem):
+        return self.metricas.para_dict(len(self.partidas))
+    
+    def _jogar(self, partida, movimento):
+        """Aplica um movimento à partida (já validado)"""
+        tabuleiro, jogador = codec.decodificar(partida.registro)
+        tabuleiro.mover(movimento)
+        partida.registro = codec.codificar(tabuleiro, "vermelho" if jogador == "branco" else "branco")
+        partida.lances += 1
+    
+    async def _mover(self, mensagem):
+        partida = self._partida(mensagem)
+        if partida.ocupada:
+            raise ValueError("A IA está jogando nesta partida")
+        pedido = mensagem.get("movimento")
+        if not isinstance(pedido, list) or len(pedido) not in (4, 5):
+            raise ValueError("Movimento deve ser [linha, coluna, linha, coluna] (e as capturas, se ambíguo)")
+        tabuleiro, jogador = codec.decodificar(partida.registro)
+        # Sem a lista de capturas, vale o primeiro movimento com essa origem e destino
+        for movimento in tabuleiro.get_movimentos_validos(jogador):
+            if list(movimento[:4]) == pedido[:4] and (
+                    len(pedido) == 4 or [list(casa) for casa in movimento[4]] == pedido[4]):
+                self._jogar(partida, movimento)
+                return self._descrever(mensagem["partida"], partida)
+        raise ValueError(f"Movimento inválido: {pedido}")
+    
+    async def _jogada_ia(self, mensagem):
+        numero = mensagem.get("partida")
+        partida = self._partida(mensagem)
+        if partida.ocupada:
+            raise ValueError("A IA já está jogando nesta partida")
+        profundidade = mensagem.get("profundidade")
+        if profundidade is not None and not (_inteiro(profundidade)
+                                             and 1 <= profundidade <= PROFUNDIDADE_MAXIMA_PEDIDO):
+            raise ValueError(f"Profundidade deve ser de 1 a {PROFUNDIDADE_MAXIMA_PEDIDO}")
+        tempo_ms = mensagem.get("tempo_ms", self.tempo_padrao_ms)
+        if (isinstance(tempo_ms, bool) or not isinstance(tempo_ms, (int, float))
+                or not 1 <= tempo_ms <= TEMPO_MAXIMO_MS):
+            raise ValueError(f"tempo_ms deve ser de 1 a {TEMPO_MAXIMO_MS}")
+        metricas = self.metricas
+        if metricas.fila >= self.limite_fila:
+            metricas.recusados += 1
+            raise ValueError("Servidor ocupado, tente de novo")
+        
+        inicio = time.perf_counter()
+        partida.ocupada = True
+        metricas.fila += 1
+        metricas.fila_maxima = max(metricas.fila_maxima, metricas.fila)
+        na_fila = True
+        try:
+            async with self.vagas:
+                metricas.fila -= 1
+                na_fila = False
+                espera_ms = (time.perf_counter() - inicio) * 1000
+                metricas.esperas_ms.append(espera_ms)
+                # O orçamento do pedido inclui a espera na fila
+                tempo_busca = max(TEMPO_MINIMO_MS, int(tempo_ms - espera_ms))
+                metricas.em_busca += 1
+                executor = self.executor
+                try:
+                    movimento, estatisticas = await asyncio.get_running_loop().run_in_executor(
+                        executor, _buscar, (partida.registro, profundidade, tempo_busca))
+                except BrokenExecutor:
+                    # Um processo morreu e o conjunto não aceita mais buscas: troca por
+                    # um novo (uma vez só, mesmo com vários pedidos falhando juntos)
+                    if self.executor is executor:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        self.executor = self._novo_executor()
+                    raise ValueError("Falha no processo de busca, tente de novo") from None
+                except Exception as erro:
+                    raise ValueError(f"Falha na busca: {erro!r}") from erro
+                finally:
+                    metricas.em_busca -= 1
+        finally:
+            if na_fila:
+                metricas.fila -= 1
+            partida.ocupada = False
+        
+        metricas.jogadas += 1
+        metricas.nos += estatisticas["nos"]
+        metricas.latencias_ms.append((time.perf_counter() - inicio) * 1000)
+        if self.partidas.get(numero) is not partida:
+            raise ValueError(f"A partida {numero} terminou durante a busca")
+        if movimento is None:
+            return {"movimento": None, "estado": self._descrever(numero, partida)}
+        self._jogar(partida, movimento)
+        return {"movimento": movimento_para_json(movimento), "espera_ms": round(espera_ms, 2),
+                "estatisticas": estatisticas, "estado": self._descrever(numero, partida, movimentos=False)}
+
+async def servir(servidor, host="127.0.0.1", porta=PORTA_PADRAO, unix=None, intervalo_metricas=None):
+    """Aceita conexões até ser cancelado; com intervalo_metricas, imprime as métricas periodicamente"""
+    if unix:
+        conexoes = await asyncio.start_unix_server(servidor.atender, unix, limit=LIMITE_LINHA)
+        print(f"Servidor de damas em {unix} ({servidor.processos} processo(s))", file=sys.stderr)
+    else:
+        conexoes = await asyncio.start_server(servidor.atender, host, porta, limit=LIMITE_LINHA)
+        print(f"Servidor de damas em {host}:{porta} ({servidor.processos} processo(s))", file=sys.stderr)
+    async with conexoes:
+        if not intervalo_metricas:
+            await conexoes.serve_forever()
+            return
+        tarefa = asyncio.create_task(conexoes.serve_forever())
+        try:
+            while not tarefa.done():
+                await asyncio.sleep(intervalo_metricas)
+                print(json.dumps(servidor.metricas.para_dict(len(servidor.partidas)), separators=(",", ":")),
+                      file=sys.stderr)
+        finally:
+            tarefa.cancel()
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Servidor de partidas (JSON por linha)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--unix", default=None, help="caminho de um socket Unix (em vez de TCP)")
+    parser.add_argument("--processos", type=int, default=None, help="processos de busca (padrão: núcleos)")
+    parser.add_argument("--fila", type=int, default=256, help="pedidos 'ia' em espera antes de recusar")
+    parser.add_argument("--tempo-ms", type=int, default=TEMPO_PADRAO_MS, help="tempo de busca padrão")
+    parser.add_argument("--livro", default=None, help="livro de aberturas")
+    parser.add_argument("--finais", default=None, help="diretório das tabelas de finais")
+    parser.add_argument("--metricas", type=float, default=None, help="imprime as métricas a cada N segundos")
+    args = parser.parse_args(argumentos)
+    
+    async def executar():
+        servidor = Servidor(args.processos, args.fila, args.tempo_ms, args.livro, args.finais)
+        try:
+            await servir(servidor, args.host, args.porta, args.unix, args.metricas)
+        finally:
+            servidor.fechar()
+    
+    try:
+        asyncio.run(executar())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""Regras do jogo sobre uma matriz 8x8 (implementação de referência)"""
+from .constantes import (LINHAS, COLUNAS, VAZIO, PEDRA_BRANCA, PEDRA_PRETA, DAMA_BRANCA,
+                         DAMA_PRETA, PASSOS_PECA, INIMIGAS, indice_casa, COORDENADAS, ZOBRIST)
+from .avaliacao import PESOS_PADRAO
+
+class Tabuleiro:
+    pesos = PESOS_PADRAO  # Pesos da avaliação (troque com definir_pesos)
+    # Movimentos por origem da última posição consultada: (hash, {jogador: {origem: movimentos}})
+    movimentos_em_cache = (None, {})
+    
+    def __init__(self):
+        self.tabuleiro = []
+        self.criar_tabuleiro()
+    
+    def criar_tabuleiro(self):
+        """Cria o tabuleiro inicial com as peças nas posições corretas"""
+        self.tabuleiro = []
+        for linha in range(LINHAS):
+            self.tabuleiro.append([])
+            for coluna in range(COLUNAS):
+                # Posiciona peças apenas em quadrados escuros (linha+coluna é ímpar)
+                if (linha + coluna) % 2 == 1:
+                    if linha < 3:
+                        self.tabuleiro[linha].append(PEDRA_PRETA)  # IA
+                    elif linha > 4:
+                        self.tabuleiro[linha].append(PEDRA_BRANCA)  # Jogador
+                    else:
+                        self.tabuleiro[linha].append(VAZIO)
+                else:
+                    self.tabuleiro[linha].append(VAZIO)
+        self.recalcular()
+    
+    def recalcular(self):
+        """
+        Recalcula do zero os valores mantidos de forma incremental
+        (hash Zobrist, contagem de peças e valor posicional)
+        """
+        self.hash = 0
+        # Número de peças indexado pelo código da peça (casas vazias não são contadas)
+        self.contagem = [0] * 5
+        self.posicional = 0
+        tabela = self.pesos.tabela
+        for indice, (linha, coluna) in enumerate(COORDENADAS):
+            peca = self.tabuleiro[linha][coluna]
+            if peca != VAZIO:
+                self.hash ^= ZOBRIST[indice][peca]
+                self.contagem[peca] += 1
+                self.posicional += tabela[peca][indice]
+    
+    def definir_pesos(self, pesos):
+        """Troca os pesos da avaliação deste tabuleiro"""
+        self.pesos = pesos
+        self.recalcular()
+    
+    def mover(self, movimento):
+        """Executa um movimento no tabuleiro"""
+        linha_inicio, col_inicio, linha_fim, col_fim, pecas_capturadas = movimento
+        
+        peca = self.tabuleiro[linha_inicio][col_inicio]
+        if peca == VAZIO:
+            raise ValueError(f"Casa de origem vazia: ({linha_inicio}, {col_inicio})")
+        
+        # Remove peças capturadas (antes de mover: uma dama pode terminar a
+        # cadeia sobre a casa de uma peça já capturada)
+        tabela = self.pesos.tabela
+        for (linha, coluna) in pecas_capturadas:
+            peca_capturada = self.tabuleiro[linha][coluna]
+            indice = indice_casa(linha, coluna)
+            self.hash ^= ZOBRIST[indice][peca_capturada]
+            self.contagem[peca_capturada] -= 1
+            self.posicional -= tabela[peca_capturada][indice]
+            self.tabuleiro[linha][coluna] = VAZIO
+        
+        # Move a peça
+        self.tabuleiro[linha_inicio][col_inicio] = VAZIO
+        self.tabuleiro[linha_fim][col_fim] = peca
+        indice_inicio = indice_casa(linha_inicio, col_inicio)
+        indice_fim = indice_casa(linha_fim, col_fim)
+        self.hash ^= ZOBRIST[indice_inicio][peca] ^ ZOBRIST[indice_fim][peca]
+        self.posicional += tabela[peca][indice_fim] - tabela[peca][indice_inicio]
+        
+        # Verifica se a peça deve se tornar uma dama
+        if peca == PEDRA_BRANCA and linha_fim == 0:
+            self.tabuleiro[linha_fim][col_fim] = DAMA_BRANCA
+            self.hash ^= ZOBRIST[indice_fim][peca] ^ ZOBRIST[indice_fim][DAMA_BRANCA]
+            self.contagem[PEDRA_BRANCA] -= 1
+            self.contagem[DAMA_BRANCA] += 1
+            self.posicional += tabela[DAMA_BRANCA][indice_fim] - tabela[peca][indice_fim]
+            return True, "Pedra branca virou dama!"
+        elif peca == PEDRA_PRETA and linha_fim == LINHAS - 1:
+            self.tabuleiro[linha_fim][col_fim] = DAMA_PRETA
+            self.hash ^= ZOBRIST[indice_fim][peca] ^ ZOBRIST[indice_fim][DAMA_PRETA]
+            self.contagem[PEDRA_PRETA] -= 1
+            self.contagem[DAMA_PRETA] += 1
+            self.posicional += tabela[DAMA_PRETA][indice_fim] - tabela[peca][indice_fim]
+            return True, "Pedra vermelha virou dama!"
+        
+        return False, ""
+    
+    def fazer_movimento(self, movimento):
+        """
+        Executa um movimento e retorna o registro para desfazê-lo:
+        (movimento, peça original, [(linha, coluna, peça capturada)], promoveu,
+        hash anterior, valor posicional anterior)
+        """
+        linha_inicio, col_inicio, _, _, pecas_capturadas = movimento
+        peca = self.tabuleiro[linha_inicio][col_inicio]
+        capturadas = [(linha, coluna, self.tabuleiro[linha][coluna]) for (linha, coluna) in pecas_capturadas]
+        hash_anterior, posicional_anterior = self.hash, self.posicional
+        promoveu, _ = self.mover(movimento)
+        return (movimento, peca, capturadas, promoveu, hash_anterior, posicional_anterior)
+    
+    def desfazer_movimento(self, registro):
+        """Desfaz um movimento executado por fazer_movimento"""
+        movimento, peca, capturadas, promoveu, self.hash, self.posicional = registro
+        linha_inicio, col_inicio, linha_fim, col_fim, _ = movimento
+        
+        # Devolve a peça à origem (já sem a promoção) e recoloca as capturadas
+        if promoveu:
+            self.contagem[self.tabuleiro[linha_fim][col_fim]] -= 1
+            self.contagem[peca] += 1
+        self.tabuleiro[linha_fim][col_fim] = VAZIO
+        self.tabuleiro[linha_inicio][col_inicio] = peca
+        for (linha, coluna, peca_capturada) in capturadas:
+            self.tabuleiro[linha][coluna] = peca_capturada
+            self.contagem[peca_capturada] += 1
+    
+    def get_movimentos_validos(self, jogador):
+        """Retorna todos os movimentos válidos para um jogador"""
+        movimentos = []
+        capturas_obrigatorias = []
+        
+        for linha in range(LINHAS):
+            for coluna in range(COLUNAS):
+                peca = self.tabuleiro[linha][coluna]
+                
+                # Verifica se a peça pertence ao jogador atual
+                if (jogador == "branco" and (peca == PEDRA_BRANCA or peca == DAMA_BRANCA)) or \
+                   (jogador == "vermelho" and (peca == PEDRA_PRETA or peca == DAMA_PRETA)):
+                    
+                    # Obtém movimentos para esta peça
+                    movs_peca = self.get_movimentos_peca(linha, coluna)
+                    
+                    for movimento in movs_peca:
+                        if movimento[4]:  # Se tem capturas
+                            capturas_obrigatorias.append(movimento)
+                        else:
+                            movimentos.append(movimento)
+        
+        # Regra da captura obrigatória
+        if capturas_obrigatorias:
+            return capturas_obrigatorias
+        return movimentos
+    
+    def movimentos_por_origem(self, jogador):
+        """
+        Movimentos válidos de 'jogador' indexados pela casa de origem:
+        {(linha, coluna): [movimentos]}. Ficam guardados enquanto a posição (hash)
+        não muda, então seleção, destaque e vencedor() geram os movimentos de cada
+        lado uma vez por lance. A busca não passa por aqui.
+        """
+        chave, por_jogador = self.movimentos_em_cache
+        if chave != self.hash:
+            # Posição nova (mover() mudou o hash): descarta o cache anterior
+            por_jogador = {}
+            self.movimentos_em_cache = (self.hash, por_jogador)
+        por_origem = por_jogador.get(jogador)
+        if por_origem is None:
+            por_origem = {}
+            for movimento in self.get_movimentos_validos(jogador):
+                por_origem.setdefault(movimento[:2], []).append(movimento)
+            por_jogador[jogador] = por_origem
+        return por_origem
+    
+    def get_movimentos_peca(self, linha, coluna):
+        """Obtém todos os movimentos válidos para uma peça específica"""
+        peca = self.tabuleiro[linha][coluna]
+        if peca == VAZIO:
+            return []
+        
+        movimentos = []
+        
+        # Define direções baseadas no tipo de peça
+        if peca == PEDRA_BRANCA:
+            direcoes = [(-1, -1), (-1, 1)]  # Move para cima
+        elif peca == PEDRA_PRETA:
+            direcoes = [(1, -1), (1, 1)]    # Move para baixo
+        else:  # Dama
+            direcoes = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+        
+        # Verifica movimentos simples
+        for dlinha, dcoluna in direcoes:
+            nova_linha = linha + dlinha
+            nova_coluna = coluna + dcoluna
+            
+            if 0 <= nova_linha < LINHAS and 0 <= nova_coluna < COLUNAS:
+                if self.tabuleiro[nova_linha][nova_coluna] == VAZIO:
+                    movimentos.append((linha, coluna, nova_linha, nova_coluna, []))
+        
+        # Verifica capturas
+        movimentos_captura = self.get_capturas_peca(linha, coluna, peca, [])
+        movimentos.extend(movimentos_captura)
+        
+        return movimentos
+    
+    def get_capturas_peca(self, linha, coluna, peca, capturadas_anteriores):
+        """
+        Obtém capturas em cadeia para uma peça, retornando só as sequências máximas.
+        Percorre as cadeias no próprio tabuleiro: as casas já capturadas e as casas
+        deixadas pela peça ficam marcadas numa máscara em vez de se copiar o tabuleiro.
+        """
+        movimentos = []
+        liberadas = 0
+        for (linha_cap, coluna_cap) in capturadas_anteriores:
+            liberadas |= 1 << (linha_cap * COLUNAS + coluna_cap)
+        
+        # Caminho de capturas compartilhado (empilha/desempilha a cada salto)
+        caminho = list(capturadas_anteriores)
+        self._explorar_capturas(linha, coluna, linha, coluna, PASSOS_PECA[peca], INIMIGAS[peca],
+                                liberadas, caminho, movimentos)
+        return movimentos
+    
+    def _explorar_capturas(self, linha, coluna, linha_atual, coluna_atual, passos, inimigas,
+                           liberadas, caminho, movimentos):
+        """Estende a cadeia a partir da casa atual; retorna True se houve captura"""
+        tabuleiro = self.tabuleiro
+        capturou = False
+        for dlinha, dcoluna in passos:
+            # Destino após a captura e posição da possível peça inimiga
+            linha_destino = linha_atual + 2 * dlinha
+            coluna_destino = coluna_atual + 2 * dcoluna
+            if not (0 <= linha_destino < LINHAS and 0 <= coluna_destino < COLUNAS):
+                continue
+            
+            linha_inimigo = linha_atual + dlinha
+            coluna_inimigo = coluna_atual + dcoluna
+            if tabuleiro[linha_inimigo][coluna_inimigo] not in inimigas:
+                continue
+            casa_inimigo = 1 << (linha_inimigo * COLUNAS + coluna_inimigo)
+            if liberadas & casa_inimigo:
+                continue
+            if (tabuleiro[linha_destino][coluna_destino] != VAZIO and
+                    not liberadas >> (linha_destino * COLUNAS + coluna_destino) & 1):
+                continue
+            
+            capturou = True
+            caminho.append((linha_inimigo, coluna_inimigo))
+            # A peça capturada sai do tabuleiro e a casa atual fica vazia
+            casa_atual = 1 << (linha_atual * COLUNAS + coluna_atual)
+            if not self._explorar_capturas(linha, coluna, linha_destino, coluna_destino, passos, inimigas,
+                                           liberadas | casa_inimigo | casa_atual, caminho, movimentos):
+                movimentos.append((linha, coluna, linha_destino, coluna_destino, caminho[:]))
+            caminho.pop()
+        return capturou
+    
+    def eh_inimigo(self, peca1, peca2):
+        """Verifica se duas peças são inimigas"""
+        if peca1 == VAZIO or peca2 == VAZIO:
+            return False
+        
+        brancas = [PEDRA_BRANCA, DAMA_BRANCA]
+        pretas = [PEDRA_PRETA, DAMA_PRETA]
+        
+        return (peca1 in brancas and peca2 in pretas) or (peca1 in pretas and peca2 in brancas)
+    
+    def contar_pecas(self):
+        """Conta o número de peças de cada tipo (contagem mantida por mover/desfazer)"""
+        return self.contagem[PEDRA_BRANCA], self.contagem[PEDRA_PRETA], \
+            self.contagem[DAMA_BRANCA], self.contagem[DAMA_PRETA]
+    
+    def mobilidade(self):
+        """Número de movimentos simples disponíveis para cada lado: (brancas, vermelhas)"""
+        brancas = vermelhas = 0
+        for linha, coluna in COORDENADAS:
+            peca = self.tabuleiro[linha][coluna]
+            if peca == VAZIO:
+                continue
+            for dlinha, dcoluna in PASSOS_PECA[peca]:
+                nova_linha, nova_coluna = linha + dlinha, coluna + dcoluna
+                if (0 <= nova_linha < LINHAS and 0 <= nova_coluna < COLUNAS and
+                        self.tabuleiro[nova_linha][nova_coluna] == VAZIO):
+                    if peca == PEDRA_BRANCA or peca == DAMA_BRANCA:
+                        brancas += 1
+                    else:
+                        vermelhas += 1
+        return brancas, vermelhas
+    
+    def avaliar(self):
+        """
+        Função de avaliação heurística
+        Retorna valor positivo se brancas (jogador) estão em vantagem.
+        Material e tabela peça-casa (avanço, guarda da última linha, centro) são
+        mantidos por mover/desfazer; só a mobilidade é calculada na hora.
+        """
+        brancas, pretas, damas_brancas, damas_pretas = self.contar_pecas()
+        pesos = self.pesos
+        
+        # Calcula vantagem material
+        vantagem = (brancas - pretas) * pesos.pedra
+        vantagem += (damas_brancas - damas_pretas) * pesos.dama
+        
+        # Vantagem posicional (incremental)
+        vantagem += self.posicional
+        
+        if pesos.mobilidade:
+            mobilidade_brancas, mobilidade_vermelhas = self.mobilidade()
+            vantagem += (mobilidade_brancas - mobilidade_vermelhas) * pesos.mobilidade
+        
+        return vantagem
+    
+    def copiar(self):
+        """Cria uma cópia profunda do tabuleiro"""
+        # Evita o construtor: criar_tabuleiro() seria descartado logo em seguida
+        novo_tabuleiro = Tabuleiro.__new__(Tabuleiro)
+        novo_tabuleiro.tabuleiro = [linha[:] for linha in self.tabuleiro]
+        novo_tabuleiro.hash = self.hash
+        novo_tabuleiro.contagem = self.contagem[:]
+        novo_tabuleiro.posicional = self.posicional
+        novo_tabuleiro.pesos = self.pesos
+        return novo_tabuleiro
+    
+    def vencedor(self):
+        """Verifica se há um vencedor"""
+        brancas, pretas, damas_brancas, damas_pretas = self.contar_pecas()
+        
+        # Um lado sem peças (pedras ou damas) ou sem movimentos perde
+        if brancas + damas_brancas == 0 or not self.movimentos_por_origem("branco"):
+            return "vermelho"  # IA vence
+        elif pretas + damas_pretas == 0 or not self.movimentos_por_origem("vermelho"):
+            return "branco"    # Jogador vence
+        
+        return None
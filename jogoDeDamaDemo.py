@@ -1,8 +1,16 @@
+import os
 import pygame
+import random
 import sys
-import math
-import time
-import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Regras e busca ficam no pacote damas (sem dependência do pygame)
+from damas import (LINHAS, COLUNAS, VAZIO, PEDRA_BRANCA, PEDRA_PRETA, DAMA_BRANCA, DAMA_PRETA,
+                   TabuleiroBitboard, IA, BuscaCancelada)
+from damas.livro import LivroAberturas
+from damas.finais import TabelasFinais
+from damas.pdn import GravadorPartidas, RESULTADOS
 
 # Inicializar PyGame
 pygame.init()
@@ -10,8 +18,6 @@ pygame.init()
 # Constantes
 LARGURA = 800
 ALTURA = 800
-LINHAS = 8
-COLUNAS = 8
 TAMANHO_QUADRADO = LARGURA // COLUNAS
 RAIO_PECA = TAMANHO_QUADRADO // 2 - 15
 
@@ -26,285 +32,194 @@ VERDE = (0, 180, 0)
 MARROM = (165, 42, 42)
 AZUL_CLARO = (173, 216, 230)
 
-# Constantes do jogo
-VAZIO = 0
-PEDRA_BRANCA = 1
-PEDRA_PRETA = 2
-DAMA_BRANCA = 3
-DAMA_PRETA = 4
+# Tempo por jogada da IA no modo por tempo (tecla T)
+TEMPO_IA_MS = 1000
+# Tempo mínimo entre o início da busca e a jogada da IA (para parecer natural)
+ATRASO_IA_MS = 500
+# Intervalo de troca entre threads (s): menor que o padrão (5 ms) para que a thread
+# da busca devolva o GIL a tempo de a janela manter 60 quadros por segundo
+INTERVALO_TROCA_THREADS = 0.001
+# Textos renderizados guardados pelo Renderizador (o cache é esvaziado ao encher)
+LIMITE_TEXTOS = 256
+# Partidas jogadas, acrescentadas em PDN (analisáveis com python -m damas.analise)
+ARQUIVO_PARTIDAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "partidas.pdn")
 
-class Tabuleiro:
-    def __init__(self):
-        self.tabuleiro = []
-        self.criar_tabuleiro()
-    
-    def criar_tabuleiro(self):
-        """Cria o tabuleiro inicial com as peças nas posições corretas"""
-        self.tabuleiro = []
-        for linha in range(LINHAS):
-            self.tabuleiro.append([])
-            for coluna in range(COLUNAS):
-                # Posiciona peças apenas em quadrados escuros (linha+coluna é ímpar)
-                if (linha + coluna) % 2 == 1:
-                    if linha < 3:
-                        self.tabuleiro[linha].append(PEDRA_PRETA)  # IA
-                    elif linha > 4:
-                        self.tabuleiro[linha].append(PEDRA_BRANCA)  # Jogador
-                    else:
-                        self.tabuleiro[linha].append(VAZIO)
-                else:
-                    self.tabuleiro[linha].append(VAZIO)
+class Renderizador:
+    """
+    Desenha o jogo atualizando só os retângulos que mudaram. O tabuleiro vazio, as
+    peças e as marcas são pré-desenhados em superfícies e os textos renderizados
+    ficam em cache; num quadro em que nada mudou, a tela não é tocada.
+    """
+    def __init__(self, janela):
+        self.janela = janela
+        self.fundo = self._criar_fundo()
+        self.sprites = {peca: self._criar_peca(peca)
+                        for peca in (PEDRA_BRANCA, PEDRA_PRETA, DAMA_BRANCA, DAMA_PRETA)}
+        self.marcas = {"selecionada": self._criar_marca(VERDE, RAIO_PECA + 5, 3),
+                       "movimento": self._criar_marca(AZUL_CLARO, 15),
+                       "captura": self._criar_marca(AMARELO, 15)}
+        # Fundo semi-transparente da mensagem de fim de jogo
+        self.painel = pygame.Surface((400, 100), pygame.SRCALPHA)
+        self.painel.fill((255, 255, 255, 200))
+        self.textos = {}  # (fonte, texto, cor) -> superfície
+        # Estado desenhado: (peça, marca) de cada casa e as camadas de cima
+        self.casas = [[(VAZIO, None)] * COLUNAS for _ in range(LINHAS)]
+        self.camadas = []
+        self.chave_casas = None
+        self.sujos = []
+        self.invalidar()
     
-    def desenhar(self, janela):
-        """Desenha o tabuleiro e as peças"""
-        janela.fill(MARROM)
-        
-        # Desenha os quadrados do tabuleiro
+    def _criar_fundo(self):
+        """Tabuleiro sem peças"""
+        fundo = pygame.Surface((LARGURA, ALTURA))
+        fundo.fill(MARROM)
         for linha in range(LINHAS):
             for coluna in range(COLUNAS):
                 # Quadrados pretos (onde as peças podem estar)
-                if (linha + coluna) % 2 == 1:
-                    cor = PRETO
-                else:
-                    cor = BRANCO
-                pygame.draw.rect(janela, cor, (coluna * TAMANHO_QUADRADO, linha * TAMANHO_QUADRADO, TAMANHO_QUADRADO, TAMANHO_QUADRADO))
-        
-        # Desenha as peças
-        for linha in range(LINHAS):
-            for coluna in range(COLUNAS):
-                peca = self.tabuleiro[linha][coluna]
-                if peca != VAZIO:
-                    x = coluna * TAMANHO_QUADRADO + TAMANHO_QUADRADO // 2
-                    y = linha * TAMANHO_QUADRADO + TAMANHO_QUADRADO // 2
-                    
-                    # Cor da peça
-                    if peca == PEDRA_BRANCA or peca == DAMA_BRANCA:
-                        cor_peca = BRANCO
-                    else:
-                        cor_peca = VERMELHO
-                    
-                    # Desenha o círculo da peça
-                    pygame.draw.circle(janela, cor_peca, (x, y), RAIO_PECA)
-                    pygame.draw.circle(janela, PRETO, (x, y), RAIO_PECA, 2)
-                    
-                    # Desenha uma coroa se for uma dama
-                    if peca == DAMA_BRANCA or peca == DAMA_PRETA:
-                        pygame.draw.circle(janela, AMARELO, (x, y), RAIO_PECA // 2)
-                        pygame.draw.circle(janela, PRETO, (x, y), RAIO_PECA // 2, 1)
-    
-    def mover(self, movimento):
-        """Executa um movimento no tabuleiro"""
-        linha_inicio, col_inicio, linha_fim, col_fim, pecas_capturadas = movimento
-        
-        # Move a peça
-        peca = self.tabuleiro[linha_inicio][col_inicio]
-        self.tabuleiro[linha_inicio][col_inicio] = VAZIO
-        self.tabuleiro[linha_fim][col_fim] = peca
-        
-        # Remove peças capturadas
-        for (linha, coluna) in pecas_capturadas:
-            self.tabuleiro[linha][coluna] = VAZIO
-        
-        # Verifica se a peça deve se tornar uma dama
-        if peca == PEDRA_BRANCA and linha_fim == 0:
-            self.tabuleiro[linha_fim][col_fim] = DAMA_BRANCA
-            return True, "Pedra branca virou dama!"
-        elif peca == PEDRA_PRETA and linha_fim == LINHAS - 1:
-            self.tabuleiro[linha_fim][col_fim] = DAMA_PRETA
-            return True, "Pedra vermelha virou dama!"
-        
-        return False, ""
+                cor = PRETO if (linha + coluna) % 2 == 1 else BRANCO
+                pygame.draw.rect(fundo, cor, (coluna * TAMANHO_QUADRADO, linha * TAMANHO_QUADRADO,
+                                              TAMANHO_QUADRADO, TAMANHO_QUADRADO))
+        return fundo
     
-    def get_movimentos_validos(self, jogador):
-        """Retorna todos os movimentos válidos para um jogador"""
-        movimentos = []
-        capturas_obrigatorias = []
-        
-        for linha in range(LINHAS):
-            for coluna in range(COLUNAS):
-                peca = self.tabuleiro[linha][coluna]
-                
-                # Verifica se a peça pertence ao jogador atual
-                if (jogador == "branco" and (peca == PEDRA_BRANCA or peca == DAMA_BRANCA)) or \
-                   (jogador == "vermelho" and (peca == PEDRA_PRETA or peca == DAMA_PRETA)):
-                    
-                    # Obtém movimentos para esta peça
-                    movs_peca = self.get_movimentos_peca(linha, coluna)
-                    
-                    for movimento in movs_peca:
-                        if movimento[4]:  # Se tem capturas
-                            capturas_obrigatorias.append(movimento)
-                        else:
-                            movimentos.append(movimento)
-        
-        # Regra da captura obrigatória
-        if capturas_obrigatorias:
-            return capturas_obrigatorias
-        return movimentos
+    def _criar_peca(self, peca):
+        """Peça desenhada numa superfície transparente do tamanho de uma casa"""
+        sprite = pygame.Surface((TAMANHO_QUADRADO, TAMANHO_QUADRADO), pygame.SRCALPHA)
+        centro = (TAMANHO_QUADRADO // 2, TAMANHO_QUADRADO // 2)
+        cor_peca = BRANCO if peca in (PEDRA_BRANCA, DAMA_BRANCA) else VERMELHO
+        pygame.draw.circle(sprite, cor_peca, centro, RAIO_PECA)
+        pygame.draw.circle(sprite, PRETO, centro, RAIO_PECA, 2)
+        # Coroa das damas
+        if peca in (DAMA_BRANCA, DAMA_PRETA):
+            pygame.draw.circle(sprite, AMARELO, centro, RAIO_PECA // 2)
+            pygame.draw.circle(sprite, PRETO, centro, RAIO_PECA // 2, 1)
+        return sprite
     
-    def get_movimentos_peca(self, linha, coluna):
-        """Obtém todos os movimentos válidos para uma peça específica"""
-        peca = self.tabuleiro[linha][coluna]
-        if peca == VAZIO:
-            return []
-        
-        movimentos = []
-        
-        # Define direções baseadas no tipo de peça
-        if peca == PEDRA_BRANCA:
-            direcoes = [(-1, -1), (-1, 1)]  # Move para cima
-        elif peca == PEDRA_PRETA:
-            direcoes = [(1, -1), (1, 1)]    # Move para baixo
-        else:  # Dama
-            direcoes = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        
-        # Verifica movimentos simples
-        for dlinha, dcoluna in direcoes:
-            nova_linha = linha + dlinha
-            nova_coluna = coluna + dcoluna
-            
-            if 0 <= nova_linha < LINHAS and 0 <= nova_coluna < COLUNAS:
-                if self.tabuleiro[nova_linha][nova_coluna] == VAZIO:
-                    movimentos.append((linha, coluna, nova_linha, nova_coluna, []))
-        
-        # Verifica capturas
-        movimentos_captura = self.get_capturas_peca(linha, coluna, peca, [])
-        movimentos.extend(movimentos_captura)
-        
-        return movimentos
+    def _criar_marca(self, cor, raio, espessura=0):
+        """Destaque de uma casa: anel (peça selecionada) ou círculo com borda (destino)"""
+        marca = pygame.Surface((TAMANHO_QUADRADO, TAMANHO_QUADRADO), pygame.SRCALPHA)
+        centro = (TAMANHO_QUADRADO // 2, TAMANHO_QUADRADO // 2)
+        pygame.draw.circle(marca, cor, centro, raio, espessura)
+        if not espessura:
+            pygame.draw.circle(marca, PRETO, centro, raio, 1)
+        return marca
     
-    def get_capturas_peca(self, linha, coluna, peca, capturadas_anteriores):
-        """Obtém capturas em cadeia para uma peça"""
-        movimentos = []
-        direcoes = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        
-        # Para pedras, restringe direções
-        if peca == PEDRA_BRANCA:
-            direcoes = [(-1, -1), (-1, 1)]
-        elif peca == PEDRA_PRETA:
-            direcoes = [(1, -1), (1, 1)]
-        
-        for dlinha, dcoluna in direcoes:
-            # Posição da possível peça inimiga
-            linha_inimigo = linha + dlinha
-            coluna_inimigo = coluna + dcoluna
-            
-            # Posição de destino após a captura
-            linha_destino = linha + 2 * dlinha
-            coluna_destino = coluna + 2 * dcoluna
-            
-            # Verifica se a captura é válida
-            if (0 <= linha_inimigo < LINHAS and 0 <= coluna_inimigo < COLUNAS and
-                0 <= linha_destino < LINHAS and 0 <= coluna_destino < COLUNAS):
-                
-                peca_inimiga = self.tabuleiro[linha_inimigo][coluna_inimigo]
-                
-                # Verifica se há uma peça inimiga e se o destino está vazio
-                if (self.eh_inimigo(peca, peca_inimiga) and 
-                    self.tabuleiro[linha_destino][coluna_destino] == VAZIO and
-                    (linha_inimigo, coluna_inimigo) not in capturadas_anteriores):
-                    
-                    # Cria a lista de peças capturadas
-                    novas_capturadas = capturadas_anteriores + [(linha_inimigo, coluna_inimigo)]
-                    
-                    # Cria movimento de captura
-                    movimento = (linha, coluna, linha_destino, coluna_destino, novas_capturadas)
-                    movimentos.append(movimento)
-                    
-                    # Verifica capturas múltiplas
-                    # Cria um tabuleiro temporário para verificar mais capturas
-                    tab_temp = self.copiar()
-                    tab_temp.mover(movimento)
-                    
-                    # Verifica se a mesma peça pode capturar novamente
-                    mais_capturas = tab_temp.get_capturas_peca(linha_destino, coluna_destino, peca, novas_capturadas)
-                    
-                    # Se houver mais capturas, substitui o movimento atual
-                    if mais_capturas:
-                        # Remove o movimento atual e adiciona os movimentos com múltiplas capturas
-                        movimentos.remove(movimento)
-                        for mc in mais_capturas:
-                            # Mantém a posição inicial original
-                            mov_final = (linha, coluna, mc[2], mc[3], mc[4])
-                            movimentos.append(mov_final)
-        
-        return movimentos
+    def texto(self, fonte, texto, cor):
+        """Superfície do texto, renderizada só na primeira vez"""
+        chave = (fonte, texto, cor)
+        superficie = self.textos.get(chave)
+        if superficie is None:
+            if len(self.textos) >= LIMITE_TEXTOS:
+                self.textos.clear()
+            superficie = self.textos[chave] = fonte.render(texto, True, cor)
+        return superficie
     
-    def eh_inimigo(self, peca1, peca2):
-        """Verifica se duas peças são inimigas"""
-        if peca1 == VAZIO or peca2 == VAZIO:
-            return False
-        
-        brancas = [PEDRA_BRANCA, DAMA_BRANCA]
-        pretas = [PEDRA_PRETA, DAMA_PRETA]
-        
-        return (peca1 in brancas and peca2 in pretas) or (peca1 in pretas and peca2 in brancas)
+    def invalidar(self):
+        """Faz o próximo quadro redesenhar a janela inteira (início ou janela exposta)"""
+        self.sujos = [self.janela.get_rect()]
     
-    def contar_pecas(self):
-        """Conta o número de peças de cada tipo"""
-        brancas = pretas = damas_brancas = damas_pretas = 0
-        
-        for linha in range(LINHAS):
-            for coluna in range(COLUNAS):
-                peca = self.tabuleiro[linha][coluna]
-                if peca == PEDRA_BRANCA:
-                    brancas += 1
-                elif peca == PEDRA_PRETA:
-                    pretas += 1
-                elif peca == DAMA_BRANCA:
-                    damas_brancas += 1
-                elif peca == DAMA_PRETA:
-                    damas_pretas += 1
-        
-        return brancas, pretas, damas_brancas, damas_pretas
+    def _estado_casas(self, tabuleiro, selecionada, movimentos):
+        """(peça, marca) de cada casa"""
+        casas = [[(peca, None) for peca in linha] for linha in tabuleiro.tabuleiro]
+        if selecionada:
+            linha, coluna = selecionada
+            casas[linha][coluna] = (casas[linha][coluna][0], "selecionada")
+            # 'movimentos' são só os da peça selecionada; cor diferente para capturas. Só a
+            # marca muda: a captura em cadeia de uma dama pode terminar na própria origem
+            for movimento in movimentos:
+                linha, coluna = movimento[2], movimento[3]
+                casas[linha][coluna] = (casas[linha][coluna][0], "captura" if movimento[4] else "movimento")
+        return casas
     
-    def avaliar(self):
+    def desenhar(self, tabuleiro, selecionada, movimentos, camadas):
         """
-        Função de avaliação heurística
-        Retorna valor positivo se brancas (jogador) estão em vantagem
+        Desenha o quadro: 'camadas' é a lista de (superfície, posição) desenhada sobre
+        o tabuleiro. Atualiza na tela só as casas e camadas que mudaram.
         """
-        brancas, pretas, damas_brancas, damas_pretas = self.contar_pecas()
-        
-        # Valores básicos
-        valor_pedra = 1
-        valor_dama = 3
-        
-        # Calcula vantagem material
-        vantagem = (brancas - pretas) * valor_pedra
-        vantagem += (damas_brancas - damas_pretas) * valor_dama
-        
-        return vantagem
-    
-    def copiar(self):
-        """Cria uma cópia profunda do tabuleiro"""
-        novo_tabuleiro = Tabuleiro()
-        novo_tabuleiro.tabuleiro = [linha[:] for linha in self.tabuleiro]
-        return novo_tabuleiro
+        sujos, self.sujos = self.sujos, []
+        
+        # As casas só são recalculadas quando a posição ou a seleção mudam
+        chave = (tabuleiro.hash, selecionada, len(movimentos))
+        if chave != self.chave_casas:
+            self.chave_casas = chave
+            casas = self._estado_casas(tabuleiro, selecionada, movimentos)
+            for linha in range(LINHAS):
+                for coluna in range(COLUNAS):
+                    if casas[linha][coluna] != self.casas[linha][coluna]:
+                        sujos.append(pygame.Rect(coluna * TAMANHO_QUADRADO, linha * TAMANHO_QUADRADO,
+                                                 TAMANHO_QUADRADO, TAMANHO_QUADRADO))
+            self.casas = casas
+        
+        # Camadas que sumiram, apareceram ou mudaram de lugar
+        camadas = [(superficie, superficie.get_rect(topleft=posicao)) for superficie, posicao in camadas]
+        if camadas != self.camadas:
+            antigas = {(id(superficie), tuple(retangulo)) for superficie, retangulo in self.camadas}
+            novas = {(id(superficie), tuple(retangulo)) for superficie, retangulo in camadas}
+            sujos.extend(pygame.Rect(retangulo) for _, retangulo in antigas ^ novas)
+            self.camadas = camadas
+        
+        if not sujos:
+            return
+        for area in sujos:
+            self._redesenhar(area)
+        pygame.display.update(sujos)
     
-    def vencedor(self):
-        """Verifica se há um vencedor"""
-        brancas, pretas, _, _ = self.contar_pecas()
-        
-        if brancas == 0 or not self.get_movimentos_validos("branco"):
-            return "vermelho"  # IA vence
-        elif pretas == 0 or not self.get_movimentos_validos("vermelho"):
-            return "branco"    # Jogador vence
-        
-        return None
+    def _redesenhar(self, area):
+        """Redesenha tudo o que aparece dentro de 'area'"""
+        self.janela.set_clip(area)
+        self.janela.blit(self.fundo, area, area)
+        primeira_linha, ultima_linha = area.top // TAMANHO_QUADRADO, (area.bottom - 1) // TAMANHO_QUADRADO
+        primeira_coluna, ultima_coluna = area.left // TAMANHO_QUADRADO, (area.right - 1) // TAMANHO_QUADRADO
+        for linha in range(max(0, primeira_linha), min(LINHAS - 1, ultima_linha) + 1):
+            for coluna in range(max(0, primeira_coluna), min(COLUNAS - 1, ultima_coluna) + 1):
+                peca, marca = self.casas[linha][coluna]
+                posicao = (coluna * TAMANHO_QUADRADO, linha * TAMANHO_QUADRADO)
+                if peca != VAZIO:
+                    self.janela.blit(self.sprites[peca], posicao)
+                if marca:
+                    self.janela.blit(self.marcas[marca], posicao)
+        for superficie, retangulo in self.camadas:
+            if retangulo.colliderect(area):
+                self.janela.blit(superficie, retangulo)
+        self.janela.set_clip(None)
 
 class Jogo:
-    def __init__(self):
+    def __init__(self, classe_tabuleiro=TabuleiroBitboard, ia=None):
+        self.classe_tabuleiro = classe_tabuleiro
+        # Usa o livro de aberturas se ele tiver sido construído (python -m damas.livro),
+        # sorteando entre os movimentos dele para variar as partidas, e as tabelas de
+        # finais se tiverem sido geradas (python -m damas.finais)
+        self.ia = ia if ia is not None else IA(livro=LivroAberturas.carregar(gerador=random.Random()),
+                                               tabelas=TabelasFinais.carregar())
         self.janela = pygame.display.set_mode((LARGURA, ALTURA))
         pygame.display.set_caption("Damas com IA - Minimax e Alpha-Beta")
         self.relogio = pygame.time.Clock()
         self.fonte = pygame.font.SysFont('Arial', 24)
         self.fonte_grande = pygame.font.SysFont('Arial', 36, bold=True)
+        self.renderizador = Renderizador(self.janela)
+        # A busca da IA roda numa thread para não congelar a janela
+        self.executor_ia = ThreadPoolExecutor(max_workers=1)
+        self.busca_ia = None         # Future da busca em andamento
+        self.cancelamento_ia = None  # threading.Event que interrompe essa busca
+        self.tempos_quadro = []      # Duração dos quadros (ms) enquanto a IA pensa
+        # Ponderação: na vez do jogador, a IA já busca a resposta ao movimento previsto
+        self.ponderar = True              # Tecla P liga/desliga
+        self.ponderacao = None            # Future dessa busca
+        self.cancelamento_ponderacao = None
+        self.movimento_previsto = None    # Movimento do jogador que ela supõe
+        self.profundidade_ia = 3  # Profundidade padrão
+        self.tempo_ia_ms = None   # Com tempo definido, a IA usa aprofundamento iterativo
+        self.gravador = GravadorPartidas(ARQUIVO_PARTIDAS)
         self.resetar()
     
     def resetar(self):
         """Reseta o jogo para o estado inicial"""
-        self.tabuleiro = Tabuleiro()
+        self.cancelar_jogada_ia()
+        self.cancelar_ponderacao()
+        self.tabuleiro = self.classe_tabuleiro()
         self.turno = "branco"  # Jogador humano começa
+        # Uma partida interrompida fica no arquivo como incompleta ("*")
+        self.gravador.iniciar({"Event": "jogoDeDamaDemo", "White": "Jogador", "Black": "IA"},
+                              self.tabuleiro, self.turno)
         self.peca_selecionada = None
         self.movimentos_validos = []
         self.jogando = True
@@ -313,71 +228,46 @@ class Jogo:
         self.tempo_ia = 0
     
     def atualizar(self):
-        """Atualiza a tela do jogo"""
-        self.tabuleiro.desenhar(self.janela)
-        self.desenhar_movimentos_validos()
-        self.desenhar_informacoes()
-        pygame.display.update()
-    
-    def desenhar_movimentos_validos(self):
-        """Desenha os movimentos válidos para a peça selecionada"""
-        if self.peca_selecionada:
-            linha, coluna = self.peca_selecionada
-            
-            # Destaca a peça selecionada
-            x = coluna * TAMANHO_QUADRADO + TAMANHO_QUADRADO // 2
-            y = linha * TAMANHO_QUADRADO + TAMANHO_QUADRADO // 2
-            pygame.draw.circle(self.janela, VERDE, (x, y), RAIO_PECA + 5, 3)
-            
-            # Desenha os movimentos válidos para esta peça
-            for movimento in self.movimentos_validos:
-                if movimento[0] == linha and movimento[1] == coluna:
-                    linha_dest, col_dest = movimento[2], movimento[3]
-                    x_dest = col_dest * TAMANHO_QUADRADO + TAMANHO_QUADRADO // 2
-                    y_dest = linha_dest * TAMANHO_QUADRADO + TAMANHO_QUADRADO // 2
-                    
-                    # Cor diferente para capturas
-                    cor = AMARELO if movimento[4] else AZUL_CLARO
-                    pygame.draw.circle(self.janela, cor, (x_dest, y_dest), 15)
-                    pygame.draw.circle(self.janela, PRETO, (x_dest, y_dest), 15, 1)
+        """Atualiza a tela do jogo (só as partes que mudaram desde o último quadro)"""
+        self.renderizador.desenhar(self.tabuleiro, self.peca_selecionada, self.movimentos_validos,
+                                   self.informacoes())
     
-    def desenhar_informacoes(self):
-        """Desenha informações do jogo na tela"""
+    def informacoes(self):
+        """Textos e painéis desenhados sobre o tabuleiro: lista de (superfície, posição)"""
+        texto = self.renderizador.texto
+        itens = []
+        
         # Informações do turno
         turno_texto = f"TURNO: {'JOGADOR (Brancas)' if self.turno == 'branco' else 'IA (Vermelhas)'}"
-        turno_surface = self.fonte.render(turno_texto, True, PRETO)
-        self.janela.blit(turno_surface, (10, 10))
+        itens.append((texto(self.fonte, turno_texto, PRETO), (10, 10)))
         
         # Contador de peças
         brancas, pretas, damas_b, damas_p = self.tabuleiro.contar_pecas()
         contador_texto = f"Brancas: {brancas} (Damas: {damas_b}) | Vermelhas: {pretas} (Damas: {damas_p})"
-        contador_surface = self.fonte.render(contador_texto, True, PRETO)
-        self.janela.blit(contador_surface, (10, 40))
+        itens.append((texto(self.fonte, contador_texto, PRETO), (10, 40)))
         
         # Instruções
-        instrucoes = self.fonte.render("R-Reiniciar | 1-4 Dificuldade | ESPAÇO-IA joga", True, PRETO)
-        self.janela.blit(instrucoes, (10, ALTURA - 40))
+        instrucoes = "R-Reiniciar | 1-4 Dificuldade | T-Tempo | P-Ponderar | ESPAÇO-IA joga"
+        itens.append((texto(self.fonte, instrucoes, PRETO), (10, ALTURA - 40)))
         
         # Mostrar que a IA está pensando
         if self.turno == "vermelho" and self.jogando:
             pensar_texto = "IA pensando..." + "." * (int(pygame.time.get_ticks() / 500) % 4)
-            pensar_surface = self.fonte.render(pensar_texto, True, VERMELHO)
-            self.janela.blit(pensar_surface, (LARGURA - 200, 10))
+            itens.append((texto(self.fonte, pensar_texto, VERMELHO), (LARGURA - 200, 10)))
         
         # Mostrar vencedor
         if self.vencedor:
             vencedor_texto = "VOCÊ VENCEU!" if self.vencedor == "branco" else "IA VENCEU!"
-            vencedor_surface = self.fonte_grande.render(vencedor_texto, True, VERDE if self.vencedor == "branco" else VERMELHO)
+            vencedor_surface = texto(self.fonte_grande, vencedor_texto,
+                                     VERDE if self.vencedor == "branco" else VERMELHO)
             
             # Fundo semi-transparente
-            surf = pygame.Surface((400, 100), pygame.SRCALPHA)
-            surf.fill((255, 255, 255, 200))
-            self.janela.blit(surf, (LARGURA//2 - 200, ALTURA//2 - 50))
-            
-            self.janela.blit(vencedor_surface, (LARGURA//2 - vencedor_surface.get_width()//2, ALTURA//2 - 30))
+            itens.append((self.renderizador.painel, (LARGURA//2 - 200, ALTURA//2 - 50)))
+            itens.append((vencedor_surface, (LARGURA//2 - vencedor_surface.get_width()//2, ALTURA//2 - 30)))
             
-            reiniciar_text = self.fonte.render("Pressione R para jogar novamente", True, PRETO)
-            self.janela.blit(reiniciar_text, (LARGURA//2 - reiniciar_text.get_width()//2, ALTURA//2 + 20))
+            reiniciar_text = texto(self.fonte, "Pressione R para jogar novamente", PRETO)
+            itens.append((reiniciar_text, (LARGURA//2 - reiniciar_text.get_width()//2, ALTURA//2 + 20)))
+        return itens
     
     def selecionar(self, linha, coluna):
         """Seleciona uma peça no tabuleiro ou move uma peça selecionada"""
@@ -395,6 +285,7 @@ class Jogo:
                     
                     # Executa o movimento
                     self.executar_movimento(movimento)
+                    self.verificar_ponderacao(movimento)
                     return
             
             # Se não foi um movimento válido, desseleciona ou seleciona outra peça
@@ -405,13 +296,12 @@ class Jogo:
         peca = self.tabuleiro.tabuleiro[linha][coluna]
         if peca in [PEDRA_BRANCA, DAMA_BRANCA]:  # Só pode selecionar peças brancas
             self.peca_selecionada = (linha, coluna)
-            # Obtém todos os movimentos válidos para o jogador
-            todos_movimentos = self.tabuleiro.get_movimentos_validos("branco")
-            # Filtra apenas os movimentos desta peça
-            self.movimentos_validos = [m for m in todos_movimentos if m[0] == linha and m[1] == coluna]
+            # Movimentos desta peça (os do jogador são gerados uma vez por posição)
+            self.movimentos_validos = self.tabuleiro.movimentos_por_origem("branco").get((linha, coluna), [])
     
-    def executar_movimento(self, movimento):
-        """Executa um movimento no tabuleiro"""
+    def executar_movimento(self, movimento, estatisticas=None):
+        """Executa um movimento no tabuleiro e o grava (com as estatísticas da busca, se da IA)"""
+        self.gravador.lance(movimento, estatisticas)
         virou_dama, mensagem = self.tabuleiro.mover(movimento)
         
         if virou_dama and mensagem:
@@ -425,114 +315,134 @@ class Jogo:
         self.vencedor = self.tabuleiro.vencedor()
         if self.vencedor:
             self.jogando = False
+            self.gravador.terminar(RESULTADOS[self.vencedor])
             print(f"Fim de jogo! Vencedor: {self.vencedor}")
             return
         
         # Muda o turno
         self.turno = "vermelho" if self.turno == "branco" else "branco"
     
-    def minimax(self, tabuleiro, profundidade, alpha, beta, maximizando):
+    def jogada_ia(self, profundidade=3, tempo_limite_ms=None):
         """
-        Implementação do algoritmo Minimax com poda Alpha-Beta
+        Inicia a busca da jogada da IA numa thread (por profundidade fixa ou por tempo,
+        se tempo_limite_ms for dado). O resultado é aplicado por verificar_jogada_ia.
         """
-        # Condição de parada
-        if profundidade == 0 or tabuleiro.vencedor():
-            return tabuleiro.avaliar()
-        
-        if maximizando:
-            # IA (vermelhas) quer minimizar a vantagem do jogador
-            max_eval = float('-inf')
-            movimentos = tabuleiro.get_movimentos_validos("vermelho")
-            
-            for movimento in movimentos:
-                tabuleiro_copia = tabuleiro.copiar()
-                tabuleiro_copia.mover(movimento)
-                
-                eval = self.minimax(tabuleiro_copia, profundidade - 1, alpha, beta, False)
-                max_eval = max(max_eval, eval)
-                
-                # Poda Alpha-Beta
-                alpha = max(alpha, eval)
-                if beta <= alpha:
-                    break
-            
-            return max_eval
-        else:
-            # Simula jogador (brancas) querendo maximizar
-            min_eval = float('inf')
-            movimentos = tabuleiro.get_movimentos_validos("branco")
-            
-            for movimento in movimentos:
-                tabuleiro_copia = tabuleiro.copiar()
-                tabuleiro_copia.mover(movimento)
-                
-                eval = self.minimax(tabuleiro_copia, profundidade - 1, alpha, beta, True)
-                min_eval = min(min_eval, eval)
-                
-                # Poda Alpha-Beta
-                beta = min(beta, eval)
-                if beta <= alpha:
-                    break
-            
-            return min_eval
-    
-    def melhor_movimento_ia(self, profundidade=3):
-        """Encontra o melhor movimento para a IA usando Minimax"""
-        print(f"\nIA pensando (profundidade {profundidade})...")
-        tempo_inicio = time.time()
-        
-        melhor_movimento = None
-        melhor_valor = float('-inf')
-        
-        movimentos = self.tabuleiro.get_movimentos_validos("vermelho")
-        
-        if not movimentos:
-            return None
-        
-        # Para cada movimento possível
-        for i, movimento in enumerate(movimentos):
-            # Cria cópia do tabuleiro
-            tabuleiro_copia = self.tabuleiro.copiar()
-            tabuleiro_copia.mover(movimento)
-            
-            # Avalia o movimento
-            valor_movimento = self.minimax(tabuleiro_copia, profundidade - 1, float('-inf'), float('inf'), False)
-            
-            # Atualiza melhor movimento
-            if valor_movimento > melhor_valor:
-                melhor_valor = valor_movimento
-                melhor_movimento = movimento
-        
-        tempo_total = time.time() - tempo_inicio
-        print(f"IA escolheu um movimento em {tempo_total:.2f} segundos")
-        print(f"Valor da jogada: {melhor_valor:.2f}")
+        if self.turno != "vermelho" or not self.jogando or self.vencedor or self.movimento_ia_pendente:
+            return
         
-        return melhor_movimento
+        # A busca trabalha numa cópia: o tabuleiro da tela não muda enquanto ela roda
+        self.cancelamento_ia = threading.Event()
+        self.busca_ia = self.executor_ia.submit(self.ia.melhor_movimento_ia, self.tabuleiro.copiar(),
+                                                profundidade, tempo_limite_ms, "vermelho", self.cancelamento_ia)
+        self.movimento_ia_pendente = True
+        self.tempo_ia = pygame.time.get_ticks()
+        self.tempos_quadro = []
     
-    def jogada_ia(self, profundidade=3):
-        """Executa a jogada da IA"""
-        if self.turno != "vermelho" or not self.jogando or self.vencedor:
+    def verificar_jogada_ia(self):
+        """Aplica a jogada da IA quando a busca termina"""
+        if not self.movimento_ia_pendente or not self.busca_ia.done():
+            return
+        # Pequeno atraso para parecer mais natural (sem bloquear a janela)
+        if pygame.time.get_ticks() - self.tempo_ia < ATRASO_IA_MS:
             return
         
-        # Encontra o melhor movimento
-        melhor_movimento = self.melhor_movimento_ia(profundidade)
+        busca = self.busca_ia
+        self.busca_ia = None
+        self.movimento_ia_pendente = False
+        try:
+            melhor_movimento = busca.result()
+        except BuscaCancelada:
+            return
+        self.mostrar_tempos_quadro()
         
         if melhor_movimento:
-            # Pequeno delay para parecer mais natural
-            pygame.time.delay(500)
-            
             # Executa o movimento
-            self.executar_movimento(melhor_movimento)
+            # A busca terminou: as estatísticas da IA são as desta jogada
+            self.executar_movimento(melhor_movimento, self.ia.estatisticas)
             
             # Mostra informações no console
             linha_i, col_i, linha_f, col_f, capturas = melhor_movimento
             print(f"IA moveu de ({linha_i},{col_i}) para ({linha_f},{col_f})")
             if capturas:
                 print(f"Capturou {len(capturas)} peça(s)")
+            
+            if self.jogando:
+                self.iniciar_ponderacao()
         else:
             # Se não há movimentos válidos, o jogador vence
             self.vencedor = "branco"
             self.jogando = False
+            self.gravador.terminar(RESULTADOS[self.vencedor])
+    
+    def cancelar_jogada_ia(self):
+        """Cancela a busca em andamento (o resultado, se vier, é descartado)"""
+        if self.cancelamento_ia is not None:
+            self.cancelamento_ia.set()
+        self.busca_ia = None
+        self.cancelamento_ia = None
+        self.movimento_ia_pendente = False
+    
+    def iniciar_ponderacao(self):
+        """
+        Começa a buscar a jogada da IA enquanto o jogador pensa, supondo que ele fará
+        o movimento que a última busca da IA previu para ele
+        """
+        if not self.ponderar or self.ponderacao is not None:
+            return
+        previsto = self.ia.movimento_esperado(self.tabuleiro, "branco")
+        if previsto is None:
+            return
+        tabuleiro = self.tabuleiro.copiar()
+        tabuleiro.fazer_movimento(previsto)
+        self.movimento_previsto = previsto
+        self.cancelamento_ponderacao = threading.Event()
+        self.ponderacao = self.executor_ia.submit(self.ia.melhor_movimento_ia, tabuleiro, self.profundidade_ia,
+                                                  self.tempo_ia_ms, "vermelho", self.cancelamento_ponderacao, True)
+    
+    def verificar_ponderacao(self, movimento):
+        """
+        Chamada após o movimento do jogador: se foi o previsto, a busca da ponderação
+        vira a jogada da IA (no modo por tempo, ganha prazo agora); senão, é cancelada
+        """
+        if self.ponderacao is None:
+            return
+        if movimento != self.movimento_previsto or not self.jogando:
+            print("Ponderação: o jogador fez outro movimento")
+            self.cancelar_ponderacao()
+            return
+        print("Ponderação: movimento previsto, usando a busca em andamento")
+        self.busca_ia, self.cancelamento_ia = self.ponderacao, self.cancelamento_ponderacao
+        self.ponderacao = self.cancelamento_ponderacao = self.movimento_previsto = None
+        if self.tempo_ia_ms:
+            self.ia.confirmar_ponderacao(self.tempo_ia_ms, self.cancelamento_ia)
+        self.movimento_ia_pendente = True
+        self.tempo_ia = pygame.time.get_ticks()
+        self.tempos_quadro = []
+    
+    def cancelar_ponderacao(self):
+        """Cancela a busca da ponderação, se houver"""
+        if self.cancelamento_ponderacao is not None:
+            self.cancelamento_ponderacao.set()
+        self.ponderacao = self.cancelamento_ponderacao = self.movimento_previsto = None
+    
+    def estatisticas_quadros(self):
+        """Percentis (p50, p95, p99) e máximo da duração dos quadros enquanto a IA pensou, em ms"""
+        if not self.tempos_quadro:
+            return None
+        tempos = sorted(self.tempos_quadro)
+        
+        def percentil(p):
+            return tempos[min(len(tempos) - 1, int(p / 100 * len(tempos)))]
+        
+        return {"quadros": len(tempos), "p50": percentil(50), "p95": percentil(95),
+                "p99": percentil(99), "max": tempos[-1]}
+    
+    def mostrar_tempos_quadro(self):
+        """Mostra no console os tempos de quadro da última busca"""
+        estatisticas = self.estatisticas_quadros()
+        if estatisticas:
+            print("Quadros durante a busca: {quadros} | p50 {p50} ms | p95 {p95} ms | "
+                  "p99 {p99} ms | máx {max} ms".format(**estatisticas))
     
     def obter_posicao_mouse(self, pos):
         """Converte a posição do mouse para coordenadas do tabuleiro"""
@@ -542,18 +452,35 @@ class Jogo:
         return linha, coluna
     
     def executar(self):
-        """Loop principal do jogo"""
+        """Roda o jogo até a janela ser fechada"""
+        # O intervalo vale só enquanto o jogo roda: é do interpretador inteiro
+        intervalo_anterior = sys.getswitchinterval()
+        sys.setswitchinterval(INTERVALO_TROCA_THREADS)
+        try:
+            self.laco_principal()
+        finally:
+            sys.setswitchinterval(intervalo_anterior)
+        pygame.quit()
+        sys.exit()
+    
+    def laco_principal(self):
+        """Loop principal do jogo; ao sair, encerra a IA e fecha o arquivo de partidas"""
         executando = True
-        profundidade_ia = 3  # Profundidade padrão
         
         while executando:
-            self.relogio.tick(60)
+            duracao_quadro = self.relogio.tick(60)
+            if self.movimento_ia_pendente:
+                self.tempos_quadro.append(duracao_quadro)
             
             # Processa eventos
             for evento in pygame.event.get():
                 if evento.type == pygame.QUIT:
                     executando = False
                 
+                # Janela descoberta ou restaurada: o conteúdo antigo pode ter se perdido
+                if evento.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    self.renderizador.invalidar()
+                
                 if evento.type == pygame.KEYDOWN:
                     # Reiniciar o jogo
                     if evento.key == pygame.K_r:
@@ -563,21 +490,41 @@ class Jogo:
                     # Forçar jogada da IA
                     if evento.key == pygame.K_SPACE and self.turno == "vermelho" and self.jogando:
                         print("Forçando jogada da IA...")
-                        self.jogada_ia(profundidade_ia)
+                        self.jogada_ia(self.profundidade_ia, self.tempo_ia_ms)
+                    
+                    # Alternar entre profundidade fixa e tempo por jogada
+                    if evento.key == pygame.K_t:
+                        self.tempo_ia_ms = None if self.tempo_ia_ms else TEMPO_IA_MS
+                        self.cancelar_ponderacao()  # Foi iniciada com o ajuste anterior
+                        if self.tempo_ia_ms:
+                            print(f"IA por tempo: {self.tempo_ia_ms} ms por jogada")
+                        else:
+                            print(f"IA por profundidade: {self.profundidade_ia}")
+                    
+                    # Ligar/desligar a ponderação
+                    if evento.key == pygame.K_p:
+                        self.ponderar = not self.ponderar
+                        if not self.ponderar:
+                            self.cancelar_ponderacao()
+                        print(f"Ponderação {'ligada' if self.ponderar else 'desligada'}")
                     
                     # Ajustar dificuldade
                     if evento.key == pygame.K_1:
-                        profundidade_ia = 1
-                        print(f"Dificuldade: Fácil (profundidade {profundidade_ia})")
+                        self.profundidade_ia = 1
+                        self.cancelar_ponderacao()
+                        print(f"Dificuldade: Fácil (profundidade {self.profundidade_ia})")
                     if evento.key == pygame.K_2:
-                        profundidade_ia = 2
-                        print(f"Dificuldade: Médio (profundidade {profundidade_ia})")
+                        self.profundidade_ia = 2
+                        self.cancelar_ponderacao()
+                        print(f"Dificuldade: Médio (profundidade {self.profundidade_ia})")
                     if evento.key == pygame.K_3:
-                        profundidade_ia = 3
-                        print(f"Dificuldade: Difícil (profundidade {profundidade_ia})")
+                        self.profundidade_ia = 3
+                        self.cancelar_ponderacao()
+                        print(f"Dificuldade: Difícil (profundidade {self.profundidade_ia})")
                     if evento.key == pygame.K_4:
-                        profundidade_ia = 4
-                        print(f"Dificuldade: Expert (profundidade {profundidade_ia})")
+                        self.profundidade_ia = 4
+                        self.cancelar_ponderacao()
+                        print(f"Dificuldade: Expert (profundidade {self.profundidade_ia})")
                 
                 if evento.type == pygame.MOUSEBUTTONDOWN:
                     pos = pygame.mouse.get_pos()
@@ -589,13 +536,18 @@ class Jogo:
             if self.jogando and self.turno == "vermelho":
                 # Pequeno delay antes da IA jogar
                 if pygame.time.get_ticks() > 2000:  # Espera 1 segundo após mudança de turno
-                    self.jogada_ia(profundidade_ia)
+                    self.jogada_ia(self.profundidade_ia, self.tempo_ia_ms)
+            self.verificar_jogada_ia()
             
             # Atualiza a tela
             self.atualizar()
         
-        pygame.quit()
-        sys.exit()
+        # Interrompe a busca antes de sair
+        self.cancelar_jogada_ia()
+        self.cancelar_ponderacao()
+        self.executor_ia.shutdown(wait=True)
+        self.ia.encerrar()
+        self.gravador.fechar()
 
 # Executar o jogo
 if __name__ == "__main__":
@@ -609,8 +561,11 @@ if __name__ == "__main__":
     print("4. Clique em um destaque para mover")
     print("\nCONTROLES:")
     print("R - Reiniciar jogo")
+    print("1-4 - Profundidade da IA")
+    print(f"T - Alternar IA por tempo ({TEMPO_IA_MS} ms por jogada)")
+    print("P - Ligar/desligar a ponderação (IA pensa na sua vez)")
     print("ESPAÇO - Forçar jogada da IA (quando for a vez dela)")
     print("\nIniciando jogo...")
     
     jogo = Jogo()
-    jogo.executar()
\ No newline at end of file
+    jogo.executar()